@@ -1,15 +1,20 @@
+import hashlib
 from typing import Dict, List
 
+from elena.adapters.storage_manager import model_codec
 from elena.domain.model.bot_status import BotStatus
+from elena.domain.model.schedule_index import ScheduleIndex
 from elena.domain.model.strategy_config import StrategyConfig
 from elena.domain.ports.bot_manager import BotManager
 from elena.domain.ports.logger import Logger
 from elena.domain.ports.storage_manager import StorageError, StorageManager
+from elena.shared import json_codec
 
 
 class LocalBotManager(BotManager):
     _logger: Logger
     _storage_manager: StorageManager
+    _fingerprints: Dict[str, str]
 
     def init(
         self,
@@ -19,6 +24,8 @@ class LocalBotManager(BotManager):
     ):
         self._logger = logger
         self._storage_manager = storage_manager
+        # fingerprints of the statuses as loaded or saved, indexed by bot id
+        self._fingerprints = {}
 
     def load_all(self, strategy_config: StrategyConfig) -> List[BotStatus]:
         statuses = []
@@ -29,13 +36,65 @@ class LocalBotManager(BotManager):
                 self._logger.warning(f"Failed to load bot status for bot {bot.id}: {err}")
                 continue
             if status:
+                self._fingerprints[status.bot_id] = self._get_fingerprint(status)
                 statuses.append(status)
         return statuses
 
     def save_all(self, statuses: List[BotStatus]):
+        changed_statuses = []
+        fingerprints = {}
         for status in statuses:
+            fingerprint = self._get_fingerprint(status)
+            if self._fingerprints.get(status.bot_id) == fingerprint:
+                self._logger.debug(f"Bot status for bot {status.bot_id} unchanged, not saved")
+                continue
+            changed_statuses.append(status)
+            fingerprints[status.bot_id] = fingerprint
+        if not changed_statuses:
+            return
+        try:
+            self._storage_manager.save_bot_statuses(changed_statuses)
+            self._fingerprints.update(fingerprints)
+            return
+        except StorageError as err:
+            self._logger.warning(f"Failed to save bot statuses in one batch, saving the failed ones one by one: {err}")
+            batch_failed_ids = err.failed_ids
+        if batch_failed_ids is not None:
+            # saved in part, the saved statuses are not written again
+            for status in changed_statuses:
+                if status.bot_id not in batch_failed_ids:
+                    self._fingerprints[status.bot_id] = fingerprints[status.bot_id]
+            changed_statuses = [status for status in changed_statuses if status.bot_id in batch_failed_ids]
+        # a failed status doesn't prevent saving the others
+        failed_bot_ids = []
+        for status in changed_statuses:
             try:
                 self._storage_manager.save_bot_status(status)
             except StorageError as err:
                 self._logger.error(f"Failed to save bot status for bot {status.bot_id}: {err}")
+                failed_bot_ids.append(status.bot_id)
                 continue
+            self._fingerprints[status.bot_id] = fingerprints[status.bot_id]
+        if failed_bot_ids:
+            raise StorageError(f"Failed to save bot statuses for bots {', '.join(failed_bot_ids)}")
+
+    @staticmethod
+    def _get_fingerprint(status: BotStatus) -> str:
+        # the timestamp changes on every run, it is kept on the schedule index
+        data = model_codec.encode(status)
+        del data["timestamp"]
+        return hashlib.sha1(json_codec.dumps(data).encode()).hexdigest()
+
+    def load_schedule_index(self, strategy_config: StrategyConfig) -> ScheduleIndex:
+        try:
+            return self._storage_manager.load_schedule_index(strategy_config.id)
+        except StorageError as err:
+            # all the bots are checked against their statuses and the index is rebuilt
+            self._logger.debug(f"Schedule index not loaded for strategy {strategy_config.id}: {err}")
+            return ScheduleIndex(strategy_id=strategy_config.id)
+
+    def save_schedule_index(self, schedule_index: ScheduleIndex):
+        try:
+            self._storage_manager.save_schedule_index(schedule_index)
+        except StorageError as err:
+            self._logger.error(f"Failed to save schedule index for strategy {schedule_index.strategy_id}: {err}")
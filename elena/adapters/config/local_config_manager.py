@@ -35,6 +35,7 @@ class LocalConfigManager(ConfigManager):
     def _filter_entries(self):
         allowed_entries = [
             "home",
+            "Elena",
             "Logger",
             "MetricsManager",
             "NotificationsManager",
@@ -0,0 +1,308 @@
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+import ccxt
+import ccxt.async_support as ccxt_async
+import pandas as pd
+
+from elena.adapters.exchange_manager.cctx_exchange_manager import CctxExchangeManager
+from elena.domain.model.balance import Balance
+from elena.domain.model.bot_config import BotConfig
+from elena.domain.model.exchange import Exchange, ExchangeType
+from elena.domain.model.order import Order, OrderSide, OrderType
+from elena.domain.model.order_book import OrderBook, OrderBookSource
+from elena.domain.model.time_frame import TimeFrame
+from elena.domain.model.trading_pair import TradingPair
+from elena.domain.ports.exchange_manager import AsyncExchangeManager
+from elena.domain.ports.logger import Logger
+from elena.domain.ports.storage_manager import StorageManager
+
+_ASYNC_CONNECT_MAPPER = {exchange_type: getattr(ccxt_async, exchange_type.value) for exchange_type in ExchangeType}
+
+
+class CctxAsyncExchangeManager(CctxExchangeManager, AsyncExchangeManager):
+    """
+    ExchangeManager on ccxt.async_support. All the connections share one aiohttp session and run on an event loop
+    owned by the adapter, the synchronous port methods wait for their coroutine on that loop.
+    """
+
+    _connect_mapper = _ASYNC_CONNECT_MAPPER
+    _loop: asyncio.AbstractEventLoop
+    _loop_thread: threading.Thread
+    _session: aiohttp.ClientSession
+    _async_connections_lock: asyncio.Lock
+
+    def init(self, config: Dict, logger: Logger, storage_manager: StorageManager):
+        super().init(config, logger, storage_manager)
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, name="CctxAsyncExchangeManager", daemon=True)
+        self._loop_thread.start()
+        self._session = self._run(self._new_session())
+        # created on the adapter loop, on python < 3.10 it binds to the loop of the thread it is created on
+        self._async_connections_lock = self._run(self._new_lock())
+
+    async def _new_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(limit=self._config.get("max_connections", 100), enable_cleanup_closed=True)
+        return aiohttp.ClientSession(connector=connector)
+
+    @staticmethod
+    async def _new_lock() -> asyncio.Lock:
+        return asyncio.Lock()
+
+    def _run(self, coroutine) -> Any:
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def close(self):
+        self._run(self._close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join()
+
+    async def _close(self):
+        for conn in self._connections.values():
+            await conn.close()
+        self._connections = {}
+        await self._session.close()
+
+    def _connect(self, exchange: Exchange):
+        return self._run(self._connect_async(exchange))
+
+    async def _connect_async(self, exchange: Exchange):
+        key = self._get_connection_key(exchange)
+        async with self._async_connections_lock:
+            conn = self._connections.get(key)
+            if conn is None:
+                conn = await self._new_connection_async(exchange)
+                if conn is not None:
+                    self._connections[key] = conn
+        return conn
+
+    async def _new_connection_async(self, exchange: Exchange):
+        self._logger.debug("Connecting to %s ...", exchange.id.value)
+        conn = self._connect_mapper[exchange.id](
+            {
+                "apiKey": exchange.api_key,
+                "password": exchange.password,
+                "secret": exchange.secret,
+                "session": self._session,
+                "asyncio_loop": self._loop,
+            }
+        )
+        conn.set_sandbox_mode(exchange.sandbox_mode)
+        try:
+            await self._load_markets_async(exchange, conn)
+            self._logger.info(
+                "Connected to %s at %s",
+                exchange.id.value,
+                conn.urls["api"]["public"],
+            )
+            return conn
+        except Exception as err:
+            self._logger.error("Connection error: %s", err, exc_info=1)
+            await conn.close()
+            return None
+
+    async def _load_markets_async(self, exchange: Exchange, conn):
+        ttl = self._config.get("markets_cache_ttl_seconds", 0)
+        if ttl > 0:
+            stored_markets = self._load_stored_markets(exchange)
+            if stored_markets and self._get_time() - stored_markets.timestamp < ttl * 1000:
+                self._logger.debug("Loading markets from %s cache ...", exchange.id.value)
+                conn.set_markets(stored_markets.markets, stored_markets.currencies)
+                return
+        await self._reload_markets_async(exchange, conn)
+
+    def _reload_markets(self, exchange: Exchange, conn):
+        self._run(self._reload_markets_async(exchange, conn))
+
+    async def _reload_markets_async(self, exchange: Exchange, conn):
+        self._logger.debug("Loading markets from %s ...", exchange.id.value)
+        await conn.load_markets(reload=True)
+        self._markets_reloaded[self._get_connection_key(exchange)] = time.monotonic()
+        if self._config.get("markets_cache_ttl_seconds", 0) > 0:
+            self._save_stored_markets(exchange, conn)
+
+    async def read_candles_async(
+        self,
+        exchange: Exchange,
+        pair: TradingPair,
+        time_frame: TimeFrame = TimeFrame.min_1,  # type: ignore
+        page_size: int = 100,
+    ) -> pd.DataFrame:
+        self._logger.debug(
+            "Reading exchange candles from %s with CCTX async for pair %s ...",
+            exchange.id,
+            pair,
+        )
+        key = self._get_candles_cache_key(exchange, pair, time_frame, page_size)
+        candles = await self._market_data_cache.get_async(key, lambda: self._read_candles_async(exchange, pair, time_frame, page_size))
+        self._logger.info("Read %d %s candles from %s", candles.shape[0], pair, exchange.id.value)
+        # strategies may add columns to their candles
+        return candles.copy()
+
+    async def _read_candles_async(self, exchange: Exchange, pair: TradingPair, time_frame: TimeFrame, page_size: int) -> pd.DataFrame:
+        conn = await self._connect_async(exchange)
+        if not self._config.get("store_candles", False):
+            return await self._fetch_candles_async(conn, pair, time_frame, page_size=page_size)
+        candles_id = self._get_dataframe_id(exchange, pair, time_frame)
+        limit = max(page_size, self._config["fetch_ohlcv_limit"])
+        stored_candles = self._load_stored_candles(candles_id, limit)
+        if stored_candles.empty:
+            new_candles = await self._fetch_candles_async(conn, pair, time_frame, page_size=page_size)
+        else:
+            new_candles = await self._fetch_missing_candles_async(conn, pair, time_frame, stored_candles, page_size=page_size)
+        return self._store_new_candles(candles_id, stored_candles, new_candles, limit)
+
+    async def _fetch_missing_candles_async(self, connection, pair: TradingPair, time_frame: TimeFrame, stored_candles: pd.DataFrame, page_size: int = 100) -> pd.DataFrame:
+        # as _fetch_missing_candles
+        since = self._get_missing_candles_since(pair, time_frame, stored_candles, page_size)
+        if since is None:
+            return await self._fetch_candles_async(connection, pair, time_frame, page_size=page_size)
+        pages = []
+        while since is not None:
+            page = await self._fetch_candles_async(connection, pair, time_frame, page_size=page_size, since=since)
+            pages.append(page)
+            since = self._get_next_page_since(page, since, time_frame)
+        return self._concat_pages(pages)
+
+    async def _fetch_candles_async(self, connection, pair: TradingPair, time_frame: TimeFrame, page_size: int = 100, since: Optional[int] = None) -> pd.DataFrame:
+        return self._map_candles(await self._fetch_candles_with_retry_async(connection, pair, time_frame, page_size, since=since))
+
+    def _fetch_candles_with_retry(self, connection, pair: TradingPair, time_frame: TimeFrame, page_size: int = 100, since: Optional[int] = None) -> List[List]:
+        return self._run(self._fetch_candles_with_retry_async(connection, pair, time_frame, page_size, since=since))
+
+    async def _fetch_candles_with_retry_async(self, connection, pair: TradingPair, time_frame: TimeFrame, page_size: int = 100, since: Optional[int] = None) -> List[List]:
+        limit = max(page_size, self._config["fetch_ohlcv_limit"])
+        while True:
+            try:
+                return await connection.fetch_ohlcv(str(pair), time_frame.value, since=since, limit=limit)
+            except ccxt.RateLimitExceeded as e:
+                self._logger.info("Retrying connection to exchange, %s: %s", type(e).__name__, e)
+                await asyncio.sleep(self._config["fetch_ohlcv_limit_retry_every_milliseconds"] / 1000)
+
+    async def read_order_book_async(self, exchange: Exchange, pair: TradingPair, depth: Optional[int] = None, sources: Optional[List[OrderBookSource]] = None) -> OrderBook:
+        self._logger.debug(
+            "Reading exchange order book from %s with CCTX async for pair %s ...",
+            exchange.id,
+            pair,
+        )
+        conn = await self._connect_async(exchange)
+        for source in self._get_order_book_sources(conn, depth, sources):
+            limit = self._get_order_book_limit(exchange, depth) if source == OrderBookSource.order_book else None
+            key = ("order_book", exchange.id, exchange.sandbox_mode, str(pair), source.value, limit)
+            ob = await self._market_data_cache.get_async(key, lambda: self._read_order_book_source_async(exchange, conn, pair, source, limit))
+            if ob is not None:
+                self._log_order_book(exchange, pair, source, ob)
+                return ob
+        raise RuntimeError("The order book is always the last source")
+
+    async def _read_order_book_source_async(self, exchange: Exchange, connection, pair: TradingPair, source: OrderBookSource, limit: Optional[int]) -> Optional[OrderBook]:
+        if source == OrderBookSource.ticker:
+            return self._map_top_of_book(await connection.fetch_ticker(str(pair)))
+        if source == OrderBookSource.bids_asks:
+            return self._map_top_of_book((await connection.fetch_bids_asks([str(pair)])).get(str(pair)))
+        if limit is not None:
+            try:
+                return self._map_order_book(await connection.fetch_order_book(str(pair), limit))
+            except ccxt.BadSymbol:
+                raise
+            except ccxt.BadRequest as err:
+                ob = self._map_order_book(await connection.fetch_order_book(str(pair)))
+                # the whole book was read, so the limit was rejected
+                self._reject_order_book_limit(exchange, limit, err)
+                return ob
+        return self._map_order_book(await connection.fetch_order_book(str(pair)))
+
+    def _fetch_order_book(self, connection, pair: TradingPair, limit: Optional[int] = None) -> OrderBook:
+        if limit is None:
+            return self._map_order_book(self._run(connection.fetch_order_book(str(pair))))
+        return self._map_order_book(self._run(connection.fetch_order_book(str(pair), limit)))
+
+    def _fetch_ticker(self, connection, pair: TradingPair) -> Dict:
+        return self._run(connection.fetch_ticker(str(pair)))
+
+    def _fetch_bids_asks(self, connection, pair: TradingPair) -> Dict:
+        return self._run(connection.fetch_bids_asks([str(pair)]))
+
+    def get_balance(self, exchange: Exchange) -> Balance:
+        return self._run(self.get_balance_async(exchange))
+
+    async def get_balance_async(self, exchange: Exchange) -> Balance:
+        self._logger.debug("Reading balance from %s with CCTX async", exchange.id)
+        conn = await self._connect_async(exchange)
+        return self._map_balance(await conn.fetch_balance())
+
+    def place_order(
+        self,
+        exchange: Exchange,
+        bot_config: BotConfig,
+        order_type: OrderType,
+        side: OrderSide,
+        amount: float,
+        price: Optional[float] = None,
+        params: Optional[Dict] = {},
+    ) -> Order:
+        return self._run(self.place_order_async(exchange, bot_config, order_type, side, amount, price, params))
+
+    async def place_order_async(
+        self,
+        exchange: Exchange,
+        bot_config: BotConfig,
+        order_type: OrderType,
+        side: OrderSide,
+        amount: float,
+        price: Optional[float] = None,
+        params: Optional[Dict] = {},
+    ) -> Order:
+        conn = await self._connect_async(exchange)
+        order = await conn.create_order(
+            symbol=str(bot_config.pair),
+            type=order_type.value,
+            side=side.value,
+            amount=amount,
+            price=price,
+            params=params,
+        )
+        return self._map_order(exchange, bot_config, bot_config.pair, order)
+
+    def cancel_order(self, exchange: Exchange, bot_config: BotConfig, order_id: str) -> Order:
+        return self._run(self.cancel_order_async(exchange, bot_config, order_id))
+
+    async def cancel_order_async(self, exchange: Exchange, bot_config: BotConfig, order_id: str) -> Order:
+        conn = await self._connect_async(exchange)
+        order = await conn.cancel_order(id=order_id, symbol=str(bot_config.pair))
+        self._logger.info("Canceled order: %s", order_id)
+        return self._map_order(exchange, bot_config, bot_config.pair, order)
+
+    def fetch_order(self, exchange: Exchange, bot_config: BotConfig, order_id: str) -> Order:
+        return self._run(self.fetch_order_async(exchange, bot_config, order_id))
+
+    async def fetch_order_async(self, exchange: Exchange, bot_config: BotConfig, order_id: str) -> Order:
+        conn = await self._connect_async(exchange)
+        order = await conn.fetch_order(id=order_id, symbol=str(bot_config.pair))
+        return self._map_order(exchange, bot_config, bot_config.pair, order)
+
+    def _request_orders(self, connection, method: str, symbol: str) -> List[Dict]:
+        return self._run(getattr(connection, method)(symbol))
+
+    async def fetch_orders_async(self, exchange: Exchange, bot_config: BotConfig, order_ids: List[str]) -> Dict[str, Order]:
+        orders: Dict[str, Order] = {}
+        if not order_ids:
+            return orders
+        conn = await self._connect_async(exchange)
+        symbol = str(bot_config.pair)
+        pending_ids = set(order_ids)
+        for method in self._get_bulk_fetch_orders_methods(conn):
+            if not pending_ids:
+                break
+            key = (method, *self._get_connection_key(exchange), symbol)
+            try:
+                fetched_orders = await self._orders_cache.get_async(key, lambda: getattr(conn, method)(symbol))
+            except Exception as err:
+                self._logger.warning("Cannot %s %s from %s: %s", method, symbol, exchange.id.value, err)
+                continue
+            self._index_orders(exchange, bot_config, fetched_orders, pending_ids, orders)
+        self._logger.debug("Fetched %d of %d orders from %s in bulk", len(orders), len(order_ids), exchange.id.value)
+        return orders
@@ -1,20 +1,24 @@
+import threading
 import time
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import ccxt
 import pandas as pd
 
+from elena.adapters.exchange_manager.request_cache import RequestCache
 from elena.domain.model.balance import Balance, ByAvailability, ByCurrency
 from elena.domain.model.bot_config import BotConfig
 from elena.domain.model.exchange import Exchange, ExchangeType
+from elena.domain.model.exchange_markets import ExchangeMarkets
 from elena.domain.model.order import Fee, Order, OrderSide, OrderStatusType, OrderType
-from elena.domain.model.order_book import OrderBook, PriceAmount
+from elena.domain.model.order_book import OrderBook, OrderBookSource
 from elena.domain.model.time_frame import TimeFrame
 from elena.domain.model.trading_pair import TradingPair
 from elena.domain.ports.exchange_manager import ExchangeManager
 from elena.domain.ports.logger import Logger
 from elena.domain.ports.storage_manager import StorageManager
+from elena.shared.model_construct import construct
 
 _CONNECT_MAPPER = {
     ExchangeType.ace: ccxt.ace,
@@ -124,6 +128,21 @@ _CONNECT_MAPPER = {
     ExchangeType.zonda: ccxt.zonda,
 }
 
+# limits most exchanges accept, the depth is rounded up
+_ORDER_BOOK_LIMITS = [5, 10, 20, 50, 100, 500, 1000, 5000]
+
+_UNKNOWN_MARKET_RELOAD_SECONDS = 3600  # markets are reloaded for an unknown symbol at most once an hour
+
+_TOP_OF_BOOK_METHODS = {
+    OrderBookSource.ticker: "fetchTicker",
+    OrderBookSource.bids_asks: "fetchBidsAsks",
+}
+
+
+def _is_number(value: Any) -> bool:
+    # the values ccxt parsed, the models are built without validation when they are numbers
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
 
 class CctxExchangeManager(ExchangeManager):
     _config: Dict
@@ -131,38 +150,121 @@ class CctxExchangeManager(ExchangeManager):
     _connect_mapper = _CONNECT_MAPPER
     _candles_columns = ["Open time", "Open", "High", "Low", "Close", "Volume"]
     _storage_manager: StorageManager
-    _conn = None
+    _connections: Dict[Tuple, Any]
+    _connections_lock: threading.Lock
+    _market_data_cache: RequestCache
+    _orders_cache: RequestCache
+    _order_book_sources: List[OrderBookSource]
+    _order_book_limit_rejected: Set[ExchangeType]
+    _markets_reloaded: Dict[Tuple, float]
 
     def init(self, config: Dict, logger: Logger, storage_manager: StorageManager):
         self._config = config["ExchangeManager"]
         self._logger = logger
         self._storage_manager = storage_manager
-        self._conn = None
+        self._connections = {}
+        self._connections_lock = threading.Lock()
+        # bots trading the same pair on the same cycle share the market data requests
+        self._market_data_cache = RequestCache(self._config.get("market_data_cache_seconds", 0))
+        # and the bulk order lists of the same pair and account
+        self._orders_cache = RequestCache(self._config.get("orders_cache_seconds", 0))
+        # where the top of the book is read from, cheapest first, bots can set their own order_book_sources
+        self._order_book_sources = [OrderBookSource(source) for source in self._config.get("order_book_sources", [OrderBookSource.order_book.value])]
+        self._order_book_limit_rejected = set()
+        # monotonic time of the last markets reload by connection key
+        self._markets_reloaded = {}
+
+    @staticmethod
+    def _get_connection_key(exchange: Exchange) -> Tuple:
+        # the same exchange may be configured with different accounts or in sandbox mode
+        return exchange.id, exchange.sandbox_mode, exchange.api_key, exchange.password, exchange.secret
 
     def _connect(self, exchange: Exchange):
-        if self._conn is None:  # TODO: WARNING one cache for only ONE Exchange
-            self._logger.debug("Connecting to %s ...", exchange.id.value)
-            conn = self._connect_mapper[exchange.id](
-                {
-                    "apiKey": exchange.api_key,
-                    "password": exchange.password,
-                    "secret": exchange.secret,
-                }
+        key = self._get_connection_key(exchange)
+        with self._connections_lock:
+            conn = self._connections.get(key)
+            if conn is None:
+                conn = self._new_connection(exchange)
+                if conn is not None:
+                    self._connections[key] = conn
+        return conn
+
+    def _new_connection(self, exchange: Exchange):
+        self._logger.debug("Connecting to %s ...", exchange.id.value)
+        conn = self._connect_mapper[exchange.id](
+            {
+                "apiKey": exchange.api_key,
+                "password": exchange.password,
+                "secret": exchange.secret,
+            }
+        )
+        conn.set_sandbox_mode(exchange.sandbox_mode)
+        try:
+            self._load_markets(exchange, conn)
+            self._logger.info(
+                "Connected to %s at %s",
+                exchange.id.value,
+                conn.urls["api"]["public"],
             )
-            conn.set_sandbox_mode(exchange.sandbox_mode)
-            self._logger.debug("Loading markets from %s ...", exchange.id.value)
-            try:
-                conn.load_markets()
-                self._logger.info(
-                    "Connected to %s at %s",
-                    exchange.id.value,
-                    conn.urls["api"]["public"],
-                )
-                self._conn = conn
-            except Exception as err:
-                self._logger.error("Connection error: %s", err, exc_info=1)
-                self._conn = None
-        return self._conn
+            return conn
+        except Exception as err:
+            self._logger.error("Connection error: %s", err, exc_info=1)
+            return None
+
+    def _load_markets(self, exchange: Exchange, conn):
+        ttl = self._config.get("markets_cache_ttl_seconds", 0)
+        if ttl > 0:
+            stored_markets = self._load_stored_markets(exchange)
+            if stored_markets and self._get_time() - stored_markets.timestamp < ttl * 1000:
+                self._logger.debug("Loading markets from %s cache ...", exchange.id.value)
+                conn.set_markets(stored_markets.markets, stored_markets.currencies)
+                return
+        self._reload_markets(exchange, conn)
+
+    def _reload_markets(self, exchange: Exchange, conn):
+        self._logger.debug("Loading markets from %s ...", exchange.id.value)
+        conn.load_markets(reload=True)
+        self._markets_reloaded[self._get_connection_key(exchange)] = time.monotonic()
+        if self._config.get("markets_cache_ttl_seconds", 0) > 0:
+            self._save_stored_markets(exchange, conn)
+
+    def _load_stored_markets(self, exchange: Exchange) -> Optional[ExchangeMarkets]:
+        try:
+            return self._storage_manager.load_exchange_markets(exchange.id, exchange.sandbox_mode)
+        except Exception as err:
+            self._logger.debug("Cannot load %s markets from storage: %s", exchange.id.value, err)
+            return None
+
+    def _save_stored_markets(self, exchange: Exchange, conn):
+        exchange_markets = ExchangeMarkets(
+            exchange_id=exchange.id,
+            sandbox_mode=exchange.sandbox_mode,
+            timestamp=self._get_time(),
+            markets=conn.markets,
+            currencies=conn.currencies or {},
+        )
+        try:
+            self._storage_manager.save_exchange_markets(exchange_markets)
+        except Exception as err:
+            self._logger.warning("Cannot save %s markets to storage: %s", exchange.id.value, err)
+
+    def _get_market(self, exchange: Exchange, pair: TradingPair) -> Dict:
+        conn = self._connect(exchange)
+        symbol = str(pair)
+        if symbol not in conn.markets and self._can_reload_markets(exchange):
+            # cached markets may be older than a new listing
+            self._logger.info("Market %s not found on %s, reloading markets ...", symbol, exchange.id.value)
+            self._reload_markets(exchange, conn)
+        return conn.markets[symbol]
+
+    def _can_reload_markets(self, exchange: Exchange) -> bool:
+        # a misconfigured pair would download the whole catalogue on every call
+        reloaded = self._markets_reloaded.get(self._get_connection_key(exchange))
+        return reloaded is None or time.monotonic() - reloaded >= _UNKNOWN_MARKET_RELOAD_SECONDS
+
+    @staticmethod
+    def _get_time() -> int:
+        return int(time.time() * 1000)
 
     def read_candles(
         self,
@@ -176,15 +278,96 @@ class CctxExchangeManager(ExchangeManager):
             exchange.id,
             pair,
         )
-        conn = self._connect(exchange)
-        candles = self._fetch_candles(conn, pair, time_frame, page_size=page_size)
+        key = self._get_candles_cache_key(exchange, pair, time_frame, page_size)
+        candles = self._market_data_cache.get(key, lambda: self._read_candles(exchange, pair, time_frame, page_size))
         self._logger.info("Read %d %s candles from %s", candles.shape[0], pair, exchange.id.value)
-        return candles
+        # strategies may add columns to their candles
+        return candles.copy()
+
+    def _get_candles_cache_key(self, exchange: Exchange, pair: TradingPair, time_frame: TimeFrame, page_size: int) -> Tuple:
+        return "candles", exchange.id, exchange.sandbox_mode, str(pair), time_frame, max(page_size, self._config["fetch_ohlcv_limit"])
+
+    def _read_candles(self, exchange: Exchange, pair: TradingPair, time_frame: TimeFrame, page_size: int) -> pd.DataFrame:
+        conn = self._connect(exchange)
+        if self._config.get("store_candles", False):
+            return self._read_stored_candles(conn, exchange, pair, time_frame, page_size=page_size)
+        return self._fetch_candles(conn, pair, time_frame, page_size=page_size)
+
+    def _read_stored_candles(self, connection, exchange: Exchange, pair: TradingPair, time_frame: TimeFrame, page_size: int = 100) -> pd.DataFrame:
+        candles_id = self._get_dataframe_id(exchange, pair, time_frame)
+        limit = max(page_size, self._config["fetch_ohlcv_limit"])
+        stored_candles = self._load_stored_candles(candles_id, limit)
+        if stored_candles.empty:
+            new_candles = self._fetch_candles(connection, pair, time_frame, page_size=page_size)
+        else:
+            new_candles = self._fetch_missing_candles(connection, pair, time_frame, stored_candles, page_size=page_size)
+        return self._store_new_candles(candles_id, stored_candles, new_candles, limit)
+
+    def _store_new_candles(self, candles_id: str, stored_candles: pd.DataFrame, new_candles: pd.DataFrame, limit: int) -> pd.DataFrame:
+        candles = new_candles if stored_candles.empty else self._merge_candles(stored_candles, new_candles)
+        if not new_candles.empty:
+            try:
+                self._storage_manager.append_candles(candles_id, new_candles)
+            except Exception as err:
+                self._logger.warning("Cannot save candles %s to storage: %s", candles_id, err)
+        return candles.tail(limit).reset_index(drop=True)
+
+    def _load_stored_candles(self, candles_id: str, limit: int) -> pd.DataFrame:
+        try:
+            return self._storage_manager.load_candles(candles_id, limit=limit)
+        except Exception as err:
+            self._logger.debug("Cannot load candles %s from storage: %s", candles_id, err)
+            return pd.DataFrame(columns=self._candles_columns)
+
+    def _fetch_missing_candles(self, connection, pair: TradingPair, time_frame: TimeFrame, stored_candles: pd.DataFrame, page_size: int = 100) -> pd.DataFrame:
+        since = self._get_missing_candles_since(pair, time_frame, stored_candles, page_size)
+        if since is None:
+            return self._fetch_candles(connection, pair, time_frame, page_size=page_size)
+        pages = []
+        while since is not None:
+            page = self._fetch_candles(connection, pair, time_frame, page_size=page_size, since=since)
+            pages.append(page)
+            since = self._get_next_page_since(page, since, time_frame)
+        return self._concat_pages(pages)
+
+    def _get_missing_candles_since(self, pair: TradingPair, time_frame: TimeFrame, stored_candles: pd.DataFrame, page_size: int) -> Optional[int]:
+        # the last stored candle may have been read before its close, so it's fetched again
+        since = int(stored_candles["Open time"].iloc[-1])
+        limit = max(page_size, self._config["fetch_ohlcv_limit"])
+        max_pages = self._config.get("fetch_ohlcv_max_pages", 10)
+        missing_candles = (self._get_time() - since) // (ccxt.Exchange.parse_timeframe(time_frame.value) * 1000) + 1
+        if missing_candles > limit * max_pages:
+            # None reads the latest candles as usual
+            self._logger.warning("%d %s %s candles are missing, more than %d pages, reading the latest ones only", missing_candles, pair, time_frame.value, max_pages)
+            return None
+        return since
+
+    def _get_next_page_since(self, page: pd.DataFrame, since: int, time_frame: TimeFrame) -> Optional[int]:
+        # a gap larger than one request is read forward page by page, the stored history never keeps a hole
+        if page.empty:
+            return None
+        next_since = int(page["Open time"].iloc[-1]) + ccxt.Exchange.parse_timeframe(time_frame.value) * 1000
+        if next_since > self._get_time() or next_since <= since:
+            return None
+        return next_since
+
+    def _concat_pages(self, pages: List[pd.DataFrame]) -> pd.DataFrame:
+        pages = [page for page in pages if not page.empty]
+        if not pages:
+            return pd.DataFrame(columns=self._candles_columns)
+        # exchanges may answer a page past the last candle with the last candles again
+        return pd.concat(pages, ignore_index=True).drop_duplicates(subset="Open time", keep="last").reset_index(drop=True)
+
+    @staticmethod
+    def _merge_candles(stored_candles: pd.DataFrame, new_candles: pd.DataFrame) -> pd.DataFrame:
+        candles = pd.concat([stored_candles, new_candles], ignore_index=True)
+        candles = candles.drop_duplicates(subset="Open time", keep="last")
+        return candles.sort_values("Open time").reset_index(drop=True)
 
     @staticmethod
     def _get_dataframe_id(exchange: Exchange, pair: TradingPair, time_frame: TimeFrame) -> str:
         pair_str = str(pair).replace("/", "-")
-        return f"Candles-{exchange.id}-{pair_str}-{time_frame.value}"
+        return f"Candles-{exchange.id.value}-{pair_str}-{time_frame.value}"
 
     @staticmethod
     def _are_stored_candles_up_to_date(stored_candles: pd.DataFrame, time_frame: TimeFrame, now: datetime) -> bool:
@@ -213,8 +396,11 @@ class CctxExchangeManager(ExchangeManager):
         else:
             raise ValueError(f"Unknown time frame: {time_frame}")
 
-    def _fetch_candles(self, connection, pair: TradingPair, time_frame: TimeFrame, page_size: int = 100) -> pd.DataFrame:
-        candles_list = self._fetch_candles_with_retry(connection, pair, time_frame, page_size)
+    def _fetch_candles(self, connection, pair: TradingPair, time_frame: TimeFrame, page_size: int = 100, since: Optional[int] = None) -> pd.DataFrame:
+        candles_list = self._fetch_candles_with_retry(connection, pair, time_frame, page_size, since=since)
+        return self._map_candles(candles_list)
+
+    def _map_candles(self, candles_list: List[List]) -> pd.DataFrame:
         candles_df = pd.DataFrame(candles_list)
         if candles_df.shape == (0, 0):
             return pd.DataFrame(columns=self._candles_columns)
@@ -228,7 +414,7 @@ class CctxExchangeManager(ExchangeManager):
         candles_df.set_index("Open time")
         return candles_df
 
-    def _fetch_candles_with_retry(self, connection, pair: TradingPair, time_frame: TimeFrame, page_size: int = 100) -> List[List]:
+    def _fetch_candles_with_retry(self, connection, pair: TradingPair, time_frame: TimeFrame, page_size: int = 100, since: Optional[int] = None) -> List[List]:
         # https://github.com/ccxt/ccxt/issues/10273
         # from https://github.com/ccxt/ccxt/blob/master/examples/py/kucoin-rate-limit.py
 
@@ -239,7 +425,7 @@ class CctxExchangeManager(ExchangeManager):
         candles = pd.DataFrame()
         while retry:
             try:
-                candles = connection.fetch_ohlcv(str(pair), time_frame.value, limit=limit)
+                candles = connection.fetch_ohlcv(str(pair), time_frame.value, since=since, limit=limit)
                 retry = False
             except ccxt.RateLimitExceeded as e:
                 self._logger.info("Retrying connection to exchange, %s: %s", type(e).__name__, e)
@@ -249,7 +435,7 @@ class CctxExchangeManager(ExchangeManager):
             i += 1
         return candles
 
-    def read_order_book(self, exchange: Exchange, pair: TradingPair) -> OrderBook:
+    def read_order_book(self, exchange: Exchange, pair: TradingPair, depth: Optional[int] = None, sources: Optional[List[OrderBookSource]] = None) -> OrderBook:
         self._logger.debug(
             "Reading exchange order book from %s with CCTX for pair %s ...",
             exchange.id,
@@ -257,28 +443,78 @@ class CctxExchangeManager(ExchangeManager):
         )
 
         conn = self._connect(exchange)
-        ob = self._fetch_order_book(conn, pair)
+        for source in self._get_order_book_sources(conn, depth, sources):
+            limit = self._get_order_book_limit(exchange, depth) if source == OrderBookSource.order_book else None
+            key = ("order_book", exchange.id, exchange.sandbox_mode, str(pair), source.value, limit)
+            ob = self._market_data_cache.get(key, lambda: self._read_order_book_source(exchange, conn, pair, source, limit))
+            if ob is not None:
+                break
+        self._log_order_book(exchange, pair, source, ob)
+        return ob
+
+    def _log_order_book(self, exchange: Exchange, pair: TradingPair, source: OrderBookSource, ob: OrderBook):
         self._logger.info(
-            "Read %d bids and %d asks for %s from %s",
-            len(ob.bids),
-            len(ob.asks),
+            "Read %d bids and %d asks for %s from %s %s",
+            len(ob.bids_array),
+            len(ob.asks_array),
             pair,
             exchange.id.value,
+            source.value,
         )
-        return ob
 
-    def _fetch_order_book(self, connection, pair: TradingPair) -> OrderBook:
-        try:
-            ob = connection.fetch_order_book(str(pair))
-        except Exception as err:
-            raise err
-        return self._map_order_book(ob)
+    def _get_order_book_sources(self, connection, depth: Optional[int], sources: Optional[List[OrderBookSource]]) -> List[OrderBookSource]:
+        # the ticker and bids_asks only have the top of the book, the order book is always the last resort
+        top_of_book = depth is not None and depth <= 1
+        return [source for source in sources or self._order_book_sources if source != OrderBookSource.order_book and top_of_book and connection.has.get(_TOP_OF_BOOK_METHODS[source])] + [OrderBookSource.order_book]
+
+    def _get_order_book_limit(self, exchange: Exchange, depth: Optional[int]) -> Optional[int]:
+        if depth is None or exchange.id in self._order_book_limit_rejected:
+            return None
+        return next((limit for limit in _ORDER_BOOK_LIMITS if limit >= depth), None)
+
+    def _reject_order_book_limit(self, exchange: Exchange, limit: int, err: Exception):
+        self._logger.warning("%s rejected the order book limit %d, reading the whole book from now on: %s", exchange.id.value, limit, err)
+        self._order_book_limit_rejected.add(exchange.id)
+
+    def _read_order_book_source(self, exchange: Exchange, connection, pair: TradingPair, source: OrderBookSource, limit: Optional[int]) -> Optional[OrderBook]:
+        if source == OrderBookSource.ticker:
+            return self._map_top_of_book(self._fetch_ticker(connection, pair))
+        if source == OrderBookSource.bids_asks:
+            return self._map_top_of_book(self._fetch_bids_asks(connection, pair).get(str(pair)))
+        if limit is not None:
+            try:
+                return self._fetch_order_book(connection, pair, limit)
+            except ccxt.BadSymbol:
+                raise
+            except ccxt.BadRequest as err:
+                ob = self._fetch_order_book(connection, pair)
+                # the whole book was read, so the limit was rejected
+                self._reject_order_book_limit(exchange, limit, err)
+                return ob
+        return self._fetch_order_book(connection, pair)
+
+    def _fetch_order_book(self, connection, pair: TradingPair, limit: Optional[int] = None) -> OrderBook:
+        if limit is None:
+            return self._map_order_book(connection.fetch_order_book(str(pair)))
+        return self._map_order_book(connection.fetch_order_book(str(pair), limit))
+
+    def _fetch_ticker(self, connection, pair: TradingPair) -> Dict:
+        return connection.fetch_ticker(str(pair))
+
+    def _fetch_bids_asks(self, connection, pair: TradingPair) -> Dict:
+        return connection.fetch_bids_asks([str(pair)])
+
+    @staticmethod
+    def _map_top_of_book(ticker: Optional[Dict]) -> Optional[OrderBook]:
+        # the volumes are 0.0 when the exchange doesn't serve them, None when there is no best bid or ask
+        if not ticker or ticker.get("bid") is None or ticker.get("ask") is None:
+            return None
+        return OrderBook(bids=[[ticker["bid"], ticker.get("bidVolume") or 0.0]], asks=[[ticker["ask"], ticker.get("askVolume") or 0.0]])
 
     @staticmethod
     def _map_order_book(ob: Dict) -> OrderBook:
-        bids = [PriceAmount(price=bid[0], amount=bid[1]) for bid in ob["bids"]]
-        asks = [PriceAmount(price=bid[0], amount=bid[1]) for bid in ob["asks"]]
-        return OrderBook(bids=bids, asks=asks)
+        # the [price, amount] levels ccxt parsed are copied to arrays, without an object per level
+        return OrderBook(bids=ob["bids"], asks=ob["asks"])
 
     def get_balance(self, exchange: Exchange) -> Balance:
         self._logger.debug("Reading balance from %s with CCTX", exchange.id)
@@ -305,7 +541,8 @@ class CctxExchangeManager(ExchangeManager):
         total = self._map_by_availability(bal["total"])
         currencies = self._map_by_currency(bal)
         info = bal["info"]
-        bal = Balance(
+        balance = construct(
+            Balance,
             timestamp=timestamp,
             free=free,
             used=used,
@@ -313,8 +550,8 @@ class CctxExchangeManager(ExchangeManager):
             currencies=currencies,
             info=info,
         )
-        self._logger.debug("Read balance: %s", bal)
-        return bal
+        self._logger.debug("Read balance: %s", balance)
+        return balance
 
     @staticmethod
     def _map_timestamp(timestamp) -> int:
@@ -332,7 +569,10 @@ class CctxExchangeManager(ExchangeManager):
         return lst
 
     def _build_by_availability(self, sym: str, amount: float):
+        if _is_number(amount):
+            return construct(ByAvailability, currency=sym, amount=amount)
         try:
+            # reports what is wrong
             return ByAvailability(currency=sym, amount=amount)
         except ValueError as err:
             self._logger.warning(err)
@@ -354,6 +594,8 @@ class CctxExchangeManager(ExchangeManager):
     def _map_currency(currency: str, balance: Dict) -> Optional[ByCurrency]:
         try:
             value = balance[currency]
+            if _is_number(value["free"]) and _is_number(value["used"]) and _is_number(value["total"]):
+                return construct(ByCurrency, free=value["free"], used=value["used"], total=value["total"])
             return ByCurrency(free=value["free"], used=value["used"], total=value["total"])
         except KeyError:
             return None
@@ -381,7 +623,13 @@ class CctxExchangeManager(ExchangeManager):
         return result
 
     def _map_order(self, exchange: Exchange, bot_config: BotConfig, pair: TradingPair, order) -> Order:
-        return Order(
+        if not (_is_number(order["timestamp"]) and _is_number(order["price"]) and _is_number(order["amount"])):
+            # validated, raises as the required fields are missing
+            return Order(**self._map_order_fields(exchange, bot_config, pair, order))
+        return construct(Order, **self._map_order_fields(exchange, bot_config, pair, order))
+
+    def _map_order_fields(self, exchange: Exchange, bot_config: BotConfig, pair: TradingPair, order) -> Dict[str, Any]:
+        return dict(
             id=order["id"],
             exchange_id=exchange.id,
             bot_id=bot_config.id,
@@ -415,6 +663,10 @@ class CctxExchangeManager(ExchangeManager):
         if fee:
             currency = self._nvl(fee, "currency", None)
             if currency:
+                cost = self._nvl(fee, "cost", 0.0)
+                rate = self._nvl(fee, "rate", 0.0)
+                if _is_number(cost) and _is_number(rate):
+                    return construct(Fee, currency=currency, cost=cost, rate=rate)
                 return Fee(
                     currency=currency,
                     cost=self._nvl(fee, "cost", 0.0),
@@ -442,23 +694,61 @@ class CctxExchangeManager(ExchangeManager):
         result = self._map_order(exchange, bot_config, bot_config.pair, order)
         return result
 
+    def fetch_orders(self, exchange: Exchange, bot_config: BotConfig, order_ids: List[str]) -> Dict[str, Order]:
+        orders: Dict[str, Order] = {}
+        if not order_ids:
+            return orders
+        conn = self._connect(exchange)
+        symbol = str(bot_config.pair)
+        pending_ids = set(order_ids)
+        for method in self._get_bulk_fetch_orders_methods(conn):
+            if not pending_ids:
+                break
+            key = (method, *self._get_connection_key(exchange), symbol)
+            try:
+                fetched_orders = self._orders_cache.get(key, lambda: self._request_orders(conn, method, symbol))
+            except Exception as err:
+                self._logger.warning("Cannot %s %s from %s: %s", method, symbol, exchange.id.value, err)
+                continue
+            self._index_orders(exchange, bot_config, fetched_orders, pending_ids, orders)
+        self._logger.debug("Fetched %d of %d orders from %s in bulk", len(orders), len(order_ids), exchange.id.value)
+        return orders
+
+    @staticmethod
+    def _get_bulk_fetch_orders_methods(conn) -> List[str]:
+        # open orders first, they are the ones still active, then the recently closed ones
+        methods = []
+        if conn.has.get("fetchOpenOrders"):
+            methods.append("fetch_open_orders")
+        if conn.has.get("fetchClosedOrders"):
+            methods.append("fetch_closed_orders")
+        elif conn.has.get("fetchOrders"):
+            methods.append("fetch_orders")
+        return methods
+
+    def _request_orders(self, connection, method: str, symbol: str) -> List[Dict]:
+        return getattr(connection, method)(symbol)
+
+    def _index_orders(self, exchange: Exchange, bot_config: BotConfig, fetched_orders: List[Dict], pending_ids: Set[str], orders: Dict[str, Order]):
+        for order in fetched_orders:
+            if order["id"] in pending_ids:
+                orders[order["id"]] = self._map_order(exchange, bot_config, bot_config.pair, order)
+                pending_ids.discard(order["id"])
+
     def get_precision_amount(self, exchange: Exchange, pair: TradingPair) -> float:
         # min order size
         # TODO:add testing on elena_test.py, add to generic_bot, set on status?
-        conn = self._connect(exchange)
-        return float(conn.markets[str(pair)]["precision"]["amount"])
+        return float(self._get_market(exchange, pair)["precision"]["amount"])
 
     def get_precision_price(self, exchange: Exchange, pair: TradingPair) -> float:
         # min order size
         # TODO:add testing on elena_test.py, add to generic_bot, set on status?
-        conn = self._connect(exchange)
-        return float(conn.markets[str(pair)]["precision"]["price"])
+        return float(self._get_market(exchange, pair)["precision"]["price"])
 
     def limit_min_amount(self, exchange: Exchange, pair: TradingPair) -> float:
         # min order size
-        conn = self._connect(exchange)
         try:
-            min = float(conn.markets[str(pair)]["limits"]["amount"]["min"])
+            min = float(self._get_market(exchange, pair)["limits"]["amount"]["min"])
         except (ValueError, KeyError):
             min = 0.0
         return min
@@ -466,24 +756,24 @@ class CctxExchangeManager(ExchangeManager):
     def limit_min_cost(self, exchange: Exchange, pair: TradingPair) -> float:
         # min order price
         # TODO:add testing on elena_test.py
-        conn = self._connect(exchange)
         try:
-            min = float(conn.markets[str(pair)]["limits"]["cost"]["min"])
+            min = float(self._get_market(exchange, pair)["limits"]["cost"]["min"])
         except (ValueError, KeyError):
             min = 0.0
         return min
 
     def amount_to_precision(self, exchange: Exchange, pair: TradingPair, amount: float) -> float:
-        conn = self._connect(exchange)
-        min_amount = float(conn.markets[str(pair)]["limits"]["amount"]["min"])
+        min_amount = float(self._get_market(exchange, pair)["limits"]["amount"]["min"])
         if amount > min_amount:
+            conn = self._connect(exchange)
             return float(conn.amount_to_precision(str(pair), amount))
         else:
             return 0.0
 
     def price_to_precision(self, exchange: Exchange, pair: TradingPair, price: float) -> float:
-        conn = self._connect(exchange)
         if price > 0:
+            self._get_market(exchange, pair)
+            conn = self._connect(exchange)
             return float(conn.price_to_precision(str(pair), price))
         else:
             return 0.0
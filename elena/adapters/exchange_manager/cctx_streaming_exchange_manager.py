@@ -0,0 +1,289 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import ccxt.async_support as ccxt_async
+import ccxt.pro as ccxt_pro
+import pandas as pd
+
+from elena.adapters.exchange_manager.cctx_async_exchange_manager import CctxAsyncExchangeManager
+from elena.domain.model.bot_config import BotConfig
+from elena.domain.model.exchange import Exchange, ExchangeType
+from elena.domain.model.order import Order, OrderSide, OrderType
+from elena.domain.model.order_book import OrderBook, OrderBookSource
+from elena.domain.model.time_frame import TimeFrame
+from elena.domain.model.trading_pair import TradingPair
+from elena.domain.ports.logger import Logger
+from elena.domain.ports.storage_manager import StorageManager
+
+# the exchanges without ccxt.pro support are read by REST only
+_PRO_CONNECT_MAPPER = {exchange_type: getattr(ccxt_pro, exchange_type.value, getattr(ccxt_async, exchange_type.value)) for exchange_type in ExchangeType}
+
+_MAX_STREAMED_ORDERS = 1000  # orders kept by every orders stream, the least recently updated are dropped first
+
+
+class _Stream:
+    """A watch loop running on the adapter loop and the data it keeps up to date"""
+
+    def __init__(self, data: Any):
+        self.data = data
+        self.task: Optional[asyncio.Task] = None
+        self.subscribed = 0.0  # first update since the last error, the subscription is live from then on
+        self.updated = 0.0  # last update since the last error, 0.0 until the first one
+        self.failed = False
+        self.seed_limit = 0  # candles of the REST read the stream was seeded with, candles streams only
+
+
+class CctxStreamingExchangeManager(CctxAsyncExchangeManager):
+    """
+    CctxAsyncExchangeManager on ccxt.pro that streams the order books, candles and orders of the pairs it is asked for.
+    The first read of a pair starts a watch loop on the adapter loop and is answered by REST, the next ones from the memory
+    the watch loops keep up to date, or by REST again while the stream is stale or broken. Meant for daemon deployments,
+    where the streams stay warm between cycles.
+    """
+
+    _connect_mapper = _PRO_CONNECT_MAPPER
+    _streams: Dict[Tuple, _Stream]
+    _stale_seconds: float
+    _retry_seconds: float
+
+    def init(self, config: Dict, logger: Logger, storage_manager: StorageManager):
+        super().init(config, logger, storage_manager)
+        self._streams = {}
+        self._stale_seconds = self._config.get("stream_stale_seconds", 10)
+        self._retry_seconds = self._config.get("stream_retry_seconds", 5)
+
+    async def _close(self):
+        streams, self._streams = self._streams, {}
+        for stream in streams.values():
+            stream.task.cancel()  # type: ignore
+        await asyncio.gather(*[stream.task for stream in streams.values()], return_exceptions=True)
+        await super()._close()
+
+    def _get_stream(self, key: Tuple, connection, method: str, watch: Callable, on_update: Callable[[_Stream, Any], None], data: Any) -> Optional[_Stream]:
+        # runs on the adapter loop, None when the exchange cannot stream
+        stream = self._streams.get(key)
+        if stream is None:
+            if connection is None or not connection.has.get(method):
+                return None
+            stream = _Stream(data)
+            stream.task = self._loop.create_task(self._watch(key, stream, watch, on_update))
+            self._streams[key] = stream
+            self._logger.info("Streaming %s", key)
+        return stream
+
+    async def _watch(self, key: Tuple, stream: _Stream, watch: Callable, on_update: Callable[[_Stream, Any], None]):
+        while True:
+            try:
+                update = await watch()
+            except Exception as err:
+                self._logger.warning("Stream %s failed, retrying in %s seconds: %s", key, self._retry_seconds, err)
+                stream.failed = True
+                stream.subscribed = 0.0
+                stream.updated = 0.0
+                if key[0] == "candles":
+                    # the candles of the outage are missing, the next read is answered by REST and reseeds the buffer
+                    stream.data = {}
+                    stream.seed_limit = 0
+                await asyncio.sleep(self._retry_seconds)
+                stream.failed = False
+                continue
+            now = time.monotonic()
+            if stream.subscribed == 0.0:
+                stream.subscribed = now
+            on_update(stream, update)
+            stream.updated = now
+
+    def _is_fresh(self, stream: Optional[_Stream]) -> bool:
+        return stream is not None and stream.updated > 0.0 and time.monotonic() - stream.updated <= self._stale_seconds
+
+    @staticmethod
+    def _is_subscribed(stream: _Stream) -> bool:
+        # orders streams are quiet while no order changes, they are live from the first update until an error
+        return stream.subscribed > 0.0 and not stream.failed and stream.task is not None and not stream.task.done()
+
+    def read_order_book(self, exchange: Exchange, pair: TradingPair, depth: Optional[int] = None, sources: Optional[List[OrderBookSource]] = None) -> OrderBook:
+        ob = self._run(self._read_streamed_order_book(exchange, pair, depth))
+        if ob is None:
+            return super().read_order_book(exchange, pair, depth, sources)
+        return ob
+
+    async def read_order_book_async(self, exchange: Exchange, pair: TradingPair, depth: Optional[int] = None, sources: Optional[List[OrderBookSource]] = None) -> OrderBook:
+        ob = await self._read_streamed_order_book(exchange, pair, depth)
+        if ob is None:
+            return await super().read_order_book_async(exchange, pair, depth, sources)
+        return ob
+
+    async def _read_streamed_order_book(self, exchange: Exchange, pair: TradingPair, depth: Optional[int]) -> Optional[OrderBook]:
+        # the whole book is streamed, deeper than any depth, and cheaper than any source
+        conn = await self._connect_async(exchange)
+        key = ("order_book", exchange.id, exchange.sandbox_mode, str(pair))
+        stream = self._get_stream(key, conn, "watchOrderBook", lambda: conn.watch_order_book(str(pair)), self._update_order_book, None)
+        if not self._is_fresh(stream):
+            return None
+        ob = stream.data  # type: ignore
+        self._logger.debug("Read the %s order book from the %s stream", pair, exchange.id.value)
+        return OrderBook(bids=ob["bids"][:depth], asks=ob["asks"][:depth])
+
+    @staticmethod
+    def _update_order_book(stream: _Stream, ob: Dict):
+        # ccxt.pro keeps the book up to date in place, it is copied to arrays when read
+        stream.data = ob
+
+    def read_candles(
+        self,
+        exchange: Exchange,
+        pair: TradingPair,
+        time_frame: TimeFrame = TimeFrame.min_1,  # type: ignore
+        page_size: int = 100,
+    ) -> pd.DataFrame:
+        candles = self._run(self._read_streamed_candles(exchange, pair, time_frame, page_size))
+        if candles is None:
+            candles = super().read_candles(exchange, pair, time_frame, page_size)
+            self._run(self._seed_candles(exchange, pair, time_frame, page_size, candles))
+        return candles
+
+    async def read_candles_async(
+        self,
+        exchange: Exchange,
+        pair: TradingPair,
+        time_frame: TimeFrame = TimeFrame.min_1,  # type: ignore
+        page_size: int = 100,
+    ) -> pd.DataFrame:
+        candles = await self._read_streamed_candles(exchange, pair, time_frame, page_size)
+        if candles is None:
+            candles = await super().read_candles_async(exchange, pair, time_frame, page_size)
+            await self._seed_candles(exchange, pair, time_frame, page_size, candles)
+        return candles
+
+    @staticmethod
+    def _get_candles_key(exchange: Exchange, pair: TradingPair, time_frame: TimeFrame) -> Tuple:
+        return "candles", exchange.id, exchange.sandbox_mode, str(pair), time_frame
+
+    async def _read_streamed_candles(self, exchange: Exchange, pair: TradingPair, time_frame: TimeFrame, page_size: int) -> Optional[pd.DataFrame]:
+        # watch_ohlcv only has the candles since the subscription, the older ones are seeded from the first REST read
+        conn = await self._connect_async(exchange)
+        key = self._get_candles_key(exchange, pair, time_frame)
+        stream = self._get_stream(key, conn, "watchOHLCV", lambda: conn.watch_ohlcv(str(pair), time_frame.value), self._update_candles, {})
+        limit = max(page_size, self._config["fetch_ohlcv_limit"])
+        if not self._is_fresh(stream) or stream.seed_limit < limit:  # type: ignore
+            return None
+        candles = self._map_candles(sorted(stream.data.values())[-limit:])  # type: ignore
+        self._logger.info("Read %d %s candles from the %s stream", candles.shape[0], pair, exchange.id.value)
+        return candles
+
+    async def _seed_candles(self, exchange: Exchange, pair: TradingPair, time_frame: TimeFrame, page_size: int, candles: pd.DataFrame):
+        stream = self._streams.get(self._get_candles_key(exchange, pair, time_frame))
+        if stream is None:
+            return
+        # the streamed candles are newer than the REST ones
+        for row in candles[self._candles_columns].itertuples(index=False):
+            stream.data.setdefault(int(row[0]), [int(row[0]), *row[1:]])
+        stream.seed_limit = max(stream.seed_limit, max(page_size, self._config["fetch_ohlcv_limit"]))
+
+    def _update_candles(self, stream: _Stream, ohlcv: List[List]):
+        for candle in ohlcv:
+            stream.data[candle[0]] = candle
+        limit = max(stream.seed_limit, self._config["fetch_ohlcv_limit"])
+        if len(stream.data) > 2 * limit:
+            stream.data = {candle[0]: candle for candle in sorted(stream.data.values())[-limit:]}
+
+    def _get_orders_stream(self, exchange: Exchange, connection, pair: TradingPair) -> Optional[_Stream]:
+        key = ("orders", *self._get_connection_key(exchange), str(pair))
+        return self._get_stream(key, connection, "watchOrders", lambda: connection.watch_orders(str(pair)), self._update_orders, {})
+
+    @staticmethod
+    def _update_orders(stream: _Stream, orders: List[Dict]):
+        now = time.monotonic()
+        for order in orders:
+            stream.data.pop(order["id"], None)
+            stream.data[order["id"]] = (now, order)
+        while len(stream.data) > _MAX_STREAMED_ORDERS:
+            del stream.data[next(iter(stream.data))]
+
+    @staticmethod
+    def _record_order(stream: Optional[_Stream], order: Dict, requested: float):
+        # a REST order is kept, but not over a streamed update received while it was requested
+        if stream is not None:
+            recorded = stream.data.get(order["id"])
+            if recorded is None or recorded[0] < requested:
+                stream.data[order["id"]] = (requested, order)
+
+    def _get_streamed_order(self, stream: Optional[_Stream], order_id: str) -> Optional[Dict]:
+        # known since the subscription was live, so every later change of the order has been streamed,
+        # resting orders get no updates and are trusted for as long as the subscription stays live
+        if stream is None or not self._is_subscribed(stream):
+            return None
+        recorded = stream.data.get(order_id)
+        if recorded is None or recorded[0] < stream.subscribed:
+            return None
+        return recorded[1]
+
+    async def place_order_async(
+        self,
+        exchange: Exchange,
+        bot_config: BotConfig,
+        order_type: OrderType,
+        side: OrderSide,
+        amount: float,
+        price: Optional[float] = None,
+        params: Optional[Dict] = {},
+    ) -> Order:
+        conn = await self._connect_async(exchange)
+        stream = self._get_orders_stream(exchange, conn, bot_config.pair)
+        requested = time.monotonic()
+        order = await conn.create_order(
+            symbol=str(bot_config.pair),
+            type=order_type.value,
+            side=side.value,
+            amount=amount,
+            price=price,
+            params=params,
+        )
+        self._record_order(stream, order, requested)
+        return self._map_order(exchange, bot_config, bot_config.pair, order)
+
+    async def cancel_order_async(self, exchange: Exchange, bot_config: BotConfig, order_id: str) -> Order:
+        conn = await self._connect_async(exchange)
+        stream = self._get_orders_stream(exchange, conn, bot_config.pair)
+        requested = time.monotonic()
+        order = await conn.cancel_order(id=order_id, symbol=str(bot_config.pair))
+        self._logger.info("Canceled order: %s", order_id)
+        self._record_order(stream, order, requested)
+        return self._map_order(exchange, bot_config, bot_config.pair, order)
+
+    async def fetch_order_async(self, exchange: Exchange, bot_config: BotConfig, order_id: str) -> Order:
+        conn = await self._connect_async(exchange)
+        stream = self._get_orders_stream(exchange, conn, bot_config.pair)
+        order = self._get_streamed_order(stream, order_id)
+        if order is None:
+            requested = time.monotonic()
+            order = await conn.fetch_order(id=order_id, symbol=str(bot_config.pair))
+            self._record_order(stream, order, requested)
+        return self._map_order(exchange, bot_config, bot_config.pair, order)
+
+    def fetch_orders(self, exchange: Exchange, bot_config: BotConfig, order_ids: List[str]) -> Dict[str, Order]:
+        orders = self._run(self._read_streamed_orders(exchange, bot_config, order_ids))
+        missing_ids = [order_id for order_id in order_ids if order_id not in orders]
+        if missing_ids:
+            orders.update(super().fetch_orders(exchange, bot_config, missing_ids))
+        return orders
+
+    async def fetch_orders_async(self, exchange: Exchange, bot_config: BotConfig, order_ids: List[str]) -> Dict[str, Order]:
+        orders = await self._read_streamed_orders(exchange, bot_config, order_ids)
+        missing_ids = [order_id for order_id in order_ids if order_id not in orders]
+        if missing_ids:
+            orders.update(await super().fetch_orders_async(exchange, bot_config, missing_ids))
+        return orders
+
+    async def _read_streamed_orders(self, exchange: Exchange, bot_config: BotConfig, order_ids: List[str]) -> Dict[str, Order]:
+        orders: Dict[str, Order] = {}
+        if not order_ids:
+            return orders
+        conn = await self._connect_async(exchange)
+        stream = self._get_orders_stream(exchange, conn, bot_config.pair)
+        for order_id in order_ids:
+            order = self._get_streamed_order(stream, order_id)
+            if order is not None:
+                orders[order_id] = self._map_order(exchange, bot_config, bot_config.pair, order)
+        return orders
@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class RequestCache:
+    """
+    Shares the result of identical exchange requests during a freshness window.
+    Concurrent callers of the same key wait for the request in flight instead of sending their own.
+    Failed requests are not cached and expired values are evicted, so long running processes do not keep them.
+    """
+
+    def __init__(self, freshness_seconds: float):
+        self._freshness_seconds = freshness_seconds
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._values: Dict[Hashable, Tuple[float, Any]] = {}
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._next_eviction = 0.0
+
+    def get(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        if self._freshness_seconds <= 0:
+            return fetch()
+        with self._lock:
+            self._evict_expired(time.monotonic())
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            cached = self._values.get(key)
+            if cached and time.monotonic() - cached[0] < self._freshness_seconds:
+                return cached[1]
+            value = fetch()
+            with self._lock:
+                self._values[key] = (time.monotonic(), value)
+            return value
+
+    async def get_async(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        # the values are shared with the threads, concurrent coroutines wait for the task of the request in flight
+        if self._freshness_seconds <= 0:
+            return await fetch()
+        with self._lock:
+            self._evict_expired(time.monotonic())
+            cached = self._values.get(key)
+            if cached and time.monotonic() - cached[0] < self._freshness_seconds:
+                return cached[1]
+            task = self._tasks.get(key)
+            if task is None:
+                task = asyncio.ensure_future(self._fetch_async(key, fetch))
+                self._tasks[key] = task
+        # a cancelled caller does not cancel the request the others wait for
+        return await asyncio.shield(task)
+
+    async def _fetch_async(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await fetch()
+            with self._lock:
+                self._values[key] = (time.monotonic(), value)
+            return value
+        finally:
+            with self._lock:
+                self._tasks.pop(key, None)
+
+    def _evict_expired(self, now: float):
+        # at most once per freshness window, callers hold self._lock
+        if now < self._next_eviction:
+            return
+        self._next_eviction = now + self._freshness_seconds
+        for key in [key for key, (fetched, _) in self._values.items() if now - fetched >= self._freshness_seconds]:
+            del self._values[key]
+        for key in [key for key, key_lock in self._key_locks.items() if key not in self._values and not key_lock.locked()]:
+            del self._key_locks[key]
+
+    def clear(self):
+        with self._lock:
+            self._values = {}
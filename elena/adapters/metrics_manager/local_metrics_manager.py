@@ -1,22 +1,129 @@
-from typing import List
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
 
+from elena.domain.model.metric import Metric
 from elena.domain.ports.logger import Logger
 from elena.domain.ports.metrics_manager import MetricsManager
-from elena.domain.ports.storage_manager import StorageManager
+from elena.domain.ports.storage_manager import StorageError, StorageManager
+
+_FULL_BUFFER_POLICIES = ["flush", "drop_newest", "drop_oldest"]
 
 
 class LocalMetricsManager(MetricsManager):
+    """
+    Writes metrics with StorageManager. With flush_interval_seconds > 0 metrics are aggregated in memory
+    (counters are added up, gauges and timers keep last/min/max/avg) and written in bulk by flush(), called at the end
+    of every cycle and from a background thread every flush_interval_seconds.
+    """
+
     _config: dict
     _logger: Logger
     _storage_manager: StorageManager
+    _flush_interval_seconds: float
+    _max_buffered_metrics: int
+    _full_buffer_policy: str
+    _buffer: Dict[Tuple, Metric]
+    _dropped: int
+    _lock: threading.Lock
+    _flush_lock: threading.Lock
+    _stop_event: threading.Event
+    _flush_thread: Optional[threading.Thread] = None
 
     def init(self, config: dict, logger: Logger, storage_manager: StorageManager):
         self._config = config
         self._logger = logger
         self._storage_manager = storage_manager
+        metrics_config = config.get("MetricsManager", {})
+        self._flush_interval_seconds = metrics_config.get("flush_interval_seconds", 0)
+        self._max_buffered_metrics = metrics_config.get("max_buffered_metrics", 10000)
+        self._full_buffer_policy = metrics_config.get("full_buffer_policy", "flush")
+        if self._full_buffer_policy not in _FULL_BUFFER_POLICIES:
+            raise ValueError(f"MetricsManager.full_buffer_policy must be one of {_FULL_BUFFER_POLICIES}")
+        self._buffer = {}
+        self._dropped = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        if self._flush_interval_seconds > 0:
+            self._flush_thread = threading.Thread(target=self._flush_periodically, name="LocalMetricsManager", daemon=True)
+            self._flush_thread.start()
 
     def counter(self, metric: str, bot_id: str, value: int, tags: List[str]):
-        self._storage_manager.append_metric(bot_id, metric, "counter", value, tags)
+        if self._flush_interval_seconds > 0:
+            self._add(metric, bot_id, "counter", value, tags)
+        else:
+            self._storage_manager.append_metric(bot_id, metric, "counter", value, tags)
 
     def gauge(self, metric: str, bot_id: str, value: float, tags: List[str]):
-        self._storage_manager.append_metric(bot_id, metric, "gauge", value, tags)
+        if self._flush_interval_seconds > 0:
+            self._add(metric, bot_id, "gauge", value, tags)
+        else:
+            self._storage_manager.append_metric(bot_id, metric, "gauge", value, tags)
+
+    def timer(self, metric: str, bot_id: str, value: float, tags: List[str]):
+        if self._flush_interval_seconds > 0:
+            self._add(metric, bot_id, "timer", value, tags)
+        else:
+            self._storage_manager.append_metric(bot_id, metric, "timer", value, tags)
+
+    def _add(self, metric_name: str, bot_id: str, metric_type: str, value: float, tags: List[str]):
+        key = (bot_id, metric_name, metric_type, tuple(tags))
+        timestamp = int(time.time() * 1000)
+        with self._lock:
+            metric = self._buffer.get(key)
+            if metric is None:
+                if len(self._buffer) >= self._max_buffered_metrics and self._full_buffer_policy != "flush":
+                    self._dropped += 1
+                    if self._full_buffer_policy == "drop_newest":
+                        return
+                    del self._buffer[next(iter(self._buffer))]
+                self._buffer[key] = self._new_metric(timestamp, bot_id, metric_name, metric_type, value, tags)
+            else:
+                self._aggregate(metric, timestamp, value)
+            flush = self._full_buffer_policy == "flush" and len(self._buffer) >= self._max_buffered_metrics
+        if flush:
+            self.flush()
+
+    @staticmethod
+    def _new_metric(timestamp: int, bot_id: str, metric_name: str, metric_type: str, value: float, tags: List[str]) -> Metric:
+        if metric_type != "counter":
+            return Metric(timestamp=timestamp, bot_id=bot_id, metric_name=metric_name, metric_type=metric_type, value=value, tags=tags, min=value, max=value, avg=value)
+        return Metric(timestamp=timestamp, bot_id=bot_id, metric_name=metric_name, metric_type=metric_type, value=value, tags=tags)
+
+    @staticmethod
+    def _aggregate(metric: Metric, timestamp: int, value: float):
+        metric.timestamp = timestamp
+        metric.count += 1
+        if metric.metric_type != "counter":
+            metric.value = value
+            metric.min = min(metric.min, value)  # type: ignore
+            metric.max = max(metric.max, value)  # type: ignore
+            metric.avg = metric.avg + (value - metric.avg) / metric.count  # type: ignore
+        else:
+            metric.value += value
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                metrics = list(self._buffer.values())
+                self._buffer = {}
+                dropped, self._dropped = self._dropped, 0
+            if dropped:
+                self._logger.warning("Metrics buffer full, %d metrics dropped", dropped)
+            if not metrics:
+                return
+            try:
+                self._storage_manager.append_metrics(metrics)
+            except StorageError as err:
+                self._logger.error("Error writing %d metrics: %s", len(metrics), err)
+
+    def _flush_periodically(self):
+        while not self._stop_event.wait(self._flush_interval_seconds):
+            self.flush()
+
+    def close(self):
+        self._stop_event.set()
+        if self._flush_thread:
+            self._flush_thread.join()
+        self.flush()
@@ -1,14 +1,23 @@
-import json
 import time
 from abc import abstractmethod
-from typing import Any, Dict, Optional, Union, List
+from typing import Any, Dict, Optional, Sequence, Tuple, Type, Union, List
 
+import numpy as np
+import pandas as pd
 import pydantic
 from pydantic import BaseModel
 
+from elena.adapters.storage_manager import model_codec
 from elena.domain.model.bot_status import BotStatus
+from elena.domain.model.exchange import ExchangeType
+from elena.domain.model.exchange_markets import ExchangeMarkets
+from elena.domain.model.metric import Metric
+from elena.domain.model.order import Order
+from elena.domain.model.schedule_index import ScheduleIndex
+from elena.domain.model.trade import Trade
 from elena.domain.ports.logger import Logger
 from elena.domain.ports.storage_manager import StorageError, StorageManager
+from elena.shared import json_codec
 from elena.shared.dynamic_loading import get_class
 
 
@@ -22,6 +31,7 @@ class Record(BaseModel):
 
 class FileStorageManager(StorageManager):
     _logger: Logger
+    _metric_filepaths: Dict[str, Tuple[str, str]]
 
     @abstractmethod
     def init(self, config: dict, logger: Logger):
@@ -35,29 +45,89 @@ class FileStorageManager(StorageManager):
         filepath = self._get_filepath(file_path=class_name, file_name=data_id)
         self._logger.debug("Loading %s %s from storage: %s", class_name, data_id, filepath)
         try:
-            json_data = self._load_file(filepath)
+            record_dict = json_codec.loads(self._load_file(filepath))
         except Exception as err:
-            raise StorageError(f"Error loading {class_name} {data_id}: {err}") from err
-        record_dict = json.loads(json_data)
-        record = Record.parse_obj(record_dict)
+            record_dict = self._load_backup(filepath, class_name, data_id, err)
+        # the value is validated by its own class
+        record = Record.construct(**record_dict)
         return self._from_record(record)
 
+    def _load_backup(self, filepath: str, class_name: str, data_id: str, err: Exception) -> Dict:
+        # the last good copy, newest first
+        for backup_filepath in self._get_backup_filepaths(filepath):
+            try:
+                record_dict = json_codec.loads(self._load_file(backup_filepath))
+            except Exception:
+                continue
+            self._logger.warning("Loaded %s %s from backup %s: %s", class_name, data_id, backup_filepath, err)
+            return record_dict
+        raise StorageError(f"Error loading {class_name} {data_id}: {err}") from err
+
     @classmethod
     def _from_record(self, record: Record) -> Any:
         try:
             _class = get_class(f"{record.class_module}.{record.class_name}")
-            return _class.parse_obj(record.value)
+            return model_codec.decode(_class, record.value)  # type: ignore
         except Exception as err:
             raise StorageError(f"Error deserializing {record.class_name} {record.id}: {err}") from err
 
     def save_bot_status(self, bot_status: BotStatus):
         """Insert or overwrite a bot status into storage, raise StorageError on failure"""
-        self._save(bot_status.bot_id, bot_status)
+        # the history only grows, it is appended to the bot archive and the status keeps the active state
+        self._append_archive(bot_status.bot_id, "ArchivedOrder", bot_status.archived_orders)
+        self._append_archive(bot_status.bot_id, "ClosedTrade", bot_status.closed_trades)
+        self._save(bot_status.bot_id, bot_status.copy(update={"archived_orders": [], "closed_trades": []}))
+
+    def save_bot_statuses(self, bot_statuses: List[BotStatus]):
+        """Insert or overwrite many bot statuses into storage, raise StorageError on failure"""
+        # files are not transactional, a failed status doesn't prevent saving the others
+        errors = []
+        failed_ids = []
+        for bot_status in bot_statuses:
+            try:
+                self.save_bot_status(bot_status)
+            except StorageError as err:
+                errors.append(str(err))
+                failed_ids.append(bot_status.bot_id)
+        if errors:
+            raise StorageError(", ".join(errors), failed_ids=failed_ids)
+
+    def _append_archive(self, bot_id: str, class_name: str, items: Sequence[BaseModel]):
+        if not items:
+            return
+        json_data = "\n".join(json_codec.dumps(model_codec.encode(item)) for item in items)
+        filepath = self._get_filepath(file_path=f"{class_name}/{bot_id}", file_name=time.strftime("%y%m"), extension="jsonl")
+        self._logger.debug("Appending %d %s %s to storage: %s", len(items), class_name, bot_id, filepath)
+        try:
+            self._append_to_file(filepath, json_data)
+        except Exception as err:
+            raise StorageError(f"Error appending {class_name} {bot_id}: {err}") from err
+
+    def load_archived_orders(self, bot_id: str) -> List[Order]:
+        """Load all the archived orders of a bot from storage, raise StorageError on failure"""
+        return self._load_archive(bot_id, "ArchivedOrder", Order)  # type: ignore
+
+    def load_closed_trades(self, bot_id: str) -> List[Trade]:
+        """Load all the closed trades of a bot from storage, raise StorageError on failure"""
+        return self._load_archive(bot_id, "ClosedTrade", Trade)  # type: ignore
+
+    def _load_archive(self, bot_id: str, class_name: str, _class: Type[BaseModel]) -> List[BaseModel]:
+        file_path = f"{class_name}/{bot_id}"
+        self._logger.debug("Loading %s %s from storage", class_name, bot_id)
+        try:
+            # a status saved again after a failure appends the same lines, they are read once
+            lines: Dict[str, None] = {}
+            for segment in self._list_files(file_path=file_path, extension="jsonl"):
+                json_data = self._load_file(self._get_filepath(file_path=file_path, file_name=segment, extension="jsonl"))
+                lines.update(dict.fromkeys(line for line in json_data.splitlines() if line))
+            return [model_codec.decode(_class, json_codec.loads(line)) for line in lines]
+        except Exception as err:
+            raise StorageError(f"Error loading {class_name} {bot_id}: {err}") from err
 
     def _save(self, data_id: str, data: Any):
         record = self._to_record(data_id, data)
-        record_dict = record.dict()
-        json_data = json.dumps(record_dict, indent=4)
+        # dict(record) keeps the value as it is, record.dict() would copy it again
+        json_data = json_codec.dumps(dict(record))
         filepath = self._get_filepath(file_path=record.class_name, file_name=data_id)
         self._logger.debug("Saving %s %s to storage: %s", record.class_name, data_id, filepath)
         try:
@@ -68,10 +138,10 @@ class FileStorageManager(StorageManager):
     @staticmethod
     def _to_record(data_id: str, data: Any, name: Optional[str] = None) -> Record:
         if isinstance(data, pydantic.BaseModel):
-            value = data.dict()
+            value = model_codec.encode(data)
         else:
             raise Exception(f"Un-implemented serialization for type {data.__class__.__name__}")
-        return Record(
+        return Record.construct(
             id=data_id,
             class_module=data.__class__.__module__,
             class_name=data.__class__.__qualname__,
@@ -91,6 +161,79 @@ class FileStorageManager(StorageManager):
         except Exception as err:
             raise StorageError(f"Error deleting BotStatus {class_name} {data_id}: {err}") from err
 
+    def load_schedule_index(self, strategy_id: str) -> ScheduleIndex:
+        """Load the bots schedule index of a strategy from storage, raise StorageError on failure"""
+        return self._load(strategy_id, "ScheduleIndex")  # type: ignore
+
+    def save_schedule_index(self, schedule_index: ScheduleIndex):
+        """Insert or overwrite the bots schedule index of a strategy into storage, raise StorageError on failure"""
+        self._save(schedule_index.strategy_id, schedule_index)
+
+    def load_exchange_markets(self, exchange_id: ExchangeType, sandbox_mode: bool) -> ExchangeMarkets:
+        """Load the markets of an exchange from storage, raise StorageError on failure"""
+        return self._load(ExchangeMarkets.build_id(exchange_id, sandbox_mode), "ExchangeMarkets")  # type: ignore
+
+    def save_exchange_markets(self, exchange_markets: ExchangeMarkets):
+        """Insert or overwrite the markets of an exchange into storage, raise StorageError on failure"""
+        self._save(exchange_markets.id, exchange_markets)
+
+    _candles_columns = ["Open time", "Open", "High", "Low", "Close", "Volume"]
+    _candles_partition_milliseconds = 24 * 60 * 60 * 1000
+
+    def load_candles(self, candles_id: str, limit: Optional[int] = None) -> pd.DataFrame:
+        """Load the last `limit` (all if None) stored market candles from storage, raise StorageError on failure"""
+        # Candles are stored as float64 NumPy arrays partitioned by UTC day, only the needed partitions are read
+        file_path = f"Candles/{candles_id}"
+        self._logger.debug("Loading Candles %s from storage", candles_id)
+        try:
+            partitions = self._list_files(file_path=file_path, extension="npy")
+            if not partitions:
+                raise FileNotFoundError(f"No stored candles for {candles_id}")
+            arrays: List[np.ndarray] = []
+            rows = 0
+            for partition in reversed(partitions):
+                array = self._load_array(self._get_filepath(file_path=file_path, file_name=partition, extension="npy"))
+                arrays.insert(0, array)
+                rows += array.shape[0]
+                if limit and rows >= limit:
+                    break
+            candles = arrays[0] if len(arrays) == 1 else np.concatenate(arrays)
+        except Exception as err:
+            raise StorageError(f"Error loading Candles {candles_id}: {err}") from err
+        if limit:
+            candles = candles[-limit:]
+        return self._candles_from_array(candles)
+
+    def _candles_from_array(self, candles: np.ndarray) -> pd.DataFrame:
+        # a view on the (memory mapped) array, only the Open time column is copied
+        df = pd.DataFrame(candles, columns=self._candles_columns, copy=False)
+        df["Open time"] = df["Open time"].astype(np.int64)
+        return df
+
+    def append_candles(self, candles_id: str, candles: pd.DataFrame):
+        """Insert market candles into storage overwriting the ones with the same open time, raise StorageError on failure"""
+        file_path = f"Candles/{candles_id}"
+        self._logger.debug("Saving %d Candles %s to storage", candles.shape[0], candles_id)
+        array = candles[self._candles_columns].to_numpy(dtype=np.float64)
+        days = array[:, 0] // self._candles_partition_milliseconds
+        try:
+            for day in np.unique(days):
+                file_name = time.strftime("%Y%m%d", time.gmtime(day * self._candles_partition_milliseconds / 1000))
+                filepath = self._get_filepath(file_path=file_path, file_name=file_name, extension="npy")
+                self._save_array(filepath, self._merge_candles_partition(filepath, array[days == day]))
+        except Exception as err:
+            raise StorageError(f"Error saving Candles {candles_id}: {err}") from err
+
+    def _merge_candles_partition(self, filepath: str, new_candles: np.ndarray) -> np.ndarray:
+        try:
+            stored_candles = self._load_array(filepath)
+        except FileNotFoundError:
+            return new_candles
+        merged = np.concatenate([stored_candles, new_candles])
+        # keep the last candle for every open time, sorted by open time
+        _, last_indexes = np.unique(merged[::-1, 0], return_index=True)
+        return merged[::-1][last_indexes]
+
     def append_metric(self, bot_id: str, metric_name: str, metric_type: str, value: Union[int, float], tags: List[str]):
         data = {
             "timestamp": self._get_time(),
@@ -100,18 +243,62 @@ class FileStorageManager(StorageManager):
             "value": value,
             "tags": "#".join(tags) or "",
         }
-        json_data = json.dumps(data, separators=(",", ":"))
-        today = time.strftime("%y%m%d")
-        filepath = self._get_filepath(
-            file_path=f"Metric/{bot_id}",
-            file_name=today,
-            extension="jsonl",
-        )
+        json_data = json_codec.dumps(data)
+        filepath = self._get_metric_filepath(bot_id, time.strftime("%y%m%d"))
         try:
-            self._append_to_file(filepath, json_data)
+            self._append_to_metric_file(filepath, json_data)
         except Exception as err:
             raise StorageError(f"Error appending Metric {metric_name} {bot_id}: {err}") from err
 
+    def append_metrics(self, metrics: List[Metric]):
+        """Insert many, possibly aggregated, metrics into storage in bulk, raise StorageError on failure"""
+        # one append for every bot and day file
+        files: Dict[Tuple[str, str], List[str]] = {}
+        for metric in metrics:
+            day = time.strftime("%y%m%d", time.localtime(metric.timestamp / 1000))
+            files.setdefault((metric.bot_id, day), []).append(self._metric_to_json(metric))
+        for (bot_id, day), lines in files.items():
+            filepath = self._get_metric_filepath(bot_id, day)
+            try:
+                self._append_to_metric_file(filepath, "\n".join(lines))
+            except Exception as err:
+                raise StorageError(f"Error appending {len(lines)} Metric {bot_id}: {err}") from err
+
+    def _get_metric_filepath(self, bot_id: str, day: str) -> str:
+        # resolved once a day for every bot
+        day_filepath = self._metric_filepaths.get(bot_id)
+        if day_filepath and day_filepath[0] == day:
+            return day_filepath[1]
+        filepath = self._get_filepath(file_path=f"Metric/{bot_id}", file_name=day, extension="jsonl")
+        self._metric_filepaths[bot_id] = (day, filepath)
+        if day_filepath and day_filepath[0] < day:
+            self._release_metric_file(day_filepath[1])
+        return filepath
+
+    def _append_to_metric_file(self, filepath: str, json_data: str):
+        self._append_to_file(filepath, json_data)
+
+    def _release_metric_file(self, filepath: str):
+        """Called when a metric file is not written anymore, i.e. on day rollover"""
+        pass
+
+    @staticmethod
+    def _metric_to_json(metric: Metric) -> str:
+        data = {
+            "timestamp": metric.timestamp,
+            "bot_id": metric.bot_id,
+            "metric_name": metric.metric_name,
+            "metric_type": metric.metric_type,
+            "value": metric.value,
+            "tags": "#".join(metric.tags) or "",
+        }
+        # single values are written as append_metric does
+        if metric.count > 1:
+            data["count"] = metric.count
+            if metric.metric_type != "counter":
+                data.update(min=metric.min, max=metric.max, avg=metric.avg)
+        return json_codec.dumps(data)
+
     @staticmethod
     def _get_time():
         return int(time.time() * 1000)
@@ -128,6 +315,11 @@ class FileStorageManager(StorageManager):
     def _save_file(self, filepath: str, json_data: str):
         ...
 
+    @abstractmethod
+    def _get_backup_filepaths(self, filepath: str) -> List[str]:
+        """Existing backups of a file saved with _save_file, newest first"""
+        ...
+
     @abstractmethod
     def _delete_file(self, filepath: str):
         ...
@@ -135,3 +327,16 @@ class FileStorageManager(StorageManager):
     @abstractmethod
     def _append_to_file(self, filepath: str, json_data: str):
         ...
+
+    @abstractmethod
+    def _list_files(self, file_path: str, extension: str) -> List[str]:
+        """Sorted file names, without extension, stored under file_path"""
+        ...
+
+    @abstractmethod
+    def _load_array(self, filepath: str) -> np.ndarray:
+        ...
+
+    @abstractmethod
+    def _save_array(self, filepath: str, array: np.ndarray):
+        ...
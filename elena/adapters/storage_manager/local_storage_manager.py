@@ -1,5 +1,14 @@
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from collections import OrderedDict
 from os import path
 from pathlib import Path
+from typing import IO, Iterator, List, Set
+
+import numpy as np
 
 from elena.adapters.storage_manager.file_storage_manager import FileStorageManager
 from elena.domain.ports.logger import Logger
@@ -7,16 +16,31 @@ from elena.domain.ports.logger import Logger
 
 class LocalStorageManager(FileStorageManager):
     _path: str
+    _backups: int
+    _fsync: bool
+    _created_dirs: Set[str]
+    _max_open_metric_files: int
+    _metric_files: "OrderedDict[str, IO]"
+    _metric_files_lock: threading.Lock
 
     def init(self, config: dict, logger: Logger):
         self._logger = logger
         self._path = path.join(config["home"], config["StorageManager"]["path"])
+        self._backups = config["StorageManager"].get("backups", 0)
+        self._fsync = config["StorageManager"].get("fsync", True)
+        self._max_open_metric_files = config["StorageManager"].get("max_open_metric_files", 0)
+        self._created_dirs = set()
+        self._metric_filepaths = {}
+        self._metric_files = OrderedDict()
+        self._metric_files_lock = threading.Lock()
         Path(self._path).mkdir(parents=True, exist_ok=True)
         self._logger.info("LocalStorageManager working at %s", self._path)
 
     def _get_filepath(self, file_path: str, file_name: str, extension: str = "json") -> str:
         dir_path = path.join(self._path, file_path)
-        Path(dir_path).mkdir(parents=True, exist_ok=True)
+        if dir_path not in self._created_dirs:
+            Path(dir_path).mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(dir_path)
         return path.join(dir_path, f"{file_name}.{extension}")
 
     def _load_file(self, filepath: str) -> str:
@@ -25,12 +49,112 @@ class LocalStorageManager(FileStorageManager):
         return json_data
 
     def _save_file(self, filepath: str, json_data: str):
-        with open(filepath, "w") as writer:
+        # written aside and renamed, so a crash never leaves a truncated file
+        with self._temp_file(filepath, "w") as (tmp_filepath, writer):
             writer.write(json_data)
+            if self._fsync:
+                writer.flush()
+                os.fsync(writer.fileno())
+        self._rotate_backups(filepath)
+        os.replace(tmp_filepath, filepath)
+        if self._fsync:
+            self._fsync_directory(path.dirname(filepath))
+
+    @staticmethod
+    @contextmanager
+    def _temp_file(filepath: str, mode: str) -> Iterator:
+        # unique per write, concurrent saves of the same file never share it
+        fd, tmp_filepath = tempfile.mkstemp(dir=path.dirname(filepath), prefix=f"{path.basename(filepath)}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, mode) as writer:
+                yield tmp_filepath, writer
+        except BaseException:
+            os.unlink(tmp_filepath)
+            raise
+
+    def _rotate_backups(self, filepath: str):
+        if not self._backups or not path.exists(filepath):
+            return
+        for i in range(self._backups - 1, 0, -1):
+            if path.exists(f"{filepath}.{i}"):
+                os.replace(f"{filepath}.{i}", f"{filepath}.{i + 1}")
+        # linked, not renamed, the file is only ever replaced by the new version
+        backup_filepath = f"{filepath}.1"
+        if path.exists(backup_filepath):
+            os.unlink(backup_filepath)
+        try:
+            os.link(filepath, backup_filepath)
+        except OSError:
+            # file systems without hard links
+            shutil.copy2(filepath, backup_filepath)
+
+    @staticmethod
+    def _fsync_directory(dir_path: str):
+        # makes the rename durable, not supported on every platform
+        try:
+            fd = os.open(dir_path, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def _get_backup_filepaths(self, filepath: str) -> List[str]:
+        return [f"{filepath}.{i}" for i in range(1, self._backups + 1) if path.exists(f"{filepath}.{i}")]
 
     def _delete_file(self, filepath: str):
         Path(filepath).unlink()
+        for backup_filepath in self._get_backup_filepaths(filepath):
+            Path(backup_filepath).unlink()
 
     def _append_to_file(self, filepath: str, json_data: str):
         with open(filepath, "a") as writer:
             writer.write(json_data + "\n")
+
+    def _append_to_metric_file(self, filepath: str, json_data: str):
+        if not self._max_open_metric_files:
+            self._append_to_file(filepath, json_data)
+            return
+        with self._metric_files_lock:
+            writer = self._metric_files.get(filepath)
+            if writer is None:
+                # least recently written files are closed first
+                while len(self._metric_files) >= self._max_open_metric_files:
+                    self._metric_files.popitem(last=False)[1].close()
+                writer = open(filepath, "a")
+                self._metric_files[filepath] = writer
+            else:
+                self._metric_files.move_to_end(filepath)
+            writer.write(json_data + "\n")
+            # readers see every line as with _append_to_file
+            writer.flush()
+
+    def _release_metric_file(self, filepath: str):
+        with self._metric_files_lock:
+            writer = self._metric_files.pop(filepath, None)
+            if writer is not None:
+                writer.close()
+
+    def close(self):
+        with self._metric_files_lock:
+            for writer in self._metric_files.values():
+                writer.close()
+            self._metric_files = OrderedDict()
+
+    def _list_files(self, file_path: str, extension: str) -> List[str]:
+        dir_path = Path(self._path, file_path)
+        if not dir_path.is_dir():
+            return []
+        return sorted(file.stem for file in dir_path.glob(f"*.{extension}"))
+
+    def _load_array(self, filepath: str) -> np.ndarray:
+        return np.load(filepath, mmap_mode="r")
+
+    def _save_array(self, filepath: str, array: np.ndarray):
+        # written aside and renamed, so readers never see a partial file
+        with self._temp_file(filepath, "wb") as (tmp_filepath, writer):
+            np.save(writer, array)
+        os.replace(tmp_filepath, filepath)
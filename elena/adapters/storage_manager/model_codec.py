@@ -0,0 +1,106 @@
+"""
+Fast conversion between the stored dicts and BotStatus, Order and Trade, the models with thousands of instances.
+The stored data was validated when the models were built, so they are rebuilt with construct() instead of parse_obj().
+The dicts are the same .dict() returns, any file written before can be read and vice versa.
+"""
+
+from typing import Any, Callable, Dict, Type
+
+from pydantic import BaseModel
+
+from elena.domain.model.bot_budget import BotBudget
+from elena.domain.model.bot_status import BotStatus
+from elena.domain.model.exchange import ExchangeType
+from elena.domain.model.order import Fee, Order, OrderSide, OrderStatusType, OrderType
+from elena.domain.model.trade import Trade
+from elena.domain.model.trading_pair import TradingPair
+from elena.shared.model_construct import construct
+
+
+def encode(data: BaseModel) -> Dict[str, Any]:
+    encoder = _ENCODERS.get(type(data))
+    return encoder(data) if encoder else data.dict()
+
+
+def decode(_class: Type[BaseModel], data: Dict[str, Any]) -> BaseModel:
+    decoder = _DECODERS.get(_class)
+    if decoder is not None:
+        try:
+            return decoder(data)
+        except (KeyError, TypeError, ValueError):
+            pass
+    # parse_obj reports what is wrong
+    return _class.parse_obj(data)
+
+
+def _encode_order(order: Order) -> Dict[str, Any]:
+    data = dict(order.__dict__)
+    data["pair"] = dict(order.pair.__dict__)
+    if order.fee is not None:
+        data["fee"] = dict(order.fee.__dict__)
+    return data
+
+
+def _decode_order(data: Dict[str, Any]) -> Order:
+    status = data.get("status")
+    fee = data.get("fee")
+    return construct(
+        Order,
+        data,
+        exchange_id=ExchangeType(data["exchange_id"]),
+        pair=TradingPair.construct(**data["pair"]),
+        type=OrderType(data["type"]),
+        side=OrderSide(data["side"]),
+        status=None if status is None else OrderStatusType(status),
+        fee=None if fee is None else Fee.construct(**fee),
+    )
+
+
+def _encode_trade(trade: Trade) -> Dict[str, Any]:
+    data = dict(trade.__dict__)
+    data["pair"] = dict(trade.pair.__dict__)
+    return data
+
+
+def _decode_trade(data: Dict[str, Any]) -> Trade:
+    return construct(
+        Trade,
+        data,
+        exchange_id=ExchangeType(data["exchange_id"]),
+        pair=TradingPair.construct(**data["pair"]),
+    )
+
+
+def _encode_bot_status(bot_status: BotStatus) -> Dict[str, Any]:
+    data = dict(bot_status.__dict__)
+    data["budget"] = dict(bot_status.budget.__dict__)
+    data["active_orders"] = [_encode_order(order) for order in bot_status.active_orders]
+    data["archived_orders"] = [_encode_order(order) for order in bot_status.archived_orders]
+    data["active_trades"] = [_encode_trade(trade) for trade in bot_status.active_trades]
+    data["closed_trades"] = [_encode_trade(trade) for trade in bot_status.closed_trades]
+    return data
+
+
+def _decode_bot_status(data: Dict[str, Any]) -> BotStatus:
+    return construct(
+        BotStatus,
+        data,
+        budget=construct(BotBudget, data["budget"]),
+        active_orders=[decode(Order, order) for order in data["active_orders"]],
+        archived_orders=[decode(Order, order) for order in data["archived_orders"]],
+        active_trades=[decode(Trade, trade) for trade in data["active_trades"]],
+        closed_trades=[decode(Trade, trade) for trade in data["closed_trades"]],
+    )
+
+
+_ENCODERS: Dict[type, Callable[[Any], Dict[str, Any]]] = {
+    Order: _encode_order,
+    Trade: _encode_trade,
+    BotStatus: _encode_bot_status,
+}
+
+_DECODERS: Dict[type, Callable[[Dict[str, Any]], Any]] = {
+    Order: _decode_order,
+    Trade: _decode_trade,
+    BotStatus: _decode_bot_status,
+}
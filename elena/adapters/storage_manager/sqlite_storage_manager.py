@@ -0,0 +1,279 @@
+import sqlite3
+import threading
+import time
+from os import path
+from pathlib import Path
+from typing import List, Optional, Type, Union
+
+import pandas as pd
+from pydantic import BaseModel
+
+from elena.adapters.storage_manager import model_codec
+from elena.domain.model.bot_status import BotStatus
+from elena.domain.model.exchange import ExchangeType
+from elena.domain.model.exchange_markets import ExchangeMarkets
+from elena.domain.model.metric import Metric
+from elena.domain.model.order import Order
+from elena.domain.model.schedule_index import ScheduleIndex
+from elena.domain.model.trade import Trade
+from elena.domain.ports.logger import Logger
+from elena.domain.ports.storage_manager import StorageError, StorageManager
+from elena.shared import json_codec
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bot_status (
+    bot_id TEXT PRIMARY KEY,
+    timestamp INTEGER NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS archived_order (
+    bot_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    strategy_id TEXT NOT NULL,
+    exchange_id TEXT NOT NULL,
+    pair TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    status TEXT,
+    value TEXT NOT NULL,
+    PRIMARY KEY (bot_id, id)
+);
+CREATE INDEX IF NOT EXISTS archived_order_pair_timestamp ON archived_order (pair, timestamp);
+CREATE TABLE IF NOT EXISTS closed_trade (
+    bot_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    exit_order_id TEXT NOT NULL,
+    strategy_id TEXT NOT NULL,
+    exchange_id TEXT NOT NULL,
+    pair TEXT NOT NULL,
+    entry_time INTEGER NOT NULL,
+    exit_time INTEGER NOT NULL,
+    profit REAL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (bot_id, id, exit_order_id)
+);
+CREATE INDEX IF NOT EXISTS closed_trade_bot_exit_time ON closed_trade (bot_id, exit_time);
+CREATE INDEX IF NOT EXISTS closed_trade_pair_exit_time ON closed_trade (pair, exit_time);
+CREATE TABLE IF NOT EXISTS metric (
+    timestamp INTEGER NOT NULL,
+    bot_id TEXT NOT NULL,
+    metric_name TEXT NOT NULL,
+    metric_type TEXT NOT NULL,
+    value REAL NOT NULL,
+    tags TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 1,
+    min REAL,
+    max REAL,
+    avg REAL
+);
+CREATE INDEX IF NOT EXISTS metric_bot_name_timestamp ON metric (bot_id, metric_name, timestamp);
+CREATE TABLE IF NOT EXISTS record (
+    class_name TEXT NOT NULL,
+    id TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (class_name, id)
+);
+CREATE TABLE IF NOT EXISTS candle (
+    candles_id TEXT NOT NULL,
+    open_time INTEGER NOT NULL,
+    open REAL NOT NULL,
+    high REAL NOT NULL,
+    low REAL NOT NULL,
+    close REAL NOT NULL,
+    volume REAL NOT NULL,
+    PRIMARY KEY (candles_id, open_time)
+) WITHOUT ROWID;
+"""
+
+
+class SqliteStorageManager(StorageManager):
+    """
+    StorageManager on a SQLite database in WAL mode, a batch of bot statuses is saved in one transaction.
+    Archived orders, closed trades and metrics have their own indexed tables for querying.
+    """
+
+    _logger: Logger
+    _connection: sqlite3.Connection
+    _lock: threading.Lock
+    _candles_columns = ["Open time", "Open", "High", "Low", "Close", "Volume"]
+
+    def init(self, config: dict, logger: Logger):
+        self._logger = logger
+        dir_path = path.join(config["home"], config["StorageManager"]["path"])
+        Path(dir_path).mkdir(parents=True, exist_ok=True)
+        database = path.join(dir_path, config["StorageManager"].get("database", "elena.db"))
+        # bots and strategies may run on several threads, they share the connection under the lock
+        self._connection = sqlite3.connect(database, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._logger.info("SqliteStorageManager working at %s", database)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def _fetch_one(self, sql: str, parameters: tuple, description: str) -> tuple:
+        try:
+            with self._lock:
+                row = self._connection.execute(sql, parameters).fetchone()
+        except Exception as err:
+            raise StorageError(f"Error loading {description}: {err}") from err
+        if row is None:
+            raise StorageError(f"Error loading {description}: not found")
+        return row
+
+    def _fetch_all(self, sql: str, parameters: tuple, description: str) -> List[tuple]:
+        try:
+            with self._lock:
+                return self._connection.execute(sql, parameters).fetchall()
+        except Exception as err:
+            raise StorageError(f"Error loading {description}: {err}") from err
+
+    def load_bot_status(self, bot_id: str) -> BotStatus:
+        """Load a bot status from storage with its active state only, the archived orders and closed trades are empty, raise StorageError on failure"""
+        self._logger.debug("Loading %s %s from storage", "BotStatus", bot_id)
+        (value,) = self._fetch_one("SELECT value FROM bot_status WHERE bot_id = ?", (bot_id,), f"BotStatus {bot_id}")
+        return self._parse(BotStatus, value, f"BotStatus {bot_id}")  # type: ignore
+
+    @staticmethod
+    def _parse(_class: Type[BaseModel], value: str, description: str) -> BaseModel:
+        try:
+            return model_codec.decode(_class, json_codec.loads(value))
+        except Exception as err:
+            raise StorageError(f"Error deserializing {description}: {err}") from err
+
+    def save_bot_status(self, bot_status: BotStatus):
+        """Insert or overwrite the active state of a bot status into storage and append its archived orders and closed trades to the bot archive, raise StorageError on failure"""
+        self.save_bot_statuses([bot_status])
+
+    def save_bot_statuses(self, bot_statuses: List[BotStatus]):
+        """Insert or overwrite many bot statuses into storage in one transaction, raise StorageError on failure"""
+        self._logger.debug("Saving %d %s to storage", len(bot_statuses), "BotStatus")
+        try:
+            with self._lock, self._connection:
+                for bot_status in bot_statuses:
+                    self._save_bot_status(bot_status)
+        except Exception as err:
+            raise StorageError(f"Error saving BotStatus {', '.join(bot_status.bot_id for bot_status in bot_statuses)}: {err}") from err
+
+    def _save_bot_status(self, bot_status: BotStatus):
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO archived_order (bot_id, id, strategy_id, exchange_id, pair, timestamp, status, value) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (bot_status.bot_id, order.id, order.strategy_id, order.exchange_id.value, str(order.pair), order.timestamp, order.status and order.status.value, json_codec.dumps(model_codec.encode(order)))
+                for order in bot_status.archived_orders
+            ],
+        )
+        # a status saved again, i.e. by a retried save, replaces its closed trades by their key. Trade ids are the millisecond
+        # the trade was opened, so two trades of a bot opened in the same millisecond and closed by the same order keep one row
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO closed_trade (bot_id, id, exit_order_id, strategy_id, exchange_id, pair, entry_time, exit_time, profit, value) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (bot_status.bot_id, trade.id, trade.exit_order_id or "", trade.strategy_id, trade.exchange_id.value, str(trade.pair), trade.entry_time, trade.exit_time or 0, trade.profit, json_codec.dumps(model_codec.encode(trade)))
+                for trade in bot_status.closed_trades
+            ],
+        )
+        hot_status = bot_status.copy(update={"archived_orders": [], "closed_trades": []})
+        self._connection.execute(
+            "INSERT OR REPLACE INTO bot_status (bot_id, timestamp, value) VALUES (?, ?, ?)",
+            (bot_status.bot_id, bot_status.timestamp, json_codec.dumps(model_codec.encode(hot_status))),
+        )
+
+    def delete_bot_status(self, bot_id: str):
+        """Delete a bot status from storage, raise StorageError on failure"""
+        self._logger.debug("Deleting %s %s from storage", "BotStatus", bot_id)
+        try:
+            with self._lock, self._connection:
+                self._connection.execute("DELETE FROM bot_status WHERE bot_id = ?", (bot_id,))
+        except Exception as err:
+            raise StorageError(f"Error deleting BotStatus {bot_id}: {err}") from err
+
+    def load_archived_orders(self, bot_id: str) -> List[Order]:
+        """Load all the archived orders of a bot from storage, raise StorageError on failure"""
+        rows = self._fetch_all("SELECT value FROM archived_order WHERE bot_id = ? ORDER BY timestamp, rowid", (bot_id,), f"ArchivedOrder {bot_id}")
+        return [self._parse(Order, value, f"ArchivedOrder {bot_id}") for (value,) in rows]  # type: ignore
+
+    def load_closed_trades(self, bot_id: str) -> List[Trade]:
+        """Load all the closed trades of a bot from storage, raise StorageError on failure"""
+        rows = self._fetch_all("SELECT value FROM closed_trade WHERE bot_id = ? ORDER BY exit_time, id", (bot_id,), f"ClosedTrade {bot_id}")
+        return [self._parse(Trade, value, f"ClosedTrade {bot_id}") for (value,) in rows]  # type: ignore
+
+    def _load_record(self, _class: Type[BaseModel], data_id: str) -> BaseModel:
+        class_name = _class.__qualname__
+        self._logger.debug("Loading %s %s from storage", class_name, data_id)
+        (value,) = self._fetch_one("SELECT value FROM record WHERE class_name = ? AND id = ?", (class_name, data_id), f"{class_name} {data_id}")
+        return self._parse(_class, value, f"{class_name} {data_id}")
+
+    def _save_record(self, data_id: str, data: BaseModel):
+        class_name = data.__class__.__qualname__
+        self._logger.debug("Saving %s %s to storage", class_name, data_id)
+        try:
+            with self._lock, self._connection:
+                self._connection.execute("INSERT OR REPLACE INTO record (class_name, id, value) VALUES (?, ?, ?)", (class_name, data_id, json_codec.dumps(model_codec.encode(data))))
+        except Exception as err:
+            raise StorageError(f"Error saving object {class_name} {data_id}: {err}") from err
+
+    def load_schedule_index(self, strategy_id: str) -> ScheduleIndex:
+        """Load the bots schedule index of a strategy from storage, raise StorageError on failure"""
+        return self._load_record(ScheduleIndex, strategy_id)  # type: ignore
+
+    def save_schedule_index(self, schedule_index: ScheduleIndex):
+        """Insert or overwrite the bots schedule index of a strategy into storage, raise StorageError on failure"""
+        self._save_record(schedule_index.strategy_id, schedule_index)
+
+    def load_exchange_markets(self, exchange_id: ExchangeType, sandbox_mode: bool) -> ExchangeMarkets:
+        """Load the markets of an exchange from storage, raise StorageError on failure"""
+        return self._load_record(ExchangeMarkets, ExchangeMarkets.build_id(exchange_id, sandbox_mode))  # type: ignore
+
+    def save_exchange_markets(self, exchange_markets: ExchangeMarkets):
+        """Insert or overwrite the markets of an exchange into storage, raise StorageError on failure"""
+        self._save_record(exchange_markets.id, exchange_markets)
+
+    def load_candles(self, candles_id: str, limit: Optional[int] = None) -> pd.DataFrame:
+        """Load the last `limit` (all if None) stored market candles from storage, raise StorageError on failure"""
+        self._logger.debug("Loading Candles %s from storage", candles_id)
+        rows = self._fetch_all(
+            "SELECT open_time, open, high, low, close, volume FROM candle WHERE candles_id = ? ORDER BY open_time DESC LIMIT ?",
+            (candles_id, limit or -1),
+            f"Candles {candles_id}",
+        )
+        if not rows:
+            raise StorageError(f"Error loading Candles {candles_id}: not found")
+        return pd.DataFrame(rows[::-1], columns=self._candles_columns)
+
+    def append_candles(self, candles_id: str, candles: pd.DataFrame):
+        """Insert market candles into storage overwriting the ones with the same open time, raise StorageError on failure"""
+        self._logger.debug("Saving %d Candles %s to storage", candles.shape[0], candles_id)
+        rows = [(candles_id, int(candle[0]), *map(float, candle[1:])) for candle in candles[self._candles_columns].itertuples(index=False)]
+        try:
+            with self._lock, self._connection:
+                self._connection.executemany("INSERT OR REPLACE INTO candle (candles_id, open_time, open, high, low, close, volume) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        except Exception as err:
+            raise StorageError(f"Error saving Candles {candles_id}: {err}") from err
+
+    def append_metric(self, bot_id: str, metric_name: str, metric_type: str, value: Union[int, float], tags: List[str]):
+        try:
+            with self._lock, self._connection:
+                self._connection.execute(
+                    "INSERT INTO metric (timestamp, bot_id, metric_name, metric_type, value, tags) VALUES (?, ?, ?, ?, ?, ?)",
+                    (self._get_time(), bot_id, metric_name, metric_type, value, "#".join(tags) or ""),
+                )
+        except Exception as err:
+            raise StorageError(f"Error appending Metric {metric_name} {bot_id}: {err}") from err
+
+    def append_metrics(self, metrics: List[Metric]):
+        """Insert many, possibly aggregated, metrics into storage in bulk, raise StorageError on failure"""
+        rows = [(metric.timestamp, metric.bot_id, metric.metric_name, metric.metric_type, metric.value, "#".join(metric.tags) or "", metric.count, metric.min, metric.max, metric.avg) for metric in metrics]
+        try:
+            with self._lock, self._connection:
+                self._connection.executemany(
+                    "INSERT INTO metric (timestamp, bot_id, metric_name, metric_type, value, tags, count, min, max, avg) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+        except Exception as err:
+            raise StorageError(f"Error appending {len(rows)} Metric: {err}") from err
+
+    @staticmethod
+    def _get_time():
+        return int(time.time() * 1000)
@@ -1,8 +1,9 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel
 
 from elena.domain.model.exchange import ExchangeType
+from elena.domain.model.order_book import OrderBookSource
 from elena.domain.model.time_frame import TimeFrame
 from elena.domain.model.trading_pair import TradingPair
 
@@ -20,3 +21,4 @@ class BotConfig(BaseModel):
     pct_reinvest_profit: float = 100.0
     tags: List[str]
     config: Dict
+    order_book_sources: Optional[List[OrderBookSource]] = None  # cheapest first, ExchangeManager.order_book_sources when not set
@@ -1,18 +1,136 @@
 import time
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
 from elena.domain.model.bot_budget import BotBudget
 from elena.domain.model.order import Order
 from elena.domain.model.trade import Trade
 
+_MAX_REMOVED_TRADES = 64  # trade positions are renumbered after this many removals
+
 
 class BotStatus(BaseModel):
     bot_id: str
     timestamp: int = int(time.time() * 1000)
     budget: BotBudget
     active_orders: List[Order]
-    archived_orders: List[Order]
+    archived_orders: List[Order]  # archived on this cycle, the previous ones are on StorageManager.load_archived_orders
     active_trades: List[Trade]
-    closed_trades: List[Trade]
+    closed_trades: List[Trade]  # closed on this cycle, the previous ones are on StorageManager.load_closed_trades
+
+    # Indexes of active_orders and active_trades, kept up to date by the methods below and rebuilt when the lists are
+    # replaced or their length is changed directly. Change trade.exit_order_id with set_trade_exit_order_id.
+    _indexed_orders: Optional[List[Order]] = PrivateAttr(default=None)
+    _indexed_orders_len: int = PrivateAttr(default=0)
+    _orders_by_id: Dict[str, Order] = PrivateAttr(default_factory=dict)
+    _indexed_trades: Optional[List[Trade]] = PrivateAttr(default=None)
+    _indexed_trades_len: int = PrivateAttr(default=0)
+    _next_trade_position: int = PrivateAttr(default=0)
+    _removed_trades: int = PrivateAttr(default=0)  # removals since the positions were numbered
+    _trade_keys: Dict[int, Tuple[int, str, str]] = PrivateAttr(default_factory=dict)  # id(trade) -> position, entry and exit order ids
+    _trades_by_entry_order_id: Dict[str, Dict[int, Trade]] = PrivateAttr(default_factory=dict)
+    _trades_by_exit_order_id: Dict[str, Dict[int, Trade]] = PrivateAttr(default_factory=dict)
+
+    def _index_orders(self) -> Dict[str, Order]:
+        if self._indexed_orders is not self.active_orders or self._indexed_orders_len != len(self.active_orders):
+            self._orders_by_id = {order.id: order for order in self.active_orders}
+            self._indexed_orders = self.active_orders
+            self._indexed_orders_len = len(self.active_orders)
+        return self._orders_by_id
+
+    def _index_trades(self):
+        if self._indexed_trades is not self.active_trades or self._indexed_trades_len != len(self.active_trades):
+            self._trade_keys = {}
+            self._trades_by_entry_order_id = {}
+            self._trades_by_exit_order_id = {}
+            self._next_trade_position = 0
+            self._removed_trades = 0
+            for trade in self.active_trades:
+                self._index_trade(trade)
+            self._indexed_trades = self.active_trades
+            self._indexed_trades_len = len(self.active_trades)
+
+    def _index_trade(self, trade: Trade):
+        self._trade_keys[id(trade)] = (self._next_trade_position, trade.entry_order_id, trade.exit_order_id)  # type: ignore
+        self._next_trade_position += 1
+        self._trades_by_entry_order_id.setdefault(trade.entry_order_id, {})[id(trade)] = trade  # type: ignore
+        self._trades_by_exit_order_id.setdefault(trade.exit_order_id, {})[id(trade)] = trade  # type: ignore
+
+    @staticmethod
+    def _unindex(index: Dict[str, Dict[int, Trade]], order_id: str, trade_id: int):
+        trades_by_id = index[order_id]
+        del trades_by_id[trade_id]
+        if not trades_by_id:
+            del index[order_id]
+
+    def _find_trades(self, index: Dict[str, Dict[int, Trade]], order_id: str) -> List[Trade]:
+        # in the active_trades order, as the linear search found them
+        return sorted(index.get(order_id, {}).values(), key=lambda trade: self._trade_keys[id(trade)][0])
+
+    def get_active_order(self, order_id: str) -> Optional[Order]:
+        return self._index_orders().get(order_id)
+
+    def add_active_order(self, order: Order):
+        orders_by_id = self._index_orders()
+        self.active_orders.append(order)
+        orders_by_id[order.id] = order
+        self._indexed_orders_len += 1
+
+    def remove_active_order(self, order_id: str) -> Optional[Order]:
+        order = self._index_orders().pop(order_id, None)
+        if order is not None:
+            self.active_orders[:] = [active_order for active_order in self.active_orders if active_order.id != order_id]
+            self._indexed_orders_len = len(self.active_orders)
+        return order
+
+    def add_active_trade(self, trade: Trade):
+        self._index_trades()
+        self.active_trades.append(trade)
+        self._index_trade(trade)
+        self._indexed_trades_len += 1
+
+    def remove_active_trades(self, trades: List[Trade]):
+        self._index_trades()
+        for trade in trades:
+            keys = self._trade_keys.pop(id(trade), None)
+            if keys is not None:
+                self._unindex(self._trades_by_entry_order_id, keys[1], id(trade))
+                self._unindex(self._trades_by_exit_order_id, keys[2], id(trade))
+                del self.active_trades[self._find_trade_index(trade, keys[0])]
+                self._removed_trades += 1
+        self._indexed_trades_len = len(self.active_trades)
+        if self._removed_trades > _MAX_REMOVED_TRADES:
+            self._number_trade_positions()
+
+    def _find_trade_index(self, trade: Trade, position: int) -> int:
+        # the trade is moved back one place for every removed trade before it, without comparing the trades with ==
+        for index in range(max(position - self._removed_trades, 0), min(position + 1, len(self.active_trades))):
+            if self.active_trades[index] is trade:
+                return index
+        raise ValueError(f"Trade {trade.id} not found in active_trades")
+
+    def _number_trade_positions(self):
+        for position, trade in enumerate(self.active_trades):
+            _, entry_order_id, exit_order_id = self._trade_keys[id(trade)]
+            self._trade_keys[id(trade)] = (position, entry_order_id, exit_order_id)
+        self._next_trade_position = len(self.active_trades)
+        self._removed_trades = 0
+
+    def get_active_trades_by_entry_order_id(self, order_id: str) -> List[Trade]:
+        self._index_trades()
+        return self._find_trades(self._trades_by_entry_order_id, order_id)
+
+    def get_active_trades_by_exit_order_id(self, order_id: str) -> List[Trade]:
+        self._index_trades()
+        # skips the trades whose exit_order_id was changed directly
+        return [trade for trade in self._find_trades(self._trades_by_exit_order_id, order_id) if trade.exit_order_id == order_id]
+
+    def set_trade_exit_order_id(self, trade: Trade, exit_order_id: str):
+        self._index_trades()
+        keys = self._trade_keys.get(id(trade))
+        if keys is not None:
+            self._unindex(self._trades_by_exit_order_id, keys[2], id(trade))
+            self._trades_by_exit_order_id.setdefault(exit_order_id, {})[id(trade)] = trade
+            self._trade_keys[id(trade)] = (keys[0], keys[1], exit_order_id)
+        trade.exit_order_id = exit_order_id
@@ -0,0 +1,23 @@
+from typing import Dict
+
+from pydantic import BaseModel
+
+from elena.domain.model.exchange import ExchangeType
+
+
+class ExchangeMarkets(BaseModel):
+    exchange_id: ExchangeType
+    sandbox_mode: bool = False
+    timestamp: int  # loading Unix timestamp in milliseconds
+    markets: Dict  # markets indexed by symbol, as loaded by the exchange library
+    currencies: Dict  # currencies indexed by code, as loaded by the exchange library
+
+    @property
+    def id(self) -> str:
+        return self.build_id(self.exchange_id, self.sandbox_mode)
+
+    @staticmethod
+    def build_id(exchange_id: ExchangeType, sandbox_mode: bool) -> str:
+        if sandbox_mode:
+            return f"{exchange_id.value}-sandbox"
+        return exchange_id.value
@@ -0,0 +1,16 @@
+from typing import List, Optional, Union
+
+from pydantic import BaseModel
+
+
+class Metric(BaseModel):
+    timestamp: int  # Unix timestamp in milliseconds of the last aggregated value
+    bot_id: str
+    metric_name: str
+    metric_type: str  # counter, gauge or timer
+    value: Union[int, float]  # counters: the sum, gauges and timers: the last value
+    tags: List[str]
+    count: int = 1  # aggregated values
+    min: Optional[float] = None  # gauges and timers only
+    max: Optional[float] = None  # gauges and timers only
+    avg: Optional[float] = None  # gauges and timers only
@@ -1,6 +1,17 @@
-from typing import List
+from typing import Any, Dict, List, Optional, Sequence, Union
 
+import numpy as np
 from pydantic import BaseModel
+from pydantic.config import Enum
+
+from elena.domain.model.order import OrderSide
+
+
+class OrderBookSource(str, Enum):
+    # where the order book is read from, the ticker and bids_asks only have the best bid and ask
+    order_book = "order_book"
+    ticker = "ticker"
+    bids_asks = "bids_asks"
 
 
 class PriceAmount(BaseModel):
@@ -8,6 +19,141 @@ class PriceAmount(BaseModel):
     amount: float
 
 
-class OrderBook(BaseModel):
-    bids: List[PriceAmount]
-    asks: List[PriceAmount]
+Levels = Union[np.ndarray, Sequence[Union[PriceAmount, Dict[str, float], Sequence[float]]]]
+
+
+def _to_array(levels: Optional[Levels]) -> np.ndarray:
+    # (n, 2) float64 array of price, amount
+    if levels is None or len(levels) == 0:
+        return np.empty((0, 2), dtype=np.float64)
+    if isinstance(levels, np.ndarray):
+        return np.ascontiguousarray(levels[:, :2], dtype=np.float64)
+    first = levels[0]
+    if isinstance(first, PriceAmount):
+        return np.array([(level.price, level.amount) for level in levels], dtype=np.float64)  # type: ignore
+    if isinstance(first, dict):
+        return np.array([(level["price"], level["amount"]) for level in levels], dtype=np.float64)  # type: ignore
+    try:
+        array = np.array(levels, dtype=np.float64)
+    except ValueError:
+        # levels of different lengths, i.e. [price, amount] and [price, amount, count]
+        array = np.array([level[:2] for level in levels], dtype=np.float64)  # type: ignore
+    return np.ascontiguousarray(array[:, :2])
+
+
+class OrderBook:
+    """
+    Bids, the highest price first, and asks, the lowest price first, as two (n, 2) float64 arrays of price and amount,
+    so a book with thousands of levels is not thousands of objects. bids and asks are lists of PriceAmount built on first
+    access, the analytics work on the arrays.
+    Built from lists of PriceAmount, dicts or [price, amount] lists as the pydantic model it was, and serialized the same.
+    """
+
+    bids_array: np.ndarray
+    asks_array: np.ndarray
+
+    def __init__(self, bids: Optional[Levels] = None, asks: Optional[Levels] = None):
+        self.bids_array = _to_array(bids)
+        self.asks_array = _to_array(asks)
+        self._bids: Optional[List[PriceAmount]] = None
+        self._asks: Optional[List[PriceAmount]] = None
+
+    @classmethod
+    def parse_obj(cls, data: Dict[str, Any]) -> "OrderBook":
+        return cls(bids=data["bids"], asks=data["asks"])
+
+    def dict(self) -> Dict[str, List[Dict[str, float]]]:
+        return {
+            "bids": [{"price": price, "amount": amount} for price, amount in self.bids_array.tolist()],
+            "asks": [{"price": price, "amount": amount} for price, amount in self.asks_array.tolist()],
+        }
+
+    @property
+    def bids(self) -> List[PriceAmount]:
+        if self._bids is None:
+            self._bids = self._to_price_amounts(self.bids_array)
+        return self._bids
+
+    @property
+    def asks(self) -> List[PriceAmount]:
+        if self._asks is None:
+            self._asks = self._to_price_amounts(self.asks_array)
+        return self._asks
+
+    @staticmethod
+    def _to_price_amounts(levels: np.ndarray) -> List[PriceAmount]:
+        return [PriceAmount.construct(price=price, amount=amount) for price, amount in levels.tolist()]
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, OrderBook):
+            return False
+        return np.array_equal(self.bids_array, other.bids_array) and np.array_equal(self.asks_array, other.asks_array)
+
+    def __repr__(self) -> str:
+        return f"OrderBook(bids={len(self.bids_array)} levels, asks={len(self.asks_array)} levels, best_bid={self.best_bid}, best_ask={self.best_ask})"
+
+    @property
+    def best_bid(self) -> Optional[float]:
+        return float(self.bids_array[0, 0]) if len(self.bids_array) else None
+
+    @property
+    def best_ask(self) -> Optional[float]:
+        return float(self.asks_array[0, 0]) if len(self.asks_array) else None
+
+    def mid_price(self) -> Optional[float]:
+        if self.best_bid is None or self.best_ask is None:
+            return None
+        return (self.best_bid + self.best_ask) / 2
+
+    def spread(self) -> Optional[float]:
+        """Best ask - best bid, in quote"""
+        if self.best_bid is None or self.best_ask is None:
+            return None
+        return self.best_ask - self.best_bid
+
+    def spread_pct(self) -> Optional[float]:
+        """Spread as a percentage of the mid price"""
+        mid_price = self.mid_price()
+        if not mid_price:
+            return None
+        return self.spread() / mid_price * 100  # type: ignore
+
+    def bid_depth(self, pct: float) -> float:
+        """Amount of base currency bid at most pct% below the mid price"""
+        mid_price = self.mid_price()
+        if mid_price is None:
+            return 0.0
+        return float(self.bids_array[self.bids_array[:, 0] >= mid_price * (1 - pct / 100), 1].sum())
+
+    def ask_depth(self, pct: float) -> float:
+        """Amount of base currency asked at most pct% above the mid price"""
+        mid_price = self.mid_price()
+        if mid_price is None:
+            return 0.0
+        return float(self.asks_array[self.asks_array[:, 0] <= mid_price * (1 + pct / 100), 1].sum())
+
+    def _levels_for(self, side: OrderSide) -> np.ndarray:
+        # a market buy is filled by the asks, a market sell by the bids
+        return self.asks_array if side == OrderSide.buy else self.bids_array
+
+    def vwap(self, side: OrderSide, amount: float) -> Optional[float]:
+        """Average price of a market order of amount base currency walking the book, None if the book is not deep enough"""
+        levels = self._levels_for(side)
+        if amount <= 0 or len(levels) == 0:
+            return None
+        filled = np.cumsum(levels[:, 1])
+        if filled[-1] < amount and not np.isclose(filled[-1], amount):
+            return None
+        last = min(int(np.searchsorted(filled, amount)), len(levels) - 1)
+        filled_before = filled[last - 1] if last > 0 else 0.0
+        cost = np.dot(levels[:last, 0], levels[:last, 1]) + (amount - filled_before) * levels[last, 0]
+        return float(cost / amount)
+
+    def slippage_pct(self, side: OrderSide, amount: float) -> Optional[float]:
+        """Expected slippage of a market order of amount base currency, as a percentage of the best price, positive when worse"""
+        vwap = self.vwap(side, amount)
+        if vwap is None:
+            return None
+        best_price = float(self._levels_for(side)[0, 0])
+        slippage = (vwap - best_price) if side == OrderSide.buy else (best_price - vwap)
+        return slippage / best_price * 100
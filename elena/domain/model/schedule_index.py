@@ -0,0 +1,15 @@
+from typing import Dict
+
+from pydantic import BaseModel
+
+
+class BotSchedule(BaseModel):
+    bot_id: str
+    cron_expression: str  # the expression next_execution was computed with, empty to run every cycle
+    last_execution: int  # Unix timestamp in milliseconds of the last run, the status timestamp may be older
+    next_execution: int  # Unix timestamp in milliseconds when the bot is due, 0 to run every cycle
+
+
+class ScheduleIndex(BaseModel):
+    strategy_id: str
+    bots: Dict[str, BotSchedule] = {}  # schedules indexed by bot id
@@ -1,6 +1,7 @@
 from typing import Dict, List, Protocol, runtime_checkable
 
 from elena.domain.model.bot_status import BotStatus
+from elena.domain.model.schedule_index import ScheduleIndex
 from elena.domain.model.strategy_config import StrategyConfig
 from elena.domain.ports.logger import Logger
 from elena.domain.ports.storage_manager import StorageManager
@@ -26,8 +27,24 @@ class BotManager(Protocol):
 
     def save_all(self, statuses: List[BotStatus]):
         """
-        Persists all the bot statuses
+        Persists all the bot statuses, a failed status doesn't prevent saving the others
         :param statuses: a list of bot status
+        :raises StorageError: when any status cannot be saved
+        """
+        ...
+
+    def load_schedule_index(self, strategy_config: StrategyConfig) -> ScheduleIndex:
+        """
+        Loads the schedule index of a Strategy bots from persistence
+        :param strategy_config: the strategy configuration
+        :return: the schedule index, empty if it was never saved
+        """
+        ...
+
+    def save_schedule_index(self, schedule_index: ScheduleIndex):
+        """
+        Persists the schedule index of a Strategy bots
+        :param schedule_index: the schedule index
         :return: error if any
         """
         ...
@@ -1,4 +1,4 @@
-from typing import Dict, Optional, Protocol, runtime_checkable
+from typing import Dict, List, Optional, Protocol, runtime_checkable
 
 import pandas as pd
 
@@ -6,7 +6,7 @@ from elena.domain.model.balance import Balance
 from elena.domain.model.bot_config import BotConfig
 from elena.domain.model.exchange import Exchange
 from elena.domain.model.order import Order, OrderSide, OrderType
-from elena.domain.model.order_book import OrderBook
+from elena.domain.model.order_book import OrderBook, OrderBookSource
 from elena.domain.model.time_frame import TimeFrame
 from elena.domain.model.trading_pair import TradingPair
 from elena.domain.ports.logger import Logger
@@ -40,11 +40,13 @@ class ExchangeManager(Protocol):
     def price_to_precision(self, exchange: Exchange, pair: TradingPair, price: float) -> float:
         ...
 
-    def read_order_book(self, exchange: Exchange, pair: TradingPair) -> OrderBook:
+    def read_order_book(self, exchange: Exchange, pair: TradingPair, depth: Optional[int] = None, sources: Optional[List[OrderBookSource]] = None) -> OrderBook:
         """
         Reads exchange order book
         :param exchange: exchange where to read exchange data
         :param pair: trading pair to read
+        :param depth: levels needed on each side, at least, None for the whole book
+        :param sources: sources allowed, cheapest first, the first one the exchange supports with the depth is used
         :return: the current order book
         """
         ...
@@ -101,6 +103,16 @@ class ExchangeManager(Protocol):
         """
         ...
 
+    def fetch_orders(self, exchange: Exchange, bot_config: BotConfig, order_ids: List[str]) -> Dict[str, Order]:
+        """
+        Retrieves many orders of the bot pair from Exchange with bulk requests
+        :param exchange: exchange where to read market data
+        :param bot_config: the current bot configuration
+        :param order_ids: the order ids to retrieve
+        :return: the orders found by id, the missing ones must be retrieved with fetch_order
+        """
+        ...
+
     def get_precision_amount(self, exchange: Exchange, pair: TradingPair) -> float:
         ...
 
@@ -112,3 +124,47 @@ class ExchangeManager(Protocol):
 
     def limit_min_cost(self, exchange: Exchange, pair: TradingPair) -> float:
         ...
+
+
+@runtime_checkable
+class AsyncExchangeManager(ExchangeManager, Protocol):
+    """
+    ExchangeManager with coroutine variants of the methods that make requests to the exchange,
+    so many requests can be in flight at the same time without a thread for each one
+    """
+
+    async def read_candles_async(
+        self,
+        exchange: Exchange,
+        pair: TradingPair,
+        time_frame: TimeFrame = TimeFrame.min_1,  # type: ignore
+        page_size: int = 100,
+    ) -> pd.DataFrame:
+        ...
+
+    async def read_order_book_async(self, exchange: Exchange, pair: TradingPair, depth: Optional[int] = None, sources: Optional[List[OrderBookSource]] = None) -> OrderBook:
+        ...
+
+    async def get_balance_async(self, exchange: Exchange) -> Balance:
+        ...
+
+    async def place_order_async(
+        self,
+        exchange: Exchange,
+        bot_config: BotConfig,
+        order_type: OrderType,
+        side: OrderSide,
+        amount: float,
+        price: Optional[float] = None,
+        params: Optional[Dict] = {},
+    ) -> Order:
+        ...
+
+    async def cancel_order_async(self, exchange: Exchange, bot_config: BotConfig, order_id: str) -> Order:
+        ...
+
+    async def fetch_order_async(self, exchange: Exchange, bot_config: BotConfig, order_id: str) -> Order:
+        ...
+
+    async def fetch_orders_async(self, exchange: Exchange, bot_config: BotConfig, order_ids: List[str]) -> Dict[str, Order]:
+        ...
@@ -10,6 +10,15 @@ ORDER_BUY_MARKET = "OrderBuyMarket"
 ORDER_SELL_MARKET = "OrderSellMarket"
 ESTIMATED_LAST_CLOSE = "EstimatedLastClose"
 ESTIMATED_SALE_PRICE = "EstimatedSalePrice"
+# timers, in milliseconds
+STRATEGY_TIME = "StrategyTime"
+LOAD_STATUSES_TIME = "LoadStatusesTime"
+SAVE_STATUSES_TIME = "SaveStatusesTime"
+UPDATE_ORDERS_STATUS_TIME = "UpdateOrdersStatusTime"
+READ_CANDLES_TIME = "ReadCandlesTime"
+READ_ORDER_BOOK_TIME = "ReadOrderBookTime"
+PLACE_ORDER_TIME = "PlaceOrderTime"
+BOT_NEXT_TIME = "BotNextTime"
 
 
 @runtime_checkable
@@ -22,3 +31,11 @@ class MetricsManager(Protocol):
 
     def gauge(self, metric: str, bot_id: str, value: float, tags: List[str]):
         ...
+
+    def timer(self, metric: str, bot_id: str, value: float, tags: List[str]):
+        """Records a duration in milliseconds, bot_id is the strategy id for the strategy timers"""
+        ...
+
+    def flush(self):
+        """Writes the buffered metrics, if any"""
+        ...
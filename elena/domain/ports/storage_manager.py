@@ -1,11 +1,22 @@
-from typing import Protocol, runtime_checkable, Union, List
+from typing import Protocol, runtime_checkable, Union, List, Optional
+
+import pandas as pd
 
 from elena.domain.model.bot_status import BotStatus
+from elena.domain.model.exchange import ExchangeType
+from elena.domain.model.exchange_markets import ExchangeMarkets
+from elena.domain.model.metric import Metric
+from elena.domain.model.order import Order
+from elena.domain.model.schedule_index import ScheduleIndex
+from elena.domain.model.trade import Trade
 from elena.domain.ports.logger import Logger
 
 
 class StorageError(Exception):
-    pass
+    def __init__(self, *args, failed_ids: Optional[List[str]] = None):
+        super().__init__(*args)
+        # the ids a batch saved in part did not save, None when the whole batch failed
+        self.failed_ids = failed_ids
 
 
 @runtime_checkable
@@ -14,16 +25,56 @@ class StorageManager(Protocol):
         ...
 
     def load_bot_status(self, bot_id: str) -> BotStatus:
-        """Load a bot status from storage, raise StorageError on failure"""
+        """Load a bot status from storage with its active state only, the archived orders and closed trades are empty, raise StorageError on failure"""
         ...
 
     def save_bot_status(self, bot_status: BotStatus):
-        """Insert or overwrite a bot status into storage, raise StorageError on failure"""
+        """Insert or overwrite the active state of a bot status into storage and append its archived orders and closed trades to the bot archive, raise StorageError on failure"""
+        ...
+
+    def save_bot_statuses(self, bot_statuses: List[BotStatus]):
+        """Insert or overwrite many bot statuses as save_bot_status does, in one transaction where supported, raise StorageError on failure"""
+        ...
+
+    def load_archived_orders(self, bot_id: str) -> List[Order]:
+        """Load all the archived orders of a bot from storage, raise StorageError on failure"""
+        ...
+
+    def load_closed_trades(self, bot_id: str) -> List[Trade]:
+        """Load all the closed trades of a bot from storage, raise StorageError on failure"""
         ...
 
     def delete_bot_status(self, bot_id: str):
         """Delete a bot status from storage, raise StorageError on failure"""
         ...
 
+    def load_schedule_index(self, strategy_id: str) -> ScheduleIndex:
+        """Load the bots schedule index of a strategy from storage, raise StorageError on failure"""
+        ...
+
+    def save_schedule_index(self, schedule_index: ScheduleIndex):
+        """Insert or overwrite the bots schedule index of a strategy into storage, raise StorageError on failure"""
+        ...
+
+    def load_exchange_markets(self, exchange_id: ExchangeType, sandbox_mode: bool) -> ExchangeMarkets:
+        """Load the markets of an exchange from storage, raise StorageError on failure"""
+        ...
+
+    def save_exchange_markets(self, exchange_markets: ExchangeMarkets):
+        """Insert or overwrite the markets of an exchange into storage, raise StorageError on failure"""
+        ...
+
+    def load_candles(self, candles_id: str, limit: Optional[int] = None) -> pd.DataFrame:
+        """Load the last `limit` (all if None) stored market candles from storage, raise StorageError on failure"""
+        ...
+
+    def append_candles(self, candles_id: str, candles: pd.DataFrame):
+        """Insert market candles into storage overwriting the ones with the same open time, raise StorageError on failure"""
+        ...
+
     def append_metric(self, bot_id: str, metric_name: str, metric_type: str, value: Union[int, float], tags: List[str]):
         ...
+
+    def append_metrics(self, metrics: List[Metric]):
+        """Insert many, possibly aggregated, metrics into storage in bulk, raise StorageError on failure"""
+        ...
@@ -0,0 +1,79 @@
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List
+
+from cron_converter import Cron
+
+from elena.domain.model.bot_config import BotConfig
+from elena.domain.model.bot_status import BotStatus
+from elena.domain.model.schedule_index import BotSchedule, ScheduleIndex
+from elena.domain.model.strategy_config import StrategyConfig
+
+
+@lru_cache(maxsize=None)
+def get_cron(cron_expression: str) -> Cron:
+    """Parses a cron expression once, the compiled Cron is shared by all the bots and cycles"""
+    return Cron(cron_expression)
+
+
+def get_next_execution(last_execution: datetime, cron_expression: str) -> datetime:
+    return get_cron(cron_expression).schedule(last_execution).next()
+
+
+class BotScheduler:
+    @staticmethod
+    def get_due_bots(strategy_config: StrategyConfig, schedule_index: ScheduleIndex, now: datetime) -> List[BotConfig]:
+        """
+        Selects the strategy bots that may have to run, without loading their statuses.
+        :param strategy_config: the strategy configuration
+        :param schedule_index: the strategy schedule index saved on the previous cycles
+        :param now: the cycle time
+        :return: the bots without cron expression, the due ones and the ones not found on the index
+        """
+        now_timestamp = int(now.timestamp() * 1000)
+        due_bots = []
+        for bot_config in strategy_config.bots:
+            bot_schedule = schedule_index.bots.get(bot_config.id)
+            if not bot_config.cron_expression or bot_schedule is None or bot_schedule.cron_expression != bot_config.cron_expression or bot_schedule.next_execution <= now_timestamp:
+                due_bots.append(bot_config)
+        return due_bots
+
+    @staticmethod
+    def update_schedule_index(strategy_config: StrategyConfig, schedule_index: ScheduleIndex, executions: Dict[str, int]) -> ScheduleIndex:
+        """
+        Builds the schedule index for the next cycles.
+        :param strategy_config: the strategy configuration
+        :param schedule_index: the strategy schedule index used on this cycle
+        :param executions: the last execution timestamp of the bots with status, indexed by bot id
+        :return: the new schedule index, without the bots removed from the strategy
+        """
+        bots = {}
+        for bot_config in strategy_config.bots:
+            if bot_config.id in executions:
+                last_execution = executions[bot_config.id]
+                if bot_config.cron_expression:
+                    next_execution = int(get_next_execution(datetime.fromtimestamp(last_execution / 1000), bot_config.cron_expression).timestamp() * 1000)
+                else:
+                    next_execution = 0
+                bots[bot_config.id] = BotSchedule(
+                    bot_id=bot_config.id,
+                    cron_expression=bot_config.cron_expression,
+                    last_execution=last_execution,
+                    next_execution=next_execution,
+                )
+            elif bot_config.id in schedule_index.bots:
+                bots[bot_config.id] = schedule_index.bots[bot_config.id]
+        return ScheduleIndex(strategy_id=strategy_config.id, bots=bots)
+
+    @staticmethod
+    def restore_last_executions(statuses: List[BotStatus], schedule_index: ScheduleIndex):
+        """
+        Sets the last execution saved on the schedule index as the statuses timestamp,
+        statuses are not saved when the timestamp is their only change.
+        :param statuses: the loaded bot statuses
+        :param schedule_index: the strategy schedule index
+        """
+        for status in statuses:
+            bot_schedule = schedule_index.bots.get(status.bot_id)
+            if bot_schedule and bot_schedule.last_execution > status.timestamp:
+                status.timestamp = bot_schedule.last_execution
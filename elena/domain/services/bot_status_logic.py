@@ -1,5 +1,5 @@
 import time
-from typing import Tuple
+from typing import Any, Dict, Tuple
 
 from elena.domain.model.bot_status import BotStatus
 from elena.domain.model.order import Order, OrderSide, OrderStatusType
@@ -7,6 +7,7 @@ from elena.domain.model.trade import Trade
 from elena.domain.ports.logger import Logger
 from elena.domain.ports.metrics_manager import MetricsManager
 from elena.domain.ports.notifications_manager import NotificationsManager
+from elena.shared.model_construct import construct
 
 
 class BotStatusLogic:
@@ -20,7 +21,7 @@ class BotStatusLogic:
     @staticmethod
     def _new_trade_by_order(bot_status: BotStatus, order: Order) -> Tuple[BotStatus, str]:
         # All Trades start/"born" here...
-        new_trade = Trade(
+        fields: Dict[str, Any] = dict(
             exchange_id=order.exchange_id,
             bot_id=bot_status.bot_id,
             strategy_id=order.strategy_id,
@@ -34,8 +35,13 @@ class BotStatusLogic:
             exit_price=0.0,
             exit_cost=0.0,
         )
+        # the order was already validated, only an order without average or cost is validated again to raise
+        if order.average is not None and order.cost is not None:
+            new_trade = construct(Trade, **fields)
+        else:
+            new_trade = Trade(**fields)
         new_trade.id = str(int(time.time() * 1000))  # TODO: improve trade.id auto generation
-        bot_status.active_trades.append(new_trade)
+        bot_status.add_active_trade(new_trade)
         return bot_status, new_trade.id
 
     @staticmethod
@@ -54,7 +60,7 @@ class BotStatusLogic:
         rtn: float,
     ) -> [float, float]:  # type: ignore
         if trade.size <= round(amount_to_close, self.precision_amount):
-            bot_status.active_trades.remove(trade)
+            # removed from active_trades by _close_trades_on_new_updated_order
             trade.exit_order_id = order.id
             trade.exit_time = order.timestamp
             trade.exit_price = order.average
@@ -74,24 +80,30 @@ class BotStatusLogic:
     def _close_trades_on_new_updated_order(self, bot_status: BotStatus, order: Order) -> float:
         amount_to_close = order.amount
         rtn = 0.0
+        closed_trades_before = len(bot_status.closed_trades)
         # check trades with an exit order id
-        for trade in bot_status.active_trades[:]:
-            if trade.exit_order_id == order.id and amount_to_close > 0:
+        for trade in bot_status.get_active_trades_by_exit_order_id(order.id):
+            if amount_to_close > 0:
                 amount_to_close, rtn = self._close_individual_trade_on_new_order(bot_status, trade, order, amount_to_close, rtn)
 
         # check trades without an exit order id
         if amount_to_close > 0:
-            for trade in bot_status.active_trades[:]:
-                if trade.exit_order_id == "0" and amount_to_close > 0:  # TODO define an OrderId.Null
+            for trade in bot_status.get_active_trades_by_exit_order_id("0"):  # TODO define an OrderId.Null
+                if amount_to_close > 0:
                     amount_to_close, rtn = self._close_individual_trade_on_new_order(bot_status, trade, order, amount_to_close, rtn)
 
         # close trade even with a different order_id
         if amount_to_close > 0:
             self._logger.warning("The order size is bigger than the trades with an explicit order_id or a blank order_id")
-            for trade in bot_status.active_trades[:]:
-                if amount_to_close > 0:
+            closed = {id(trade) for trade in bot_status.closed_trades[closed_trades_before:]}
+            for trade in bot_status.active_trades:
+                if amount_to_close <= 0:
+                    break
+                if id(trade) not in closed:
                     amount_to_close, rtn = self._close_individual_trade_on_new_order(bot_status, trade, order, amount_to_close, rtn)
 
+        bot_status.remove_active_trades(bot_status.closed_trades[closed_trades_before:])
+
         if amount_to_close > 0:  # TODO: how to pass min_amount?
             self._logger.error(f"The order size is bigger than any trade. {amount_to_close} left to close of {order.amount}.")
             pass
@@ -113,7 +125,7 @@ class BotStatusLogic:
             if order.status == OrderStatusType.closed:
                 bot_status.archived_orders.append(order)
             else:  # open & partials are active, budget is lock equally.
-                bot_status.active_orders.append(order)
+                bot_status.add_active_order(order)
 
         elif order.side == OrderSide.sell:
             if order.status == OrderStatusType.closed:
@@ -123,7 +135,7 @@ class BotStatusLogic:
             else:
                 # stop loss => if order.stop_price and order.stop_price > 0:
                 # TODO: budget.unlock (partial) ???
-                bot_status.active_orders.append(order)
+                bot_status.add_active_order(order)
         else:
             raise RuntimeError("Order condition unhandled (OrderSide)")
         return bot_status
@@ -149,16 +161,14 @@ class BotStatusLogic:
             elif order.status == OrderStatusType.canceled or order.status == OrderStatusType.rejected:
                 # on buy, cancel or rejected
                 #   archive trade
-                trade_found = False
-                for trade in bot_status.active_trades[:]:
-                    if trade.entry_order_id == order.id:
-                        bot_status.active_trades.remove(trade)
-                        trade.exit_time = order.timestamp
-                        trade.exit_price = 0
-                        trade.exit_order_id = order.status
-                        bot_status.closed_trades.append(trade)
-                        trade_found = True
-                if not trade_found:
+                trades = bot_status.get_active_trades_by_entry_order_id(order.id)
+                bot_status.remove_active_trades(trades)
+                for trade in trades:
+                    trade.exit_time = order.timestamp
+                    trade.exit_price = 0
+                    trade.exit_order_id = order.status
+                    bot_status.closed_trades.append(trade)
+                if not trades:
                     self._logger.error(f"Order {order.id} canceled or rejected not found in trades. Bot: {bot_status.bot_id}")
                     pass
 
@@ -199,11 +209,7 @@ class BotStatusLogic:
         return bot_status
 
     def archive_order_on_cancel(self, bot_status: BotStatus, order: Order) -> BotStatus:
-        found_order = False
-        for loop_order in bot_status.active_orders[:]:
-            if loop_order.id == order.id:
-                bot_status.active_orders.remove(loop_order)
-                found_order = True
+        found_order = bot_status.remove_active_order(order.id) is not None
         if not found_order:
             # self._logger.error(f"Order {order.id} canceled but not found in active_orders. Bot: {self.bot_id}")
             pass
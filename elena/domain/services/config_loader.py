@@ -75,6 +75,7 @@ class ConfigLoader:
                     pct_reinvest_profit=bot["pct_reinvest_profit"],
                     tags=bot["tags"],
                     config=bot["config"],
+                    order_book_sources=bot.get("order_book_sources"),
                 )
             except KeyError as err:
                 raise ValueError(f"Missing bot configuration: {err}")
@@ -1,17 +1,24 @@
 import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from datetime import datetime
-from typing import Dict
+from functools import partial
+from typing import Dict, List, Optional
 
+from elena.domain.model.exchange import ExchangeType
 from elena.domain.model.strategy_config import StrategyConfig
 from elena.domain.ports.bot_manager import BotManager
 from elena.domain.ports.config_manager import ConfigManager
 from elena.domain.ports.exchange_manager import ExchangeManager
 from elena.domain.ports.logger import Logger
-from elena.domain.ports.metrics_manager import MetricsManager
+from elena.domain.ports.metrics_manager import LOAD_STATUSES_TIME, SAVE_STATUSES_TIME, STRATEGY_TIME, MetricsManager
 from elena.domain.ports.notifications_manager import NotificationsManager
-from elena.domain.ports.storage_manager import StorageManager
+from elena.domain.ports.storage_manager import StorageError, StorageManager
+from elena.domain.services.bot_scheduler import BotScheduler
 from elena.domain.services.config_loader import ConfigLoader
 from elena.domain.services.strategy_manager import StrategyManagerImpl
+from elena.domain.services.timing import TimingsSummary, span
 from elena.shared.dynamic_loading import get_class
 
 
@@ -24,6 +31,7 @@ class Elena:
         notifications_manager: NotificationsManager,
         bot_manager: BotManager,
         exchange_manager: ExchangeManager,
+        storage_manager: Optional[StorageManager] = None,
     ):
         self._config = config
         self._logger = logger
@@ -31,32 +39,148 @@ class Elena:
         self._notifications_manager = notifications_manager
         self._bot_manager = bot_manager
         self._exchange_manager = exchange_manager
+        self._storage_manager = storage_manager
         self._config_loader = ConfigLoader(self._config, self._logger)
+        elena_config = self._config.get("Elena", {})
+        self._bot_workers = elena_config.get("bot_workers", 1)
+        self._bot_workers_by_exchange = {ExchangeType(exchange_id): workers for exchange_id, workers in (elena_config.get("bot_workers_by_exchange") or {}).items()}
+        self._exchange_semaphores = {exchange_id: threading.Semaphore(workers) for exchange_id, workers in self._bot_workers_by_exchange.items()}
+        self._strategy_workers = elena_config.get("strategy_workers", 1)
+        self._cycle_deadline_seconds = elena_config.get("cycle_deadline_seconds", 0)
+        if elena_config.get("timings_summary", False):
+            self._metrics_manager = TimingsSummary(metrics_manager)
+        self._stop_event = threading.Event()
+        # strategies still running after a cycle deadline, they are not started again until they finish
+        self._running_strategies: Dict[str, Future] = {}
+        self._running_strategies_lock = threading.Lock()
         self._logger.info("Elena initialized")
 
+    @property
+    def logger(self) -> Logger:
+        return self._logger
+
+    def stop(self):
+        """
+        Requests the running cycle to stop, strategies not started yet are skipped
+        """
+        self._stop_event.set()
+
+    def close(self):
+        """
+        Releases the resources kept by the adapters between cycles, i.e. exchange connections, buffered metrics or open files,
+        once the strategies still running have finished
+        """
+        with self._running_strategies_lock:
+            running = list(self._running_strategies.values())
+        if running:
+            self._logger.info("Waiting for %d running strategies ...", len(running))
+            wait(running)
+        for adapter in [self._exchange_manager, self._metrics_manager, self._storage_manager]:
+            close = getattr(adapter, "close", None)
+            if callable(close):
+                close()
+
     def run(self):
         now = datetime.now()
         self._logger.info("Starting cycle at %s", now.isoformat())
-        for _strategy_config in self._config_loader.strategies:
-            self._run_strategy(_strategy_config)
+        deadline = time.monotonic() + self._cycle_deadline_seconds if self._cycle_deadline_seconds > 0 else None
+        strategies = self._config_loader.strategies
+        if self._strategy_workers > 1 and len(strategies) > 1:
+            self._run_strategies_in_parallel(strategies, deadline)
+        else:
+            for _strategy_config in strategies:
+                if deadline is not None and time.monotonic() >= deadline:
+                    self._logger.warning("Cycle deadline reached, skipping strategy %s: %s", _strategy_config.id, _strategy_config.name)
+                    continue
+                self._run_timed_strategy(_strategy_config)
+        if isinstance(self._metrics_manager, TimingsSummary):
+            self._logger.info("Cycle ran in %.3f seconds, timings:\n%s", (datetime.now() - now).total_seconds(), self._metrics_manager.pop_summary())
+        self._metrics_manager.flush()
+
+    def _run_strategies_in_parallel(self, strategies: List[StrategyConfig], deadline: Optional[float]):
+        # strategies are independent, they have their own bots and statuses
+        executor = ThreadPoolExecutor(max_workers=self._strategy_workers, thread_name_prefix="strategy")
+        futures = {}
+        for _strategy_config in strategies:
+            with self._running_strategies_lock:
+                if _strategy_config.id in self._running_strategies:
+                    self._logger.warning("Strategy %s: %s is still running from a previous cycle, skipping it", _strategy_config.id, _strategy_config.name)
+                    continue
+                future = executor.submit(self._run_timed_strategy, _strategy_config)
+                self._running_strategies[_strategy_config.id] = future
+            future.add_done_callback(partial(self._strategy_done, _strategy_config))
+            futures[future] = _strategy_config
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        done, not_done = wait(futures, timeout=timeout)
+        for future in not_done:
+            _strategy_config = futures[future]
+            if future.cancel():
+                self._logger.warning("Cycle deadline reached, skipping strategy %s: %s", _strategy_config.id, _strategy_config.name)
+            else:
+                self._logger.warning("Cycle deadline reached, strategy %s: %s is still running", _strategy_config.id, _strategy_config.name)
+        # running strategies save their statuses when they finish
+        executor.shutdown(wait=False)
+
+    def _strategy_done(self, strategy_config: StrategyConfig, future: Future):
+        with self._running_strategies_lock:
+            self._running_strategies.pop(strategy_config.id, None)
+        if future.cancelled():
+            return
+        err = future.exception()
+        if err is not None:
+            self._logger.error("Error running strategy %s: %s: %s", strategy_config.id, strategy_config.name, err, exc_info=err)
+
+    def _run_timed_strategy(self, strategy_config: StrategyConfig):
+        if self._stop_event.is_set():
+            self._logger.warning("Elena is stopping, skipping strategy %s: %s", strategy_config.id, strategy_config.name)
+            return
+        start = time.perf_counter()
+        with span(self._metrics_manager, STRATEGY_TIME, strategy_config.id, [f"strategy:{strategy_config.id}"]):
+            self._run_strategy(strategy_config)
+        self._logger.info("Strategy %s ran in %.3f seconds", strategy_config.id, time.perf_counter() - start)
 
     def _run_strategy(self, strategy_config: StrategyConfig):
         if not strategy_config.enabled:
             self._logger.info("Skipping strategy %s: %s", strategy_config.id, strategy_config.name)
             return
+        schedule_index = self._bot_manager.load_schedule_index(strategy_config)
+        due_bots = BotScheduler.get_due_bots(strategy_config, schedule_index, datetime.now())
+        if not due_bots:
+            self._logger.debug("No bots due for strategy %s: %s", strategy_config.id, strategy_config.name)
+            return
         self._logger.info("Running strategy %s: %s", strategy_config.id, strategy_config.name)
+        # only the due bots statuses are loaded
+        due_strategy_config = strategy_config.copy(update={"bots": due_bots})
         strategy_manager = StrategyManagerImpl(
-            strategy_config=strategy_config,
+            strategy_config=due_strategy_config,
             logger=self._logger,
             metrics_manager=self._metrics_manager,
             notifications_manager=self._notifications_manager,
             bot_manager=self._bot_manager,
             exchange_manager=self._exchange_manager,
             exchanges=self._config_loader.exchanges,
+            bot_workers=self._bot_workers,
+            bot_workers_by_exchange=self._bot_workers_by_exchange,
+            exchange_semaphores=self._exchange_semaphores,
         )
-        previous_statuses = self._bot_manager.load_all(strategy_config)
+        tags = [f"strategy:{strategy_config.id}"]
+        with span(self._metrics_manager, LOAD_STATUSES_TIME, strategy_config.id, tags):
+            previous_statuses = self._bot_manager.load_all(due_strategy_config)
+        BotScheduler.restore_last_executions(previous_statuses, schedule_index)
+        # bots set their status timestamp when they start, the ones failing are due again on the next cycle
+        executions = {_status.bot_id: _status.timestamp for _status in previous_statuses}
         new_statuses = strategy_manager.run(previous_statuses)
-        self._bot_manager.save_all(new_statuses)
+        with span(self._metrics_manager, SAVE_STATUSES_TIME, strategy_config.id, tags):
+            try:
+                self._bot_manager.save_all(new_statuses)
+            except StorageError as err:
+                # the schedule index is kept, so the bots not saved are due again on the next cycle
+                self._logger.error("Error saving bot statuses for strategy %s: %s: %s", strategy_config.id, strategy_config.name, err)
+                return
+        executions.update({_status.bot_id: _status.timestamp for _status in new_statuses})
+        new_schedule_index = BotScheduler.update_schedule_index(strategy_config, schedule_index, executions)
+        if new_schedule_index != schedule_index:
+            self._bot_manager.save_schedule_index(new_schedule_index)
 
 
 def get_config_manager(config_manager_class_path: str, config_manager_url: str) -> ConfigManager:
@@ -150,4 +274,5 @@ def get_elena_instance(config_manager_class_path: str = "elena.adapters.config.l
         notifications_manager=notifications_manager,
         bot_manager=bot_manager,
         exchange_manager=exchange_manager,
+        storage_manager=storage_manager,
     )
@@ -16,10 +16,24 @@ from elena.domain.model.trading_pair import TradingPair
 from elena.domain.ports.bot import Bot
 from elena.domain.ports.exchange_manager import ExchangeManager
 from elena.domain.ports.logger import Logger
-from elena.domain.ports.metrics_manager import MetricsManager, ORDER_CANCELLED, ORDER_STOP_LOSS, ORDER_BUY_MARKET, ORDER_SELL_MARKET, ORDER_STOP_LOSS_CLOSED, ESTIMATED_LAST_CLOSE, ESTIMATED_SALE_PRICE
+from elena.domain.ports.metrics_manager import (
+    MetricsManager,
+    ORDER_CANCELLED,
+    ORDER_STOP_LOSS,
+    ORDER_BUY_MARKET,
+    ORDER_SELL_MARKET,
+    ORDER_STOP_LOSS_CLOSED,
+    ESTIMATED_LAST_CLOSE,
+    ESTIMATED_SALE_PRICE,
+    UPDATE_ORDERS_STATUS_TIME,
+    READ_CANDLES_TIME,
+    READ_ORDER_BOOK_TIME,
+    PLACE_ORDER_TIME,
+)
 from elena.domain.ports.notifications_manager import NotificationsManager
 from elena.domain.ports.strategy_manager import StrategyManager
 from elena.domain.services.bot_status_logic import BotStatusLogic
+from elena.domain.services.timing import span
 
 
 class GenericBot(Bot):
@@ -39,6 +53,8 @@ class GenericBot(Bot):
     _notifications_manager: NotificationsManager
     _bot_status_logic: BotStatusLogic
     _order_book_cache: OrderBook
+    _order_book_cache_depth: Optional[int]
+    _timer_tags: List[str]
 
     def init(
         self,
@@ -69,6 +85,7 @@ class GenericBot(Bot):
             raise Exception(f"Cannot get Exchange from {bot_config.exchange_id} ID")
         self.exchange = exchange  # type: ignore
         self.exchange_manager = exchange_manager
+        self._timer_tags = [f"exchange:{bot_config.exchange_id.value}", f"pair:{self.pair}"]
 
         precision_amount = int(self.exchange_manager.get_precision_amount(self.exchange, self.pair))
         precision_price = int(self.exchange_manager.get_precision_price(self.exchange, self.pair))
@@ -76,8 +93,10 @@ class GenericBot(Bot):
         self.status.budget.precision_price = precision_price
 
         self._order_book_cache = None
+        self._order_book_cache_depth = None
 
-        self._update_orders_status()
+        with span(self._metrics_manager, UPDATE_ORDERS_STATUS_TIME, self.id, self._timer_tags):
+            self._update_orders_status()
 
     def new_trade_manual(self, size: float, entry_price: float, exit_order_id, exit_price: float) -> str:
         new_trade = Trade(
@@ -94,7 +113,7 @@ class GenericBot(Bot):
         new_trade.id = str(int(time.time() * 1000))  # TODO: improve trade.id auto generation
         new_trade.entry_cost = entry_price * size
         new_trade.entry_time = int(new_trade.id)
-        self.status.active_trades.append(new_trade)
+        self.status.add_active_trade(new_trade)
         return new_trade.id
 
     def _update_orders_status(self) -> BotStatus:
@@ -102,9 +121,10 @@ class GenericBot(Bot):
         # update active and archived orders
         # call _update_trades_on_update_orders to update trades
         updated_orders = []
+        fetched_orders = self.fetch_orders([order.id for order in self.status.active_orders])
         for order in self.status.active_orders:
-            # update order status
-            updated_order = self.fetch_order(order.id)
+            # update order status, the orders missing from the bulk read are fetched one by one
+            updated_order = fetched_orders.get(order.id) or self.fetch_order(order.id)
 
             if updated_order:
                 self.status = self._bot_status_logic.update_trades_on_update_orders(self.status, updated_order)
@@ -147,12 +167,13 @@ class GenericBot(Bot):
         if not time_frame:
             time_frame = self.time_frame
         try:
-            return self.exchange_manager.read_candles(
-                self.exchange,
-                pair=self.pair,
-                time_frame=time_frame,
-                page_size=page_size,
-            )
+            with span(self._metrics_manager, READ_CANDLES_TIME, self.id, self._timer_tags):
+                return self.exchange_manager.read_candles(
+                    self.exchange,
+                    pair=self.pair,
+                    time_frame=time_frame,
+                    page_size=page_size,
+                )
         except Exception as err:
             print(f"Error reading candles: {err}")
             self._logger.error("Error reading candles: %s", err, exc_info=1)
@@ -204,16 +225,22 @@ class GenericBot(Bot):
             self._logger.error("Error getting price to precision: %s", err, exc_info=1)
             return None
 
-    def get_order_book(self, use_cache: bool = False) -> Optional[OrderBook]:
-        if use_cache and self._order_book_cache:
+    def get_order_book(self, use_cache: bool = False, depth: Optional[int] = None) -> Optional[OrderBook]:
+        # depth: levels needed on each side, None for the whole book. The cached book is used when it is deep enough.
+        if use_cache and self._order_book_cache and (self._order_book_cache_depth is None or (depth is not None and self._order_book_cache_depth >= depth)):
             return self._order_book_cache
 
         try:
-            order_book = self.exchange_manager.read_order_book(
-                self.exchange,
-                pair=self.pair,
-            )
+            with span(self._metrics_manager, READ_ORDER_BOOK_TIME, self.id, self._timer_tags):
+                order_book = self.exchange_manager.read_order_book(
+                    self.exchange,
+                    pair=self.pair,
+                    depth=depth,
+                    sources=self.bot_config.order_book_sources,
+                )
             self._order_book_cache = order_book
+            # the book may be deeper than asked for, i.e. read with the next order book limit
+            self._order_book_cache_depth = None if depth is None else max(depth, min(len(order_book.bids_array), len(order_book.asks_array)))
             return order_book
         except Exception as err:
             print(f"Error getting order book: {err}")
@@ -257,7 +284,7 @@ class GenericBot(Bot):
                 "timeInForce": "GTC",
             }
 
-            order = self.exchange_manager.place_order(
+            order = self._place_order(
                 self.exchange,
                 bot_config=self.bot_config,
                 order_type=OrderType.limit,  # type: ignore
@@ -277,6 +304,10 @@ class GenericBot(Bot):
             self._logger.error("Error creating stop loss: %s", err, exc_info=1)
             return None
 
+    def _place_order(self, *args, **kwargs) -> Order:
+        with span(self._metrics_manager, PLACE_ORDER_TIME, self.id, self._timer_tags):
+            return self.exchange_manager.place_order(*args, **kwargs)
+
     def create_limit_buy_order(self, amount, price) -> Optional[Order]:
         """buy (0.01 BTC at 47k USDT)  pair=BTC/UST"""
         raise NotImplementedError
@@ -289,7 +320,7 @@ class GenericBot(Bot):
             params = {"type": "spot"}
 
             amount = self.amount_to_precision(amount)
-            order = self.exchange_manager.place_order(
+            order = self._place_order(
                 self.exchange,
                 bot_config=self.bot_config,
                 order_type=OrderType.market,  # type: ignore
@@ -313,7 +344,7 @@ class GenericBot(Bot):
             params = {"type": "spot"}
 
             amount = self.amount_to_precision(amount)
-            order = self.exchange_manager.place_order(
+            order = self._place_order(
                 self.exchange,
                 bot_config=self.bot_config,
                 order_type=OrderType.market,  # type: ignore
@@ -326,7 +357,7 @@ class GenericBot(Bot):
             self._notifications_manager.low(f"Placed market sell: {order.id} for {order.amount} {order.pair.base} at {order.average} {order.pair.quote}, getting: {order.cost}{order.pair.quote}")
 
             for trade in trades_to_close:
-                trade.exit_order_id = order.id
+                self.status.set_trade_exit_order_id(trade, order.id)
                 trade.exit_time = order.timestamp
                 trade.exit_price = order.average
 
@@ -349,6 +380,22 @@ class GenericBot(Bot):
             self._logger.error("Error fetching order: %s", err, exc_info=1)
             return None
 
+    def fetch_orders(self, order_ids: List[str]) -> Dict[str, Order]:
+        if not order_ids:
+            return {}
+        try:
+            return (
+                self.exchange_manager.fetch_orders(
+                    self.exchange,
+                    bot_config=self.bot_config,
+                    order_ids=order_ids,
+                )
+                or {}
+            )
+        except Exception as err:
+            self._logger.error("Error fetching orders: %s", err, exc_info=1)
+            return {}
+
 
 
     def get_estimated_last_close(self) -> Optional[float]:
@@ -361,12 +408,12 @@ class GenericBot(Bot):
         # should use fetchL[123]OrderBook family instead.
         # The idea was to use fetch_ticker[close]
 
-        order_book = self.get_order_book()
+        # the top of the book is enough, read from the cheapest order book source
+        order_book = self.get_order_book(depth=1)
         try:
-            # TODO order_book.bids and asks could be empty
-            last_bid = order_book.bids[0].price
-            last_ask = order_book.asks[0].price
-            estimated_last_close = (last_bid + last_ask) / 2
+            estimated_last_close = order_book.mid_price()
+            if estimated_last_close is None:
+                return None
             self._metrics_manager.gauge(ESTIMATED_LAST_CLOSE, self.id, estimated_last_close, ["indicator"])
             return estimated_last_close
         except Exception as err:  # noqa: F841
@@ -374,13 +421,21 @@ class GenericBot(Bot):
 
     def get_estimated_sell_price_from_cache(self) -> Optional[float]:
         # https://docs.ccxt.com/#/?id=ticker-structure
-        order_book = self.get_order_book(use_cache=True)
+        order_book = self.get_order_book(use_cache=True, depth=3)
 
         try:
-            # TODO order_book.bids and asks could be empty
-            estimated_sell_price = (order_book.bids[0].price + order_book.bids[1].price + order_book.bids[2].price) / 3
+            if len(order_book.bids_array) < 3:
+                return None
+            estimated_sell_price = float(order_book.bids_array[:3, 0].mean())
             self._metrics_manager.gauge(ESTIMATED_SALE_PRICE, self.id, estimated_sell_price, ["indicator"])
 
             return estimated_sell_price
         except Exception as err:  # noqa: F841
             return None
+
+    def get_estimated_fill_price(self, side: OrderSide, amount: float, use_cache: bool = True) -> Optional[float]:
+        # average price of a market order of amount walking the order book, None if the book is not deep enough
+        order_book = self.get_order_book(use_cache=use_cache)
+        if order_book is None:
+            return None
+        return order_book.vwap(side, amount)
@@ -1,9 +1,11 @@
 import os
+import threading
 import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import nullcontext
 from datetime import datetime
-from typing import List, Optional, Tuple
-
-from cron_converter import Cron
+from typing import Deque, Dict, List, Optional, Tuple
 
 from elena.domain.model.bot_config import BotConfig
 from elena.domain.model.bot_status import BotStatus, BotBudget
@@ -13,9 +15,11 @@ from elena.domain.ports.bot import Bot
 from elena.domain.ports.bot_manager import BotManager
 from elena.domain.ports.exchange_manager import ExchangeManager
 from elena.domain.ports.logger import Logger
-from elena.domain.ports.metrics_manager import MetricsManager
+from elena.domain.ports.metrics_manager import BOT_NEXT_TIME, MetricsManager
 from elena.domain.ports.notifications_manager import NotificationsManager
 from elena.domain.ports.strategy_manager import StrategyManager
+from elena.domain.services.bot_scheduler import get_next_execution
+from elena.domain.services.timing import span
 from elena.shared.dynamic_loading import get_class
 
 
@@ -29,6 +33,9 @@ class StrategyManagerImpl(StrategyManager):
         bot_manager: BotManager,
         exchange_manager: ExchangeManager,
         exchanges: List[Exchange],
+        bot_workers: int = 1,
+        bot_workers_by_exchange: Optional[Dict[ExchangeType, int]] = None,
+        exchange_semaphores: Optional[Dict[ExchangeType, threading.Semaphore]] = None,
     ):
         self._config = strategy_config
         self._logger = logger
@@ -37,6 +44,9 @@ class StrategyManagerImpl(StrategyManager):
         self._bot_manager = bot_manager
         self._exchange_manager = exchange_manager
         self._exchanges = exchanges
+        self._bot_workers = bot_workers
+        self._bot_workers_by_exchange = bot_workers_by_exchange or {}
+        self._exchange_semaphores = exchange_semaphores or {}
 
     def run(self, previous_statuses: List[BotStatus]) -> List[BotStatus]:
         """
@@ -51,23 +61,58 @@ class StrategyManagerImpl(StrategyManager):
         """
 
         previous_statuses_dict = {_status.bot_id: _status for _status in previous_statuses}
-        updated_statuses = []
+        bots_to_run = []
         for bot_config in self._config.bots:
             run, status = self._get_run_status(bot_config, previous_statuses_dict)
             if run:
-                self._logger.info("Running bot %s: %s", bot_config.id, bot_config.name)
-                try:
-                    updated_status = self._run_bot(self._exchange_manager, bot_config, status)
-                    if updated_status:
-                        updated_statuses.append(updated_status)
-                except Exception as err:
-                    # A bad implemented bot should never crash Elena.
-                    # The other bot may work and may need to do operations
-                    self._logger.error("Unhandled exception: %s", err, exc_info=1)
-                    # Except we are on a test session.
-                    if "PYTEST_CURRENT_TEST" in os.environ:
-                        raise err
-        return updated_statuses
+                bots_to_run.append((bot_config, status))
+
+        if self._bot_workers > 1 and len(bots_to_run) > 1:
+            results = self._run_bots_in_parallel(bots_to_run)
+        else:
+            results = [self._run_bot_safely(bot_config, status) for bot_config, status in bots_to_run]
+        return [updated_status for updated_status in results if updated_status]
+
+    def _run_bots_in_parallel(self, bots_to_run: List[Tuple[BotConfig, BotStatus]]) -> List[Optional[BotStatus]]:
+        # bots are I/O bound on exchange calls, results keep the configuration order
+        pending: Dict[ExchangeType, Deque[int]] = defaultdict(deque)
+        for index, (bot_config, _) in enumerate(bots_to_run):
+            pending[bot_config.exchange_id].append(index)
+        running: Dict[Future, Tuple[ExchangeType, int]] = {}
+        running_by_exchange: Dict[ExchangeType, int] = defaultdict(int)
+        results: List[Optional[BotStatus]] = [None] * len(bots_to_run)
+        with ThreadPoolExecutor(max_workers=self._bot_workers, thread_name_prefix=self._config.id) as executor:
+            while pending or running:
+                # no more bots of an exchange than its limit are submitted, so none of them holds a worker waiting for it
+                for exchange_id in list(pending):
+                    limit = max(1, self._bot_workers_by_exchange.get(exchange_id, self._bot_workers))
+                    while pending[exchange_id] and running_by_exchange[exchange_id] < limit:
+                        index = pending[exchange_id].popleft()
+                        running[executor.submit(self._run_bot_safely, *bots_to_run[index])] = (exchange_id, index)
+                        running_by_exchange[exchange_id] += 1
+                    if not pending[exchange_id]:
+                        del pending[exchange_id]
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    exchange_id, index = running.pop(future)
+                    running_by_exchange[exchange_id] -= 1
+                    results[index] = future.result()
+        return results
+
+    def _run_bot_safely(self, bot_config: BotConfig, status: BotStatus) -> Optional[BotStatus]:
+        # shared by the strategies running at the same time
+        with self._exchange_semaphores.get(bot_config.exchange_id, nullcontext()):
+            self._logger.info("Running bot %s: %s", bot_config.id, bot_config.name)
+            try:
+                return self._run_bot(self._exchange_manager, bot_config, status)
+            except Exception as err:
+                # A bad implemented bot should never crash Elena.
+                # The other bot may work and may need to do operations
+                self._logger.error("Unhandled exception: %s", err, exc_info=1)
+                # Except we are on a test session.
+                if "PYTEST_CURRENT_TEST" in os.environ:
+                    raise err
+                return None
 
     def _get_run_status(self, bot_config: BotConfig, previous_statuses_dict) -> Tuple[bool, BotStatus]:
         run = True
@@ -88,9 +133,7 @@ class StrategyManagerImpl(StrategyManager):
         :param cron_expression: the cron expression to check
         :return: True if the bot has to run, False otherwise
         """
-        cron_instance = Cron(cron_expression)
-        schedule = cron_instance.schedule(last_execution)
-        next_execution = schedule.next()
+        next_execution = get_next_execution(last_execution, cron_expression)
         now = datetime.now()
         return next_execution <= now
 
@@ -102,7 +145,8 @@ class StrategyManagerImpl(StrategyManager):
     ) -> Optional[BotStatus]:
         bot_status.timestamp = int(time.time() * 1000)
         bot = self._get_bot_instance(exchange_manager, bot_config, bot_status)
-        return bot.next()
+        with span(self._metrics_manager, BOT_NEXT_TIME, bot_config.id, [f"exchange:{bot_config.exchange_id.value}", f"pair:{bot_config.pair}"]):
+            return bot.next()
 
     def _get_bot_instance(
         self,
@@ -0,0 +1,68 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+from elena.domain.ports.logger import Logger
+from elena.domain.ports.metrics_manager import MetricsManager
+from elena.domain.ports.storage_manager import StorageManager
+
+
+@contextmanager
+def span(metrics_manager: MetricsManager, metric: str, bot_id: str, tags: List[str]):
+    """Sends the time spent on the block as a timer metric, also when it raises"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics_manager.timer(metric, bot_id, (time.perf_counter() - start) * 1000, tags)
+
+
+class TimingsSummary(MetricsManager):
+    """
+    Sends every metric to the wrapped MetricsManager and adds up the timers by name,
+    so the time spent on every phase of a cycle can be logged at its end.
+    """
+
+    _metrics_manager: MetricsManager
+    _timings: Dict[str, List[float]]  # count, total and max milliseconds by timer
+    _lock: threading.Lock
+
+    def __init__(self, metrics_manager: MetricsManager):
+        self._metrics_manager = metrics_manager
+        self._timings = {}
+        self._lock = threading.Lock()
+
+    def init(self, config: dict, logger: Logger, storage_manager: StorageManager):
+        self._metrics_manager.init(config, logger, storage_manager)
+
+    def counter(self, metric: str, bot_id: str, value: int, tags: List[str]):
+        self._metrics_manager.counter(metric, bot_id, value, tags)
+
+    def gauge(self, metric: str, bot_id: str, value: float, tags: List[str]):
+        self._metrics_manager.gauge(metric, bot_id, value, tags)
+
+    def timer(self, metric: str, bot_id: str, value: float, tags: List[str]):
+        with self._lock:
+            timing = self._timings.setdefault(metric, [0, 0.0, 0.0])
+            timing[0] += 1
+            timing[1] += value
+            timing[2] = max(timing[2], value)
+        self._metrics_manager.timer(metric, bot_id, value, tags)
+
+    def flush(self):
+        self._metrics_manager.flush()
+
+    def close(self):
+        close = getattr(self._metrics_manager, "close", None)
+        if callable(close):
+            close()
+
+    def pop_summary(self) -> str:
+        """Returns the timers table since the last call, the slowest first"""
+        with self._lock:
+            timings, self._timings = self._timings, {}
+        lines = [f"{'timer':<24} {'count':>7} {'total ms':>12} {'avg ms':>10} {'max ms':>10}"]
+        for metric, (count, total, maximum) in sorted(timings.items(), key=lambda item: item[1][1], reverse=True):
+            lines.append(f"{metric:<24} {count:>7} {total:>12.3f} {total / count:>10.3f} {maximum:>10.3f}")
+        return "\n".join(lines)
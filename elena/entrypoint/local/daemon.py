@@ -0,0 +1,58 @@
+import signal
+import threading
+from typing import Optional
+
+import schedule
+
+from elena.domain.services.elena import Elena, get_elena_instance
+
+
+class Daemon:
+    """
+    Runs an Elena cycle at the start of every minute, the cron expressions resolution, on a long-running process.
+    Connections, markets and caches are kept between cycles.
+    """
+
+    def __init__(self, elena: Elena, scheduler: Optional[schedule.Scheduler] = None):
+        self._elena = elena
+        self._scheduler = scheduler or schedule.Scheduler()
+        self._stop_event = threading.Event()
+        self._scheduler.every().minute.at(":00").do(self._run_cycle)
+
+    def run(self):
+        self._elena.logger.info("Elena daemon started")
+        self._run_cycle()
+        while not self._stop_event.is_set():
+            self._scheduler.run_pending()
+            self._stop_event.wait(max(self._scheduler.idle_seconds or 0.0, 0.0))
+        self._elena.close()
+        self._elena.logger.info("Elena daemon stopped")
+
+    def _run_cycle(self):
+        if self._stop_event.is_set():
+            return
+        try:
+            self._elena.run()
+        except Exception as err:
+            # the next cycle may work, i.e. after a network error
+            self._elena.logger.error("Unhandled exception on cycle: %s", err, exc_info=1)
+
+    def stop(self, *args):
+        """
+        Stops the daemon, the running strategy finishes and saves its bot statuses, the pending ones are skipped.
+        Can be used as a signal handler.
+        """
+        self._elena.logger.info("Stopping Elena daemon ...")
+        self._stop_event.set()
+        self._elena.stop()
+
+
+def main():
+    daemon = Daemon(get_elena_instance())
+    signal.signal(signal.SIGTERM, daemon.stop)
+    signal.signal(signal.SIGINT, daemon.stop)
+    daemon.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,10 @@ from elena.domain.services.elena import get_elena_instance
 
 def main():
     elena = get_elena_instance()
-    elena.run()
+    try:
+        elena.run()
+    finally:
+        elena.close()
 
 
 if __name__ == "__main__":
@@ -1,8 +1,10 @@
 import importlib
+from functools import lru_cache
 
 
+@lru_cache(maxsize=None)
 def get_class(class_path: str):
-    """Get class from class path"""
+    """Get class from class path, resolved once"""
     try:
         class_parts = class_path.split(".")
         class_name = class_parts[-1]
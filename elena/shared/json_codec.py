@@ -0,0 +1,25 @@
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # optional, the standard library is used without it
+    orjson = None  # type: ignore
+
+
+def dumps(data: Any) -> str:
+    """Compact JSON, without indentation nor spaces, encoded with orjson when installed"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode()
+        except TypeError:
+            # i.e. integers bigger than 64 bits
+            pass
+    return json.dumps(data, separators=(",", ":"))
+
+
+def loads(json_data: Union[str, bytes]) -> Any:
+    """Decode JSON, with orjson when installed"""
+    if orjson is not None:
+        return orjson.loads(json_data)
+    return json.loads(json_data)
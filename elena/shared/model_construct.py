@@ -0,0 +1,30 @@
+from typing import Any, Dict, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+
+Model = TypeVar("Model", bound=BaseModel)
+
+
+def construct(_class: Type[Model], data: Optional[Dict[str, Any]] = None, **values) -> Model:
+    """
+    Builds a model without validation, for data already validated or coming from a trusted adapter.
+    Like construct(), without its per field overhead: the values are taken from the keyword arguments, then from data,
+    missing optional fields take their default and keys that are not fields are ignored as parse_obj does.
+    Raises KeyError when a required field is missing.
+    """
+    fields_values = {}
+    for name, field in _class.__fields__.items():
+        if name in values:
+            fields_values[name] = values[name]
+        elif data is not None and name in data:
+            fields_values[name] = data[name]
+        elif field.required:
+            raise KeyError(name)
+        else:
+            fields_values[name] = field.get_default()
+    model = _class.__new__(_class)
+    object.__setattr__(model, "__dict__", fields_values)
+    object.__setattr__(model, "__fields_set__", set(fields_values))
+    if _class.__private_attributes__:
+        model._init_private_attributes()
+    return model
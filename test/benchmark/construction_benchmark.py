@@ -0,0 +1,182 @@
+"""
+Benchmark of the models built from exchange data, validated by pydantic against the construction without validation
+the adapters use for the data ccxt already parsed.
+
+    python -m test.benchmark.construction_benchmark --levels 5000 --orders 1000 --currencies 500
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from test.benchmark.cycle_benchmark import BenchmarkLogger
+from typing import Callable, Dict, List, Optional
+
+from elena.adapters.exchange_manager.cctx_exchange_manager import CctxExchangeManager
+from elena.domain.model.balance import Balance, ByAvailability, ByCurrency
+from elena.domain.model.bot_budget import BotBudget
+from elena.domain.model.bot_config import BotConfig
+from elena.domain.model.bot_status import BotStatus
+from elena.domain.model.exchange import Exchange, ExchangeType
+from elena.domain.model.order import Order, OrderSide, OrderStatusType, OrderType
+from elena.domain.model.order_book import OrderBook, PriceAmount
+from elena.domain.model.trade import Trade
+from elena.domain.model.trading_pair import TradingPair
+from elena.domain.services.bot_status_logic import BotStatusLogic
+
+PAIR = TradingPair.build("BTC/USDT")
+
+
+def _build_ccxt_order_book(levels: int) -> Dict:
+    return {
+        "bids": [[30000.0 - i * 0.01, 0.001 * (i % 7 + 1)] for i in range(levels)],
+        "asks": [[30000.01 + i * 0.01, 0.001 * (i % 5 + 1)] for i in range(levels)],
+    }
+
+
+def _build_ccxt_order(order_id: int) -> Dict:
+    return {
+        "id": str(order_id),
+        "timestamp": 1700000000000 + order_id,
+        "type": "limit",
+        "side": "buy",
+        "price": 30000.0,
+        "amount": 0.001,
+        "cost": 30.0,
+        "average": 30000.0,
+        "filled": 0.001,
+        "remaining": 0.0,
+        "status": "closed",
+        "fee": {"currency": "USDT", "cost": 0.03, "rate": 0.001},
+        "triggerPrice": None,
+        "stopPrice": None,
+        "takeProfitPrice": None,
+        "stopLossPrice": None,
+    }
+
+
+def _build_ccxt_balance(currencies: int) -> Dict:
+    balance: Dict = {"info": {}, "timestamp": 1700000000000, "free": {}, "used": {}, "total": {}}
+    for i in range(currencies):
+        currency = f"C{i}"
+        balance["free"][currency] = float(i)
+        balance["used"][currency] = 0.0
+        balance["total"][currency] = float(i)
+        balance[currency] = {"free": float(i), "used": 0.0, "total": float(i)}
+    return balance
+
+
+def _validated_order_book(ob: Dict) -> OrderBook:
+    bids = [PriceAmount(price=bid[0], amount=bid[1]) for bid in ob["bids"]]
+    asks = [PriceAmount(price=ask[0], amount=ask[1]) for ask in ob["asks"]]
+    return OrderBook(bids=bids, asks=asks)
+
+
+def _validated_orders(manager: CctxExchangeManager, exchange: Exchange, bot_config: BotConfig, orders: List[Dict]) -> List[Order]:
+    return [Order(**manager._map_order_fields(exchange, bot_config, PAIR, order)) for order in orders]
+
+
+def _validated_balance(balance: Dict) -> Balance:
+    return Balance(
+        timestamp=balance["timestamp"],
+        free=[ByAvailability(currency=currency, amount=amount) for currency, amount in balance["free"].items()],
+        used=[ByAvailability(currency=currency, amount=amount) for currency, amount in balance["used"].items()],
+        total=[ByAvailability(currency=currency, amount=amount) for currency, amount in balance["total"].items()],
+        currencies={currency: ByCurrency(**balance[currency]) for currency in balance["free"]},
+        info=balance["info"],
+    )
+
+
+def _validated_trades(bot_status: BotStatus, orders: List[Order]) -> List[Trade]:
+    return [
+        Trade(
+            exchange_id=order.exchange_id,
+            bot_id=bot_status.bot_id,
+            strategy_id=order.strategy_id,
+            pair=order.pair,
+            size=order.amount,
+            entry_order_id=order.id,
+            entry_price=order.average,
+            entry_cost=order.cost,
+            entry_time=order.timestamp,
+            exit_order_id="0",
+            exit_price=0.0,
+            exit_cost=0.0,
+        )
+        for order in orders
+    ]
+
+
+def _fast_trades(bot_status: BotStatus, orders: List[Order]) -> List[Trade]:
+    for order in orders:
+        BotStatusLogic._new_trade_by_order(bot_status, order)
+    return bot_status.active_trades
+
+
+def _new_bot_status() -> BotStatus:
+    return BotStatus(bot_id="bot", active_orders=[], archived_orders=[], active_trades=[], closed_trades=[], budget=BotBudget())
+
+
+def _median_ms(function: Callable, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def run_benchmark(levels: int, orders: int, currencies: int, repeat: int = 5) -> Dict[str, Dict[str, float]]:
+    manager = CctxExchangeManager()
+    manager.init({"ExchangeManager": {}}, BenchmarkLogger(), None)  # type: ignore
+    exchange = Exchange(id=ExchangeType.bitget, api_key="", password="", secret="")
+    bot_config = BotConfig(id="bot", name="bot", strategy_id="strategy", pair=PAIR, exchange_id=ExchangeType.bitget, time_frame="1m", cron_expression="* * * * *", tags=[], config={})
+
+    ccxt_order_book = _build_ccxt_order_book(levels)
+    ccxt_orders = [_build_ccxt_order(i) for i in range(orders)]
+    ccxt_balance = _build_ccxt_balance(currencies)
+    mapped_orders = [manager._map_order(exchange, bot_config, PAIR, order) for order in ccxt_orders]
+    assert all(order.status == OrderStatusType.closed and order.side == OrderSide.buy and order.type == OrderType.limit for order in mapped_orders)
+
+    cases = {
+        f"order book {levels} levels": (
+            lambda: _validated_order_book(ccxt_order_book),
+            lambda: manager._map_order_book(ccxt_order_book),
+        ),
+        f"{orders} orders": (
+            lambda: _validated_orders(manager, exchange, bot_config, ccxt_orders),
+            lambda: [manager._map_order(exchange, bot_config, PAIR, order) for order in ccxt_orders],
+        ),
+        f"balance {currencies} currencies": (
+            lambda: _validated_balance(ccxt_balance),
+            lambda: manager._map_balance(ccxt_balance),
+        ),
+        f"{orders} trades": (
+            lambda: _validated_trades(_new_bot_status(), mapped_orders),
+            lambda: _fast_trades(_new_bot_status(), mapped_orders),
+        ),
+    }
+    return {name: {"validated_ms": _median_ms(validated, repeat), "fast_ms": _median_ms(fast, repeat)} for name, (validated, fast) in cases.items()}
+
+
+def print_report(result: Dict[str, Dict[str, float]]):
+    print(f"{'':32s}{'validated':>12s}{'fast':>12s}{'speedup':>9s}")
+    for name, times in result.items():
+        speedup = times["validated_ms"] / times["fast_ms"] if times["fast_ms"] else 0.0
+        print(f"{name:32s}{times['validated_ms']:10.2f}ms{times['fast_ms']:10.2f}ms{speedup:8.1f}x")
+
+
+def main(args: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark of the models built from exchange data, validated and not")
+    parser.add_argument("--levels", type=int, default=5000, help="bids and asks of the order book")
+    parser.add_argument("--orders", type=int, default=1000, help="orders and trades")
+    parser.add_argument("--currencies", type=int, default=500, help="currencies of the balance")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs of every case, the median is reported")
+    options = parser.parse_args(args)
+
+    print_report(run_benchmark(options.levels, options.orders, options.currencies, options.repeat))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
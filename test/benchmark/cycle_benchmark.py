@@ -0,0 +1,358 @@
+"""
+Benchmark of a full Elena cycle on a simulated exchange.
+
+Builds Elena with N strategies x M bots, every bot with K active orders and trades and H archived orders and
+closed trades, runs some cycles and reports the cycle latency, the time of every phase, the memory allocated
+on a cycle and the peak RSS, compared to a stored baseline. The committed baseline.json was measured on one machine,
+a reference only, save your own before comparing changes.
+
+    python -m test.benchmark.cycle_benchmark --strategies 4 --bots 25 --orders 20 --history 1000
+    python -m test.benchmark.cycle_benchmark --save-baseline
+"""
+
+import argparse
+import json
+import logging
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import ExitStack
+from os import path
+from test.benchmark.simulated_exchange_manager import SimulatedExchangeManager
+from typing import Dict, List, Optional
+from unittest.mock import patch
+
+from elena.adapters.bot_manager.local_bot_manager import LocalBotManager
+from elena.domain.model.bot_status import BotBudget, BotStatus
+from elena.domain.model.exchange import ExchangeType
+from elena.domain.model.order import Order, OrderSide, OrderStatusType, OrderType
+from elena.domain.model.trade import Trade
+from elena.domain.model.trading_pair import TradingPair
+from elena.domain.ports.logger import Logger
+from elena.domain.services.elena import Elena, get_bot_manager, get_metrics_manager, get_notifications_manager, get_storage_manager
+from elena.domain.services.generic_bot import GenericBot
+from elena.shared.dynamic_loading import get_class
+
+DEFAULT_BASELINE = path.join(path.dirname(__file__), "baseline.json")
+PAIR = TradingPair.build("BTC/USDT")
+
+BENCHMARK_BOT_CLASS = "test.benchmark.cycle_benchmark.BenchmarkBot"
+
+STORAGE_MANAGERS = {
+    "file": "elena.adapters.storage_manager.local_storage_manager.LocalStorageManager",
+    "sqlite": "elena.adapters.storage_manager.sqlite_storage_manager.SqliteStorageManager",
+}
+
+
+class BenchmarkBot(GenericBot):
+    """Reads the market data and computes a moving average, it doesn't place orders so every cycle does the same work"""
+
+    def next(self) -> BotStatus:
+        candles = self.read_candles()
+        estimated_close_price = self.get_estimated_last_close()
+        moving_average = candles["Close"].rolling(20).mean().iloc[-1]
+        self._logger.debug("%s estimated close %s, moving average %s", self.id, estimated_close_price, moving_average)
+        return self.status
+
+
+class BenchmarkLogger(Logger):
+    """Logs at INFO level to a handler that discards the records, as LocalLogger without the I/O"""
+
+    def __init__(self):
+        self._logger = logging.getLogger("elena.benchmark")
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        if not self._logger.handlers:
+            self._logger.addHandler(logging.NullHandler())
+
+    def init(self, config: Dict):
+        pass
+
+    def critical(self, msg, *args, **kwargs):
+        self._logger.critical(msg, *args, **kwargs)
+
+    def error(self, msg, *args, **kwargs):
+        self._logger.error(msg, *args, **kwargs)
+
+    def exception(self, msg, *args, exc_info=True, **kwargs):
+        self._logger.exception(msg, *args, exc_info=exc_info, **kwargs)
+
+    def warning(self, msg, *args, **kwargs):
+        self._logger.warning(msg, *args, **kwargs)
+
+    def info(self, msg, *args, **kwargs):
+        self._logger.info(msg, *args, **kwargs)
+
+    def debug(self, msg, *args, **kwargs):
+        self._logger.debug(msg, *args, **kwargs)
+
+
+class PhaseTimer:
+    """Adds up the time spent on the wrapped methods by phase"""
+
+    def __init__(self):
+        self.totals: Dict[str, float] = {}
+
+    def wrap(self, stack: ExitStack, owner: type, method_name: str, phase: str):
+        method = getattr(owner, method_name)
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.totals[phase] = self.totals.get(phase, 0.0) + time.perf_counter() - start
+
+        stack.enter_context(patch.object(owner, method_name, timed))
+
+    def reset(self) -> Dict[str, float]:
+        totals, self.totals = self.totals, {}
+        return totals
+
+
+def _build_config(home: str, strategies: int, bots: int, storage: str) -> Dict:
+    return {
+        "home": home,
+        "Elena": {},
+        "MetricsManager": {"class": "elena.adapters.metrics_manager.local_metrics_manager.LocalMetricsManager", "flush_interval_seconds": 60},
+        "NotificationsManager": {"class": "elena.adapters.notifications_manager.local_notifications_manager.LocalNotificationsManager"},
+        "BotManager": {"class": "elena.adapters.bot_manager.local_bot_manager.LocalBotManager"},
+        "StorageManager": {"class": STORAGE_MANAGERS[storage], "path": "storage", "backups": 1, "fsync": False},
+        "Tags": [{"id": "benchmark", "enabled": True}],
+        "Exchanges": [{"id": "binance", "enabled": True, "sandbox_mode": True, "api_key": "key", "password": "password", "secret": "secret"}],
+        "Strategies": [
+            {
+                "id": f"strategy_{strategy}",
+                "name": f"Benchmark strategy {strategy}",
+                "enabled": True,
+                "strategy_class": BENCHMARK_BOT_CLASS,
+                "bots": [
+                    {
+                        "id": f"bot_{strategy}_{bot}",
+                        "name": f"Benchmark bot {strategy} {bot}",
+                        "enabled": True,
+                        "pair": str(PAIR),
+                        "exchange": "binance",
+                        "time_frame": "1m",
+                        "cron_expression": "",
+                        "budget_limit": 0.0,
+                        "pct_reinvest_profit": 100.0,
+                        "tags": ["benchmark"],
+                        "config": {},
+                    }
+                    for bot in range(bots)
+                ],
+            }
+            for strategy in range(strategies)
+        ],
+    }
+
+
+def _build_order(bot_id: str, strategy_id: str, order_id: str, side: OrderSide, status: OrderStatusType) -> Order:
+    return Order(
+        id=order_id,
+        exchange_id=ExchangeType.binance,
+        bot_id=bot_id,
+        strategy_id=strategy_id,
+        pair=PAIR,
+        timestamp=1705236508000,
+        type=OrderType.limit,
+        side=side,
+        price=42796.99,
+        amount=0.001,
+        cost=42.79699,
+        average=42796.99,
+        filled=0.001 if status == OrderStatusType.closed else 0.0,
+        remaining=0.0 if status == OrderStatusType.closed else 0.001,
+        status=status,
+    )
+
+
+def _build_trade(bot_id: str, strategy_id: str, trade_id: str, exit_order_id: str) -> Trade:
+    return Trade(
+        id=trade_id,
+        exchange_id=ExchangeType.binance,
+        bot_id=bot_id,
+        strategy_id=strategy_id,
+        pair=PAIR,
+        size=0.001,
+        entry_time=1705236508000,
+        entry_price=42796.99,
+        entry_order_id=f"{trade_id}-entry",
+        entry_cost=42.79699,
+        exit_order_id=exit_order_id,
+    )
+
+
+def _seed_bot_status(storage_manager, exchange_manager: SimulatedExchangeManager, bot_id: str, strategy_id: str, orders: int, history: int):
+    active_orders = [_build_order(bot_id, strategy_id, f"{bot_id}-active-{i}", OrderSide.sell, OrderStatusType.open) for i in range(orders)]
+    archived_orders = [_build_order(bot_id, strategy_id, f"{bot_id}-archived-{i}", OrderSide.buy, OrderStatusType.closed) for i in range(history)]
+    active_trades = [_build_trade(bot_id, strategy_id, f"{bot_id}-trade-{i}", order.id) for i, order in enumerate(active_orders)]
+    closed_trades = [_build_trade(bot_id, strategy_id, f"{bot_id}-closed-{i}", "manual") for i in range(history)]
+    status = BotStatus(
+        bot_id=bot_id,
+        timestamp=1705236508000,
+        budget=BotBudget(),
+        active_orders=active_orders,
+        archived_orders=archived_orders,
+        active_trades=active_trades,
+        closed_trades=closed_trades,
+    )
+    storage_manager.save_bot_status(status)
+    exchange_manager.add_orders(active_orders)
+
+
+def build_elena(home: str, strategies: int, bots: int, orders: int, history: int, storage: str = "file") -> Elena:
+    config = _build_config(home, strategies, bots, storage)
+    logger = BenchmarkLogger()
+    storage_manager = get_storage_manager(config, logger)
+    exchange_manager = SimulatedExchangeManager()
+    exchange_manager.init(config, logger, storage_manager)
+    for strategy_config in config["Strategies"]:
+        for bot_config in strategy_config["bots"]:
+            _seed_bot_status(storage_manager, exchange_manager, bot_config["id"], strategy_config["id"], orders, history)
+    return Elena(
+        config=config,
+        logger=logger,
+        metrics_manager=get_metrics_manager(config, logger, storage_manager),
+        notifications_manager=get_notifications_manager(config, logger, storage_manager),
+        bot_manager=get_bot_manager(config, logger, storage_manager),
+        exchange_manager=exchange_manager,
+        storage_manager=storage_manager,
+    )
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))]
+
+
+def _peak_rss_mb() -> float:
+    # kilobytes on Linux, bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def run_benchmark(strategies: int, bots: int, orders: int, history: int, cycles: int = 5, storage: str = "file") -> Dict:
+    """Runs a warm-up cycle, `cycles` timed cycles and a last cycle tracing the allocations"""
+    timer = PhaseTimer()
+    with tempfile.TemporaryDirectory() as home, ExitStack() as stack:
+        sut = build_elena(home, strategies, bots, orders, history, storage)
+        timer.wrap(stack, LocalBotManager, "load_all", "load statuses")
+        timer.wrap(stack, GenericBot, "_update_orders_status", "refresh orders")
+        # the class Elena loads, this module may be running as __main__
+        timer.wrap(stack, get_class(BENCHMARK_BOT_CLASS), "next", "strategy logic")
+        timer.wrap(stack, LocalBotManager, "save_all", "save statuses")
+
+        sut.run()
+        timer.reset()
+
+        cycle_times = []
+        phases: Dict[str, float] = {}
+        for _ in range(cycles):
+            start = time.perf_counter()
+            sut.run()
+            cycle_times.append(time.perf_counter() - start)
+            for phase, elapsed in timer.reset().items():
+                phases[phase] = phases.get(phase, 0.0) + elapsed
+
+        tracemalloc.start()
+        sut.run()
+        allocated, allocated_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        sut.close()
+
+    phases_ms = {phase: round(elapsed * 1000 / cycles, 3) for phase, elapsed in phases.items()}
+    cycle_median = statistics.median(cycle_times)
+    phases_ms["other"] = round(max(0.0, cycle_median * 1000 - sum(phases_ms.values())), 3)
+    return {
+        "cycle_ms": {
+            "median": round(cycle_median * 1000, 3),
+            "p95": round(_percentile(cycle_times, 95) * 1000, 3),
+            "min": round(min(cycle_times) * 1000, 3),
+        },
+        "phases_ms": phases_ms,
+        "allocated_peak_mb": round(allocated_peak / 1024 / 1024, 3),
+        "peak_rss_mb": round(_peak_rss_mb(), 3),
+    }
+
+
+def _scenario_name(strategies: int, bots: int, orders: int, history: int, storage: str) -> str:
+    return f"{storage}-{strategies}x{bots}-orders_{orders}-history_{history}"
+
+
+def _format_ratio(value: float, baseline: Optional[float]) -> str:
+    if not baseline:
+        return ""
+    return f"{value / baseline:6.2f}x"
+
+
+def print_report(scenario: str, result: Dict, baseline: Optional[Dict]):
+    print(f"Scenario {scenario}")
+    print(f"{'':26s}{'current':>12s}{'baseline':>12s}{'ratio':>9s}")
+
+    def row(name: str, value: float, baseline_value: Optional[float], unit: str):
+        baseline_text = f"{baseline_value:10.2f}{unit}" if baseline_value is not None else f"{'-':>12s}"
+        print(f"{name:26s}{value:10.2f}{unit}{baseline_text}{_format_ratio(value, baseline_value):>9s}")
+
+    baseline = baseline or {}
+    for name, value in result["cycle_ms"].items():
+        row(f"cycle {name}", value, baseline.get("cycle_ms", {}).get(name), "ms")
+    for name, value in result["phases_ms"].items():
+        row(f"  {name}", value, baseline.get("phases_ms", {}).get(name), "ms")
+    row("allocated peak", result["allocated_peak_mb"], baseline.get("allocated_peak_mb"), "MB")
+    row("peak RSS", result["peak_rss_mb"], baseline.get("peak_rss_mb"), "MB")
+
+
+def _load_baselines(baseline_path: str) -> Dict:
+    if not path.exists(baseline_path):
+        return {}
+    with open(baseline_path) as reader:
+        return json.load(reader)
+
+
+def _save_baselines(baseline_path: str, baselines: Dict):
+    with open(baseline_path, "w") as writer:
+        json.dump(baselines, writer, indent=4, sort_keys=True)
+        writer.write("\n")
+
+
+def main(args: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark of a full Elena cycle on a simulated exchange")
+    parser.add_argument("--strategies", type=int, default=2, help="strategies on the configuration")
+    parser.add_argument("--bots", type=int, default=10, help="bots of every strategy")
+    parser.add_argument("--orders", type=int, default=10, help="active orders and trades of every bot")
+    parser.add_argument("--history", type=int, default=1000, help="archived orders and closed trades of every bot")
+    parser.add_argument("--cycles", type=int, default=5, help="timed cycles, after a warm-up one")
+    parser.add_argument("--storage", choices=sorted(STORAGE_MANAGERS), default="file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="JSON file with the baseline of every scenario")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the scenario baseline")
+    parser.add_argument("--max-regression", type=float, default=0.0, help="fails when the cycle median is this times slower than the baseline, i.e. 1.2")
+    options = parser.parse_args(args)
+
+    scenario = _scenario_name(options.strategies, options.bots, options.orders, options.history, options.storage)
+    result = run_benchmark(options.strategies, options.bots, options.orders, options.history, options.cycles, options.storage)
+    baselines = _load_baselines(options.baseline)
+    print_report(scenario, result, baselines.get(scenario))
+
+    if options.save_baseline:
+        baselines[scenario] = result
+        _save_baselines(options.baseline, baselines)
+        print(f"Baseline saved to {os.path.relpath(options.baseline)}")
+        return 0
+
+    baseline = baselines.get(scenario)
+    if options.max_regression and baseline:
+        ratio = result["cycle_ms"]["median"] / baseline["cycle_ms"]["median"]
+        if ratio > options.max_regression:
+            print(f"Cycle median is {ratio:.2f}x the baseline, more than {options.max_regression:.2f}x")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+import glob
+from os import path
+from test.elena.domain.services.record import Record
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from elena.domain.model.balance import Balance
+from elena.domain.model.bot_config import BotConfig
+from elena.domain.model.exchange import Exchange
+from elena.domain.model.order import Order, OrderSide, OrderStatusType, OrderType
+from elena.domain.model.order_book import OrderBook, OrderBookSource
+from elena.domain.model.time_frame import TimeFrame
+from elena.domain.model.trading_pair import TradingPair
+from elena.domain.ports.exchange_manager import ExchangeManager
+from elena.domain.ports.logger import Logger
+from elena.domain.ports.storage_manager import StorageManager
+
+_RECORDED_DATA_PATH = path.join(path.dirname(__file__), "..", "elena", "domain", "services", "data")
+
+
+def _load_recorded_output(function_name: str):
+    filename = path.basename(sorted(glob.glob(path.join(_RECORDED_DATA_PATH, f"{function_name}-*.json")))[0])
+    return Record._deserialize_from_json(filename)["output"]
+
+
+class SimulatedExchangeManager(ExchangeManager):
+    """
+    In memory exchange for benchmarks, answers market data with the recorded BTC/USDT data of FakeExchangeManager
+    for any pair and keeps the placed orders, which stay open until they are cancelled.
+    """
+
+    _orders: Dict[str, Order]
+    _candles: pd.DataFrame
+    _order_book: OrderBook
+    _balance: Balance
+    _next_order_id: int
+
+    def init(self, config: Dict, logger: Logger, storage_manager: StorageManager):
+        self._orders = {}
+        self._candles = _load_recorded_output("read_candles")
+        self._order_book = _load_recorded_output("read_order_book")
+        self._balance = _load_recorded_output("get_balance")
+        self._next_order_id = 0
+
+    def add_orders(self, orders: List[Order]):
+        for order in orders:
+            self._orders[order.id] = order
+
+    def read_candles(
+        self,
+        exchange: Exchange,
+        pair: TradingPair,
+        time_frame: TimeFrame = TimeFrame.min_1,  # type: ignore
+        page_size: int = 100,
+    ) -> pd.DataFrame:
+        return self._candles.copy()
+
+    def amount_to_precision(self, exchange: Exchange, pair: TradingPair, amount: float) -> float:
+        return round(amount, 5)
+
+    def price_to_precision(self, exchange: Exchange, pair: TradingPair, price: float) -> float:
+        return round(price, 2)
+
+    def read_order_book(self, exchange: Exchange, pair: TradingPair, depth: Optional[int] = None, sources: Optional[List[OrderBookSource]] = None) -> OrderBook:
+        return self._order_book
+
+    def get_balance(self, exchange: Exchange) -> Balance:
+        return self._balance
+
+    def place_order(
+        self,
+        exchange: Exchange,
+        bot_config: BotConfig,
+        order_type: OrderType,
+        side: OrderSide,
+        amount: float,
+        price: Optional[float] = None,
+        params: Optional[Dict] = {},
+    ) -> Order:
+        self._next_order_id += 1
+        price = price or self._order_book.asks[0].price
+        is_market = order_type == OrderType.market
+        order = Order(
+            id=f"simulated-{self._next_order_id}",
+            exchange_id=exchange.id,
+            bot_id=bot_config.id,
+            strategy_id=bot_config.strategy_id,
+            pair=bot_config.pair,
+            timestamp=0,
+            type=order_type,
+            side=side,
+            price=price,
+            amount=amount,
+            cost=amount * price if is_market else 0.0,
+            average=price if is_market else None,
+            filled=amount if is_market else 0.0,
+            remaining=0.0 if is_market else amount,
+            status=OrderStatusType.closed if is_market else OrderStatusType.open,
+        )
+        self._orders[order.id] = order
+        return order
+
+    def cancel_order(self, exchange: Exchange, bot_config: BotConfig, order_id: str) -> Order:
+        order = self._orders[order_id].copy(update={"status": OrderStatusType.canceled})
+        self._orders[order_id] = order
+        return order
+
+    def fetch_order(self, exchange: Exchange, bot_config: BotConfig, order_id: str) -> Order:
+        return self._orders[order_id].copy()
+
+    def fetch_orders(self, exchange: Exchange, bot_config: BotConfig, order_ids: List[str]) -> Dict[str, Order]:
+        return {order_id: self._orders[order_id].copy() for order_id in order_ids if order_id in self._orders}
+
+    def get_precision_amount(self, exchange: Exchange, pair: TradingPair) -> float:
+        return 5.0
+
+    def get_precision_price(self, exchange: Exchange, pair: TradingPair) -> float:
+        return 2.0
+
+    def limit_min_amount(self, exchange: Exchange, pair: TradingPair) -> float:
+        return 0.00001
+
+    def limit_min_cost(self, exchange: Exchange, pair: TradingPair) -> float:
+        return 10.0
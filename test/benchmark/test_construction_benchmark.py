@@ -0,0 +1,13 @@
+from test.benchmark.construction_benchmark import main, run_benchmark
+
+
+def test_run_benchmark_times_every_model():
+    actual = run_benchmark(levels=10, orders=5, currencies=3, repeat=1)
+
+    assert list(actual) == ["order book 10 levels", "5 orders", "balance 3 currencies", "5 trades"]
+    assert all(times["validated_ms"] > 0 and times["fast_ms"] > 0 for times in actual.values())
+
+
+def test_main_prints_report(capsys):
+    assert main(["--levels", "10", "--orders", "2", "--currencies", "2", "--repeat", "1"]) == 0
+    assert "order book 10 levels" in capsys.readouterr().out
@@ -0,0 +1,24 @@
+import json
+from test.benchmark.cycle_benchmark import main, run_benchmark
+
+
+def test_run_benchmark_reports_every_phase():
+    actual = run_benchmark(strategies=1, bots=2, orders=3, history=5, cycles=1)
+
+    assert set(actual["phases_ms"]) == {"load statuses", "refresh orders", "strategy logic", "save statuses", "other"}
+    assert actual["cycle_ms"]["median"] > 0
+    assert actual["peak_rss_mb"] > 0
+
+
+def test_main_compares_with_baseline(tmp_path, capsys):
+    baseline_path = str(tmp_path / "baseline.json")
+    args = ["--strategies", "1", "--bots", "1", "--orders", "1", "--history", "1", "--cycles", "1", "--baseline", baseline_path]
+
+    assert main(args + ["--save-baseline"]) == 0
+    baselines = json.loads((tmp_path / "baseline.json").read_text())
+    baselines["file-1x1-orders_1-history_1"]["cycle_ms"]["median"] = 0.0001
+
+    (tmp_path / "baseline.json").write_text(json.dumps(baselines))
+
+    assert main(args + ["--max-regression", "1.2"]) == 1
+    assert "more than 1.20x" in capsys.readouterr().out
@@ -0,0 +1,100 @@
+from unittest.mock import Mock
+
+import pytest
+
+from elena.adapters.bot_manager.local_bot_manager import LocalBotManager
+from elena.domain.model.bot_config import BotConfig
+from elena.domain.model.bot_status import BotBudget, BotStatus
+from elena.domain.model.exchange import ExchangeType
+from elena.domain.model.strategy_config import StrategyConfig
+from elena.domain.model.time_frame import TimeFrame
+from elena.domain.model.trade import Trade
+from elena.domain.model.trading_pair import TradingPair
+from elena.domain.ports.storage_manager import StorageError
+
+
+def _build_bot_status(bot_id: str) -> BotStatus:
+    return BotStatus(bot_id=bot_id, timestamp=1000, active_orders=[], archived_orders=[], active_trades=[], closed_trades=[], budget=BotBudget())
+
+
+def _build_strategy_config(*bot_ids: str) -> StrategyConfig:
+    bots = [
+        BotConfig(
+            id=bot_id,
+            strategy_id="strategy",
+            name=bot_id,
+            pair=TradingPair.build("BTC/USDT"),
+            exchange_id=ExchangeType.binance,
+            time_frame=TimeFrame.min_1,
+            cron_expression="",
+            tags=[],
+            config={},
+        )
+        for bot_id in bot_ids
+    ]
+    return StrategyConfig(id="strategy", name="Strategy", strategy_class="", bots=bots)
+
+
+@pytest.fixture
+def storage_manager():
+    storage_manager = Mock()
+    storage_manager.load_bot_status.side_effect = _build_bot_status
+    return storage_manager
+
+
+@pytest.fixture
+def bot_manager(storage_manager):
+    sut = LocalBotManager()
+    sut.init(config={}, logger=Mock(), storage_manager=storage_manager)
+    return sut
+
+
+def test_save_all_skips_statuses_with_timestamp_changes_only(bot_manager, storage_manager):
+    unchanged, changed = bot_manager.load_all(_build_strategy_config("unchanged", "changed"))
+    unchanged.timestamp = 2000
+    changed.timestamp = 2000
+    changed.active_trades.append(Trade(id="1", exchange_id="binance", bot_id="changed", strategy_id="strategy", pair=TradingPair.build("BTC/USDT"), size=0.1))
+
+    bot_manager.save_all([unchanged, changed])
+
+    storage_manager.save_bot_statuses.assert_called_once_with([changed])
+
+
+def test_save_all_saves_new_statuses_once(bot_manager, storage_manager):
+    new_status = _build_bot_status("new")
+
+    bot_manager.save_all([new_status])
+    bot_manager.save_all([new_status])
+
+    storage_manager.save_bot_statuses.assert_called_once_with([new_status])
+
+
+def test_save_all_saves_one_by_one_when_the_batch_fails(bot_manager, storage_manager):
+    statuses = [_build_bot_status("bot_1"), _build_bot_status("bot_2")]
+    storage_manager.save_bot_statuses.side_effect = StorageError("disk full")
+    storage_manager.save_bot_status.side_effect = [None, StorageError("disk full"), None]
+
+    with pytest.raises(StorageError, match="bot_2"):
+        bot_manager.save_all(statuses)
+    # only the failed status is saved again
+    bot_manager.save_all(statuses)
+
+    assert [call.args[0].bot_id for call in storage_manager.save_bot_status.call_args_list] == ["bot_1", "bot_2", "bot_2"]
+
+
+def test_save_all_saves_again_only_the_statuses_the_batch_did_not_save(bot_manager, storage_manager):
+    statuses = [_build_bot_status("bot_1"), _build_bot_status("bot_2"), _build_bot_status("bot_3")]
+    storage_manager.save_bot_statuses.side_effect = StorageError("disk full", failed_ids=["bot_2"])
+
+    bot_manager.save_all(statuses)
+    bot_manager.save_all(statuses)
+
+    assert [call.args[0].bot_id for call in storage_manager.save_bot_status.call_args_list] == ["bot_2"]
+
+
+def test_save_all_saves_changed_statuses_in_one_batch(bot_manager, storage_manager):
+    statuses = [_build_bot_status("bot_1"), _build_bot_status("bot_2")]
+
+    bot_manager.save_all(statuses)
+
+    storage_manager.save_bot_statuses.assert_called_once_with(statuses)
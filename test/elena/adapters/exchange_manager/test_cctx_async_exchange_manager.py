@@ -0,0 +1,185 @@
+import asyncio
+import time
+from unittest.mock import Mock
+
+import pandas as pd
+import pytest
+
+from elena.adapters.exchange_manager.cctx_async_exchange_manager import CctxAsyncExchangeManager
+from elena.adapters.exchange_manager.request_cache import RequestCache
+from elena.domain.model.exchange import Exchange, ExchangeType
+from elena.domain.model.order_book import OrderBook, OrderBookSource
+from elena.domain.model.time_frame import TimeFrame
+from elena.domain.model.trading_pair import TradingPair
+from elena.domain.ports.exchange_manager import AsyncExchangeManager, ExchangeManager
+
+BTC_USDT_MARKET = {
+    "symbol": "BTC/USDT",
+    "precision": {"amount": 5, "price": 2},
+    "limits": {"amount": {"min": 1e-05}, "cost": {"min": 10.0}},
+}
+
+
+class FakeAsyncConnection:
+    in_flight = 0
+    max_in_flight = 0
+    requests = 0
+
+    def __init__(self, config):
+        self.config = config
+        self.markets = {}
+        self.currencies = {}
+        self.urls = {"api": {"public": "https://fake.exchange"}}
+        self.closed = False
+        self.has = {"fetchTicker": True}
+
+    def set_sandbox_mode(self, enabled):
+        pass
+
+    def set_markets(self, markets, currencies=None):
+        self.markets = markets
+        self.currencies = currencies
+
+    async def load_markets(self, reload=False):
+        self.set_markets({"BTC/USDT": BTC_USDT_MARKET}, {"BTC": {"code": "BTC"}})
+
+    async def _request(self):
+        FakeAsyncConnection.requests += 1
+        FakeAsyncConnection.in_flight += 1
+        FakeAsyncConnection.max_in_flight = max(FakeAsyncConnection.max_in_flight, FakeAsyncConnection.in_flight)
+        await asyncio.sleep(0.1)
+        FakeAsyncConnection.in_flight -= 1
+
+    async def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        await self._request()
+        return [[1700000000000, 1.0, 2.0, 0.5, 1.5, 10.0], [1700000060000, 1.5, 2.5, 1.0, 2.0, 20.0]]
+
+    async def fetch_order_book(self, symbol, limit=None):
+        await self._request()
+        return {"bids": [[1.0, 2.0]], "asks": [[1.1, 3.0]]}
+
+    async def fetch_ticker(self, symbol):
+        await self._request()
+        return {"bid": 1.0, "ask": 1.1, "bidVolume": 2.0, "askVolume": 3.0}
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def cctx_async_exchange_manager():
+    sut = CctxAsyncExchangeManager()
+    sut.init(
+        config={
+            "ExchangeManager": {
+                "fetch_ohlcv_limit": 100,
+                "fetch_ohlcv_limit_retry_every_milliseconds": 1000,
+            }
+        },
+        logger=Mock(),
+        storage_manager=Mock(),
+    )
+    sut._connect_mapper = {exchange_type: FakeAsyncConnection for exchange_type in ExchangeType}
+    FakeAsyncConnection.in_flight = 0
+    FakeAsyncConnection.max_in_flight = 0
+    FakeAsyncConnection.requests = 0
+    yield sut
+    sut.close()
+
+
+def _build_exchange(exchange_id: ExchangeType) -> Exchange:
+    return Exchange(id=exchange_id, sandbox_mode=True, api_key="key", password="password", secret="secret")
+
+
+def test_implements_both_ports(cctx_async_exchange_manager):
+    assert isinstance(cctx_async_exchange_manager, ExchangeManager)
+    assert isinstance(cctx_async_exchange_manager, AsyncExchangeManager)
+
+
+def test_connections_share_session_and_loop(cctx_async_exchange_manager):
+    binance_conn = cctx_async_exchange_manager._connect(_build_exchange(ExchangeType.binance))
+    kucoin_conn = cctx_async_exchange_manager._connect(_build_exchange(ExchangeType.kucoin))
+
+    assert binance_conn is not kucoin_conn
+    assert binance_conn.config["session"] is kucoin_conn.config["session"]
+    assert binance_conn.config["asyncio_loop"] is cctx_async_exchange_manager._loop
+    assert cctx_async_exchange_manager._connect(_build_exchange(ExchangeType.binance)) is binance_conn
+
+
+def test_sync_methods_run_on_the_adapter_loop(cctx_async_exchange_manager):
+    exchange = _build_exchange(ExchangeType.binance)
+    pair = TradingPair.build("BTC/USDT")
+
+    candles = cctx_async_exchange_manager.read_candles(exchange, pair, TimeFrame.min_1)
+    order_book = cctx_async_exchange_manager.read_order_book(exchange, pair)
+
+    assert candles.shape == (2, 6)
+    assert candles["Close"].tolist() == [1.5, 2.0]
+    assert order_book.bids[0].price == 1.0
+    assert order_book.asks[0].amount == 3.0
+    assert cctx_async_exchange_manager.get_precision_amount(exchange, pair) == 5.0
+
+
+def test_async_requests_are_in_flight_at_the_same_time(cctx_async_exchange_manager):
+    exchange = _build_exchange(ExchangeType.binance)
+    pair = TradingPair.build("BTC/USDT")
+
+    async def read_all():
+        return await asyncio.gather(*[cctx_async_exchange_manager.read_order_book_async(exchange, pair) for _ in range(50)])
+
+    start = time.monotonic()
+    order_books = cctx_async_exchange_manager._run(read_all())
+    elapsed = time.monotonic() - start
+
+    assert len(order_books) == 50
+    assert FakeAsyncConnection.max_in_flight == 50
+    assert elapsed < 2
+
+
+def test_close_closes_connections(cctx_async_exchange_manager):
+    conn = cctx_async_exchange_manager._connect(_build_exchange(ExchangeType.binance))
+    session = cctx_async_exchange_manager._session
+
+    cctx_async_exchange_manager._run(cctx_async_exchange_manager._close())
+
+    assert conn.closed
+    assert session.closed
+
+
+def test_async_top_of_book_from_the_ticker(cctx_async_exchange_manager):
+    exchange = _build_exchange(ExchangeType.binance)
+    pair = TradingPair.build("BTC/USDT")
+
+    top_of_book = cctx_async_exchange_manager._run(cctx_async_exchange_manager.read_order_book_async(exchange, pair, depth=1, sources=[OrderBookSource.ticker]))
+    # without fetchBidsAsks, read from the order book
+    order_book = cctx_async_exchange_manager._run(cctx_async_exchange_manager.read_order_book_async(exchange, pair, depth=1, sources=[OrderBookSource.bids_asks]))
+
+    assert top_of_book == OrderBook(bids=[[1.0, 2.0]], asks=[[1.1, 3.0]])
+    assert order_book == top_of_book
+
+
+def test_async_reads_share_the_request_cache_with_the_sync_ones(cctx_async_exchange_manager):
+    cctx_async_exchange_manager._market_data_cache = RequestCache(freshness_seconds=30)
+    exchange = _build_exchange(ExchangeType.binance)
+    pair = TradingPair.build("BTC/USDT")
+
+    order_book = cctx_async_exchange_manager.read_order_book(exchange, pair)
+    candles = cctx_async_exchange_manager.read_candles(exchange, pair, TimeFrame.min_1)
+
+    assert cctx_async_exchange_manager._run(cctx_async_exchange_manager.read_order_book_async(exchange, pair)) == order_book
+    assert cctx_async_exchange_manager._run(cctx_async_exchange_manager.read_candles_async(exchange, pair, TimeFrame.min_1)).equals(candles)
+    assert FakeAsyncConnection.requests == 2
+
+
+def test_async_candles_are_stored(cctx_async_exchange_manager):
+    cctx_async_exchange_manager._config["store_candles"] = True
+    storage_manager = cctx_async_exchange_manager._storage_manager
+    storage_manager.load_candles.return_value = pd.DataFrame([[1700000000000, 1.0, 1.0, 1.0, 1.0, 1.0]], columns=CctxAsyncExchangeManager._candles_columns)
+    exchange = _build_exchange(ExchangeType.binance)
+
+    candles = cctx_async_exchange_manager._run(cctx_async_exchange_manager.read_candles_async(exchange, TradingPair.build("BTC/USDT"), TimeFrame.min_1))
+
+    assert candles["Close"].tolist() == [1.5, 2.0]
+    saved_id, saved_candles = storage_manager.append_candles.call_args.args
+    assert saved_id == "Candles-binance-BTC-USDT-1m"
+    assert saved_candles["Open time"].tolist() == [1700000000000, 1700000060000]
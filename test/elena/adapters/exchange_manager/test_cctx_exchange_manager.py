@@ -1,10 +1,220 @@
 from datetime import datetime
+from typing import List, Optional
+from unittest.mock import Mock
 
+import ccxt
 import pandas as pd
 import pytest
+from pydantic import ValidationError
 
 from elena.adapters.exchange_manager.cctx_exchange_manager import CctxExchangeManager
+from elena.domain.model.bot_config import BotConfig
+from elena.domain.model.exchange import Exchange, ExchangeType
+from elena.domain.model.exchange_markets import ExchangeMarkets
+from elena.domain.model.order import Order, OrderStatusType
+from elena.domain.model.order_book import OrderBook, OrderBookSource, PriceAmount
 from elena.domain.model.time_frame import TimeFrame
+from elena.domain.model.trading_pair import TradingPair
+from elena.domain.ports.storage_manager import StorageError
+
+BTC_USDT_MARKET = {
+    "symbol": "BTC/USDT",
+    "precision": {"amount": 5, "price": 2},
+    "limits": {"amount": {"min": 1e-05}, "cost": {"min": 10.0}},
+}
+
+
+class FakeConnection:
+    def __init__(self, config):
+        self.config = config
+        self.sandbox_mode = False
+        self.load_markets_calls = 0
+        self.markets = {}
+        self.currencies = {}
+        self.fetch_ohlcv_calls = []
+        self.ohlcv = []
+        self.urls = {"api": {"public": "https://fake.exchange"}}
+        self.has = {"fetchOpenOrders": True, "fetchClosedOrders": True}
+        self.orders = {"fetch_open_orders": [], "fetch_closed_orders": []}
+        self.fetch_orders_calls = []
+        self.order_book_calls = []
+        self.rejected_limit = False
+        self.order_book_error = None
+        self.ticker = {"bid": 40000.0, "ask": 40001.0, "bidVolume": 0.1, "askVolume": None}
+
+    def set_sandbox_mode(self, enabled):
+        self.sandbox_mode = enabled
+
+    def load_markets(self, reload=False):
+        self.load_markets_calls += 1
+        self.set_markets({"BTC/USDT": BTC_USDT_MARKET}, {"BTC": {"code": "BTC"}})
+
+    def set_markets(self, markets, currencies=None):
+        self.markets = markets
+        self.currencies = currencies
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.fetch_ohlcv_calls.append({"symbol": symbol, "timeframe": timeframe, "since": since, "limit": limit})
+        if since is None:
+            return self.ohlcv[-limit:]
+        return [candle for candle in self.ohlcv if candle[0] >= since][:limit]
+
+    def fetch_open_orders(self, symbol):
+        self.fetch_orders_calls.append(("fetch_open_orders", symbol))
+        return self.orders["fetch_open_orders"]
+
+    def fetch_closed_orders(self, symbol):
+        self.fetch_orders_calls.append(("fetch_closed_orders", symbol))
+        return self.orders["fetch_closed_orders"]
+
+    def fetch_order_book(self, symbol, limit=None):
+        self.order_book_calls.append(("fetch_order_book", symbol, limit))
+        if self.order_book_error is not None:
+            raise self.order_book_error
+        if limit is not None and self.rejected_limit:
+            raise ccxt.BadRequest("fetchOrderBook() limit argument must be 20 or 100")
+        return {"bids": [[40000.0, 0.1], [39999.0, 0.2], [39998.0, 0.3]], "asks": [[40001.0, 0.4], [40002.0, 0.5]]}
+
+    def fetch_ticker(self, symbol):
+        self.order_book_calls.append(("fetch_ticker", symbol, None))
+        return self.ticker
+
+    def fetch_bids_asks(self, symbols):
+        self.order_book_calls.append(("fetch_bids_asks", symbols, None))
+        return {symbol: self.ticker for symbol in symbols}
+
+
+def _build_exchange(exchange_id: ExchangeType, sandbox_mode: bool = True, api_key: str = "key") -> Exchange:
+    return Exchange(id=exchange_id, sandbox_mode=sandbox_mode, api_key=api_key, password="password", secret="secret")
+
+
+def _build_cctx_exchange_manager(
+    storage_manager,
+    markets_cache_ttl_seconds: int = 0,
+    store_candles: bool = False,
+    market_data_cache_seconds: int = 0,
+    orders_cache_seconds: int = 0,
+    order_book_sources: Optional[List[str]] = None,
+) -> CctxExchangeManager:
+    sut = CctxExchangeManager()
+    sut.init(
+        config={
+            "ExchangeManager": {
+                "fetch_ohlcv_limit": 100,
+                "fetch_ohlcv_limit_retry_every_milliseconds": 1000,
+                "markets_cache_ttl_seconds": markets_cache_ttl_seconds,
+                "store_candles": store_candles,
+                "market_data_cache_seconds": market_data_cache_seconds,
+                "orders_cache_seconds": orders_cache_seconds,
+                "order_book_sources": order_book_sources or ["order_book"],
+            }
+        },
+        logger=Mock(),
+        storage_manager=storage_manager,
+    )
+    sut._connect_mapper = {exchange_type: FakeConnection for exchange_type in ExchangeType}
+    return sut
+
+
+@pytest.fixture
+def cctx_exchange_manager():
+    return _build_cctx_exchange_manager(Mock())
+
+
+def test_connect_reuses_connection_per_exchange(cctx_exchange_manager):
+    binance = _build_exchange(ExchangeType.binance)
+    kucoin = _build_exchange(ExchangeType.kucoin)
+
+    binance_conn = cctx_exchange_manager._connect(binance)
+    kucoin_conn = cctx_exchange_manager._connect(kucoin)
+
+    assert binance_conn is not kucoin_conn
+    assert cctx_exchange_manager._connect(binance) is binance_conn
+    assert cctx_exchange_manager._connect(_build_exchange(ExchangeType.kucoin)) is kucoin_conn
+    assert binance_conn.load_markets_calls == 1
+    assert kucoin_conn.load_markets_calls == 1
+
+
+def test_connect_keys_connections_by_sandbox_and_credentials(cctx_exchange_manager):
+    sandbox = cctx_exchange_manager._connect(_build_exchange(ExchangeType.binance, sandbox_mode=True))
+    production = cctx_exchange_manager._connect(_build_exchange(ExchangeType.binance, sandbox_mode=False))
+    other_account = cctx_exchange_manager._connect(_build_exchange(ExchangeType.binance, api_key="other_key"))
+
+    assert len({id(sandbox), id(production), id(other_account)}) == 3
+    assert sandbox.sandbox_mode
+    assert not production.sandbox_mode
+    assert other_account.config["apiKey"] == "other_key"
+
+
+def test_connect_stores_markets_on_cache_miss():
+    storage_manager = Mock()
+    storage_manager.load_exchange_markets.side_effect = StorageError("not found")
+    sut = _build_cctx_exchange_manager(storage_manager, markets_cache_ttl_seconds=60)
+
+    conn = sut._connect(_build_exchange(ExchangeType.binance))
+
+    assert conn.load_markets_calls == 1
+    storage_manager.load_exchange_markets.assert_called_once_with(ExchangeType.binance, True)
+    saved = storage_manager.save_exchange_markets.call_args.args[0]
+    assert saved.id == "binance-sandbox"
+    assert saved.markets == {"BTC/USDT": BTC_USDT_MARKET}
+
+
+def test_connect_uses_fresh_stored_markets():
+    storage_manager = Mock()
+    storage_manager.load_exchange_markets.return_value = ExchangeMarkets(
+        exchange_id=ExchangeType.binance,
+        sandbox_mode=True,
+        timestamp=CctxExchangeManager._get_time(),
+        markets={"BTC/USDT": BTC_USDT_MARKET},
+        currencies={},
+    )
+    sut = _build_cctx_exchange_manager(storage_manager, markets_cache_ttl_seconds=60)
+
+    exchange = _build_exchange(ExchangeType.binance)
+    conn = sut._connect(exchange)
+
+    assert conn.load_markets_calls == 0
+    assert sut.get_precision_amount(exchange, TradingPair.build("BTC/USDT")) == 5
+    storage_manager.save_exchange_markets.assert_not_called()
+
+
+def test_connect_reloads_expired_stored_markets():
+    storage_manager = Mock()
+    storage_manager.load_exchange_markets.return_value = ExchangeMarkets(
+        exchange_id=ExchangeType.binance,
+        sandbox_mode=True,
+        timestamp=CctxExchangeManager._get_time() - 61_000,
+        markets={},
+        currencies={},
+    )
+    sut = _build_cctx_exchange_manager(storage_manager, markets_cache_ttl_seconds=60)
+
+    conn = sut._connect(_build_exchange(ExchangeType.binance))
+
+    assert conn.load_markets_calls == 1
+    storage_manager.save_exchange_markets.assert_called_once()
+
+
+def test_get_market_reloads_markets_on_unknown_pair():
+    storage_manager = Mock()
+    storage_manager.load_exchange_markets.return_value = ExchangeMarkets(
+        exchange_id=ExchangeType.binance,
+        sandbox_mode=True,
+        timestamp=CctxExchangeManager._get_time(),
+        markets={},
+        currencies={},
+    )
+    sut = _build_cctx_exchange_manager(storage_manager, markets_cache_ttl_seconds=60)
+
+    exchange = _build_exchange(ExchangeType.binance)
+    assert sut.limit_min_cost(exchange, TradingPair.build("BTC/USDT")) == 10.0
+    assert sut._connect(exchange).load_markets_calls == 1
+
+    # not reloaded again for a symbol the exchange doesn't have
+    assert sut.limit_min_cost(exchange, TradingPair.build("ETH/USDT")) == 0.0
+    assert sut.limit_min_cost(exchange, TradingPair.build("ETH/USDT")) == 0.0
+    assert sut._connect(exchange).load_markets_calls == 1
 
 
 @pytest.mark.parametrize(
@@ -167,3 +377,289 @@ def test_are_stored_candles_up_to_date(last_candle_time, now, time_frame, expect
     }
     stored_candles = pd.DataFrame(candles_data)
     assert CctxExchangeManager._are_stored_candles_up_to_date(stored_candles, time_frame, now) == expected
+
+
+def _build_candle(open_time: int, close: float):
+    return [open_time, close, close, close, close, 1.0]
+
+
+def test_read_candles_fetches_only_missing_candles():
+    minute = 60_000
+    now = CctxExchangeManager._get_time() // minute * minute
+    stored_candles = pd.DataFrame(
+        [_build_candle(now - 3 * minute, 1.0), _build_candle(now - 2 * minute, 2.0)],
+        columns=CctxExchangeManager._candles_columns,
+    )
+    storage_manager = Mock()
+    storage_manager.load_candles.return_value = stored_candles
+    sut = _build_cctx_exchange_manager(storage_manager, store_candles=True)
+    exchange = _build_exchange(ExchangeType.binance)
+    conn = sut._connect(exchange)
+    conn.ohlcv = [_build_candle(now - 2 * minute, 2.5), _build_candle(now - minute, 3.0), _build_candle(now, 4.0)]
+
+    actual = sut.read_candles(exchange, TradingPair.build("BTC/USDT"), TimeFrame.min_1)
+
+    assert conn.fetch_ohlcv_calls == [{"symbol": "BTC/USDT", "timeframe": "1m", "since": now - 2 * minute, "limit": 100}]
+    storage_manager.load_candles.assert_called_once_with("Candles-binance-BTC-USDT-1m", limit=100)
+    assert actual["Open time"].tolist() == [now - 3 * minute, now - 2 * minute, now - minute, now]
+    assert actual["Close"].tolist() == [1.0, 2.5, 3.0, 4.0]
+    saved_id, saved_candles = storage_manager.append_candles.call_args.args
+    assert saved_id == "Candles-binance-BTC-USDT-1m"
+    assert saved_candles["Open time"].tolist() == [now - 2 * minute, now - minute, now]
+
+
+def test_read_candles_pages_forward_through_a_gap():
+    minute = 60_000
+    now = CctxExchangeManager._get_time() // minute * minute
+    stored_candles = pd.DataFrame([_build_candle(now - 250 * minute, 1.0)], columns=CctxExchangeManager._candles_columns)
+    storage_manager = Mock()
+    storage_manager.load_candles.return_value = stored_candles
+    sut = _build_cctx_exchange_manager(storage_manager, store_candles=True)
+    exchange = _build_exchange(ExchangeType.binance)
+    conn = sut._connect(exchange)
+    conn.ohlcv = [_build_candle(now - i * minute, float(i)) for i in range(250, -1, -1)]
+
+    actual = sut.read_candles(exchange, TradingPair.build("BTC/USDT"), TimeFrame.min_1)
+
+    assert [call["since"] for call in conn.fetch_ohlcv_calls] == [now - 250 * minute, now - 150 * minute, now - 50 * minute]
+    assert actual["Open time"].tolist() == [now - i * minute for i in range(99, -1, -1)]
+    saved_candles = storage_manager.append_candles.call_args.args[1]
+    assert saved_candles["Open time"].tolist() == [now - i * minute for i in range(250, -1, -1)]
+
+
+def test_read_candles_reads_the_latest_candles_when_the_gap_exceeds_the_max_pages():
+    minute = 60_000
+    now = CctxExchangeManager._get_time() // minute * minute
+    stored_candles = pd.DataFrame([_build_candle(now - 250 * minute, 1.0)], columns=CctxExchangeManager._candles_columns)
+    storage_manager = Mock()
+    storage_manager.load_candles.return_value = stored_candles
+    sut = _build_cctx_exchange_manager(storage_manager, store_candles=True)
+    sut._config["fetch_ohlcv_max_pages"] = 2
+    exchange = _build_exchange(ExchangeType.binance)
+    conn = sut._connect(exchange)
+    conn.ohlcv = [_build_candle(now - i * minute, float(i)) for i in range(250, -1, -1)]
+
+    actual = sut.read_candles(exchange, TradingPair.build("BTC/USDT"), TimeFrame.min_1)
+
+    assert [call["since"] for call in conn.fetch_ohlcv_calls] == [None]
+    assert actual["Open time"].tolist() == [now - i * minute for i in range(99, -1, -1)]
+    sut._logger.warning.assert_called_once()
+
+
+def test_read_candles_fetches_latest_candles_when_nothing_stored():
+    storage_manager = Mock()
+    storage_manager.load_candles.side_effect = StorageError("not found")
+    sut = _build_cctx_exchange_manager(storage_manager, store_candles=True)
+    exchange = _build_exchange(ExchangeType.binance)
+    conn = sut._connect(exchange)
+    conn.ohlcv = [_build_candle(1702479180000, 1.0), _build_candle(1702479240000, 2.0)]
+
+    actual = sut.read_candles(exchange, TradingPair.build("BTC/USDT"), TimeFrame.min_1)
+
+    assert conn.fetch_ohlcv_calls == [{"symbol": "BTC/USDT", "timeframe": "1m", "since": None, "limit": 100}]
+    assert actual.shape == (2, 6)
+    storage_manager.append_candles.assert_called_once()
+
+
+def test_read_candles_shares_requests_between_bots():
+    sut = _build_cctx_exchange_manager(Mock(), market_data_cache_seconds=30)
+    exchange = _build_exchange(ExchangeType.binance)
+    conn = sut._connect(exchange)
+    conn.ohlcv = [_build_candle(1702479180000, 1.0), _build_candle(1702479240000, 2.0)]
+
+    first = sut.read_candles(exchange, TradingPair.build("BTC/USDT"), TimeFrame.min_1)
+    first["indicator"] = 1
+    second = sut.read_candles(exchange, TradingPair.build("BTC/USDT"), TimeFrame.min_1)
+    sut.read_candles(exchange, TradingPair.build("BTC/USDT"), TimeFrame.hour_1)
+
+    assert len(conn.fetch_ohlcv_calls) == 2
+    assert "indicator" not in second.columns
+
+
+def _build_raw_order(order_id: str, status: str) -> dict:
+    return {
+        "id": order_id,
+        "timestamp": 1702479180000,
+        "type": "stop_loss_limit",
+        "side": "sell",
+        "price": 40000.0,
+        "amount": 0.001,
+        "cost": 0.0,
+        "average": None,
+        "filled": 0.0,
+        "remaining": 0.001,
+        "triggerPrice": 40100.0,
+        "stopPrice": 40100.0,
+        "takeProfitPrice": None,
+        "stopLossPrice": None,
+        "status": status,
+        "fee": None,
+    }
+
+
+def _build_bot_config(bot_id: str) -> BotConfig:
+    return BotConfig(
+        id=bot_id,
+        strategy_id="strategy",
+        name=bot_id,
+        pair=TradingPair.build("BTC/USDT"),
+        exchange_id=ExchangeType.binance,
+        time_frame=TimeFrame.min_1,
+        cron_expression="",
+        tags=[],
+        config={},
+    )
+
+
+def test_fetch_orders_reads_open_then_closed_orders(cctx_exchange_manager):
+    exchange = _build_exchange(ExchangeType.binance)
+    conn = cctx_exchange_manager._connect(exchange)
+    conn.orders["fetch_open_orders"] = [_build_raw_order("1", "open"), _build_raw_order("other", "open")]
+    conn.orders["fetch_closed_orders"] = [_build_raw_order("2", "closed")]
+
+    actual = cctx_exchange_manager.fetch_orders(exchange, _build_bot_config("bot"), ["1", "2", "3"])
+
+    assert list(actual.keys()) == ["1", "2"]
+    assert actual["1"].status == OrderStatusType.open
+    assert actual["2"].status == OrderStatusType.closed
+    assert actual["2"].bot_id == "bot"
+    assert conn.fetch_orders_calls == [("fetch_open_orders", "BTC/USDT"), ("fetch_closed_orders", "BTC/USDT")]
+
+
+def test_fetch_orders_skips_closed_orders_when_all_are_open(cctx_exchange_manager):
+    exchange = _build_exchange(ExchangeType.binance)
+    conn = cctx_exchange_manager._connect(exchange)
+    conn.orders["fetch_open_orders"] = [_build_raw_order("1", "open")]
+
+    actual = cctx_exchange_manager.fetch_orders(exchange, _build_bot_config("bot"), ["1"])
+
+    assert list(actual.keys()) == ["1"]
+    assert conn.fetch_orders_calls == [("fetch_open_orders", "BTC/USDT")]
+
+
+def test_fetch_orders_without_bulk_support(cctx_exchange_manager):
+    exchange = _build_exchange(ExchangeType.binance)
+    conn = cctx_exchange_manager._connect(exchange)
+    conn.has = {}
+
+    assert cctx_exchange_manager.fetch_orders(exchange, _build_bot_config("bot"), ["1"]) == {}
+    assert conn.fetch_orders_calls == []
+
+
+def test_fetch_orders_shares_requests_between_bots():
+    sut = _build_cctx_exchange_manager(Mock(), orders_cache_seconds=30)
+    exchange = _build_exchange(ExchangeType.binance)
+    conn = sut._connect(exchange)
+    conn.orders["fetch_open_orders"] = [_build_raw_order("1", "open"), _build_raw_order("2", "open")]
+
+    first = sut.fetch_orders(exchange, _build_bot_config("bot_1"), ["1"])
+    second = sut.fetch_orders(exchange, _build_bot_config("bot_2"), ["2"])
+
+    assert first["1"].bot_id == "bot_1"
+    assert second["2"].bot_id == "bot_2"
+    assert conn.fetch_orders_calls == [("fetch_open_orders", "BTC/USDT")]
+
+
+def test_map_order_builds_the_same_order_as_validation(cctx_exchange_manager):
+    exchange = _build_exchange(ExchangeType.binance)
+    bot_config = _build_bot_config("bot")
+    raw_order = _build_raw_order("1", "open")
+    raw_order["fee"] = {"currency": "USDT", "cost": 0.04, "rate": 0.001}
+
+    actual = cctx_exchange_manager._map_order(exchange, bot_config, bot_config.pair, raw_order)
+
+    assert actual == Order(**cctx_exchange_manager._map_order_fields(exchange, bot_config, bot_config.pair, raw_order))
+    assert actual.fee.cost == 0.04
+
+
+def test_map_order_validates_orders_without_price(cctx_exchange_manager):
+    exchange = _build_exchange(ExchangeType.binance)
+    bot_config = _build_bot_config("bot")
+    raw_order = _build_raw_order("1", "open")
+    raw_order["price"] = None
+
+    with pytest.raises(ValidationError):
+        cctx_exchange_manager._map_order(exchange, bot_config, bot_config.pair, raw_order)
+
+
+def test_map_order_book_and_balance(cctx_exchange_manager):
+    order_book = cctx_exchange_manager._map_order_book({"bids": [[40000.0, 0.1, 3]], "asks": [[40001.0, 0.2, 1], [40002.0, 0.3, 2]]})
+    balance = cctx_exchange_manager._map_balance({"info": {}, "timestamp": 1702479180000, "free": {"BTC": 0.1, "ETH": None}, "used": {"BTC": 0.0}, "total": {"BTC": 0.1}, "BTC": {"free": 0.1, "used": 0.0, "total": 0.1}})
+
+    assert order_book == OrderBook(bids=[PriceAmount(price=40000.0, amount=0.1)], asks=[PriceAmount(price=40001.0, amount=0.2), PriceAmount(price=40002.0, amount=0.3)])
+    assert [by_availability.currency for by_availability in balance.free] == ["BTC"]
+    assert balance.currencies["BTC"].total == 0.1
+
+
+def test_read_order_book_uses_the_cheapest_source_for_the_top_of_the_book():
+    sut = _build_cctx_exchange_manager(Mock(), order_book_sources=["bids_asks", "ticker", "order_book"])
+    exchange = _build_exchange(ExchangeType.binance)
+    pair = TradingPair.build("BTC/USDT")
+    conn = sut._connect(exchange)
+    conn.has["fetchTicker"] = True
+
+    top_of_book = sut.read_order_book(exchange, pair, depth=1)
+    assert top_of_book == OrderBook(bids=[[40000.0, 0.1]], asks=[[40001.0, 0.0]])
+    assert conn.order_book_calls == [("fetch_ticker", "BTC/USDT", None)]
+
+    conn.has["fetchBidsAsks"] = True
+    sut.read_order_book(exchange, pair, depth=1)
+    assert conn.order_book_calls[-1] == ("fetch_bids_asks", ["BTC/USDT"], None)
+
+    # the bot policy
+    sut.read_order_book(exchange, pair, depth=1, sources=[OrderBookSource.order_book])
+    assert conn.order_book_calls[-1] == ("fetch_order_book", "BTC/USDT", 5)
+
+    # not deep enough
+    order_book = sut.read_order_book(exchange, pair, depth=3)
+    assert len(order_book.bids_array) == 3
+    assert conn.order_book_calls[-1] == ("fetch_order_book", "BTC/USDT", 5)
+
+
+def test_read_order_book_falls_back_to_the_order_book():
+    sut = _build_cctx_exchange_manager(Mock(), order_book_sources=["ticker"])
+    exchange = _build_exchange(ExchangeType.binance)
+    pair = TradingPair.build("BTC/USDT")
+    conn = sut._connect(exchange)
+    conn.has["fetchTicker"] = True
+    conn.ticker = {"bid": None, "ask": 40001.0}
+
+    order_book = sut.read_order_book(exchange, pair, depth=1)
+
+    assert order_book.best_bid == 40000.0
+    assert conn.order_book_calls == [("fetch_ticker", "BTC/USDT", None), ("fetch_order_book", "BTC/USDT", 5)]
+
+
+def test_read_order_book_without_limit_when_the_exchange_rejects_it():
+    sut = _build_cctx_exchange_manager(Mock())
+    exchange = _build_exchange(ExchangeType.binance)
+    pair = TradingPair.build("BTC/USDT")
+    conn = sut._connect(exchange)
+    conn.rejected_limit = True
+
+    sut.read_order_book(exchange, pair, depth=10)
+    sut.read_order_book(exchange, pair, depth=10)
+    sut.read_order_book(exchange, pair)
+
+    assert conn.order_book_calls == [
+        ("fetch_order_book", "BTC/USDT", 10),
+        ("fetch_order_book", "BTC/USDT", None),
+        ("fetch_order_book", "BTC/USDT", None),
+        ("fetch_order_book", "BTC/USDT", None),
+    ]
+
+
+@pytest.mark.parametrize("error", [ccxt.AuthenticationError("invalid key"), ccxt.BadSymbol("unknown symbol"), ccxt.RequestTimeout("timeout")])
+def test_read_order_book_keeps_the_limit_on_other_errors(error):
+    sut = _build_cctx_exchange_manager(Mock())
+    exchange = _build_exchange(ExchangeType.binance)
+    pair = TradingPair.build("BTC/USDT")
+    conn = sut._connect(exchange)
+    conn.order_book_error = error
+
+    with pytest.raises(type(error)):
+        sut.read_order_book(exchange, pair, depth=10)
+    conn.order_book_error = None
+    sut.read_order_book(exchange, pair, depth=10)
+
+    assert conn.order_book_calls == [("fetch_order_book", "BTC/USDT", 10), ("fetch_order_book", "BTC/USDT", 10)]
@@ -0,0 +1,262 @@
+import asyncio
+import time
+from test.elena.adapters.exchange_manager.test_cctx_async_exchange_manager import FakeAsyncConnection
+from unittest.mock import Mock
+
+import pytest
+
+from elena.adapters.exchange_manager.cctx_streaming_exchange_manager import CctxStreamingExchangeManager
+from elena.domain.model.bot_config import BotConfig
+from elena.domain.model.exchange import Exchange, ExchangeType
+from elena.domain.model.order import OrderSide, OrderStatusType, OrderType
+from elena.domain.model.order_book import OrderBook
+from elena.domain.model.time_frame import TimeFrame
+from elena.domain.model.trading_pair import TradingPair
+from elena.domain.ports.exchange_manager import AsyncExchangeManager, ExchangeManager
+
+PAIR = TradingPair.build("BTC/USDT")
+
+
+def _ccxt_order(order_id: str, status: str) -> dict:
+    return {
+        "id": order_id,
+        "timestamp": 1700000000000,
+        "type": "limit",
+        "side": "buy",
+        "price": 30000.0,
+        "amount": 0.001,
+        "cost": 30.0 if status == "closed" else 0.0,
+        "average": 30000.0 if status == "closed" else None,
+        "filled": 0.001 if status == "closed" else 0.0,
+        "remaining": 0.0 if status == "closed" else 0.001,
+        "status": status,
+        "fee": None,
+        "triggerPrice": None,
+        "stopPrice": None,
+        "takeProfitPrice": None,
+        "stopLossPrice": None,
+    }
+
+
+class FakeStreamingConnection(FakeAsyncConnection):
+    """ccxt.pro connection whose watch methods return the updates pushed by the test, as a websocket would"""
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.has = {"watchOrderBook": True, "watchOHLCV": True, "watchOrders": True}
+        self.updates = {"order_book": asyncio.Queue(), "ohlcv": asyncio.Queue(), "orders": asyncio.Queue()}
+        self.rest_calls = []
+
+    async def _watch(self, stream: str):
+        update = await self.updates[stream].get()
+        if isinstance(update, Exception):
+            raise update
+        return update
+
+    async def watch_order_book(self, symbol, limit=None):
+        return await self._watch("order_book")
+
+    async def watch_ohlcv(self, symbol, timeframe):
+        return await self._watch("ohlcv")
+
+    async def watch_orders(self, symbol):
+        return await self._watch("orders")
+
+    async def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.rest_calls.append("fetch_ohlcv")
+        return await super().fetch_ohlcv(symbol, timeframe, since, limit)
+
+    async def fetch_order_book(self, symbol, limit=None):
+        self.rest_calls.append("fetch_order_book")
+        return await super().fetch_order_book(symbol, limit)
+
+    async def create_order(self, symbol, type, side, amount, price=None, params={}):
+        self.rest_calls.append("create_order")
+        return _ccxt_order("1", "open")
+
+    async def fetch_order(self, id, symbol):
+        self.rest_calls.append("fetch_order")
+        return _ccxt_order(id, "open")
+
+
+@pytest.fixture
+def streaming_exchange_manager():
+    sut = CctxStreamingExchangeManager()
+    sut.init(
+        config={
+            "ExchangeManager": {
+                "fetch_ohlcv_limit": 100,
+                "fetch_ohlcv_limit_retry_every_milliseconds": 1000,
+                "stream_retry_seconds": 0.01,
+            }
+        },
+        logger=Mock(),
+        storage_manager=Mock(),
+    )
+    sut._connect_mapper = {exchange_type: FakeStreamingConnection for exchange_type in ExchangeType}
+    yield sut
+    sut.close()
+
+
+@pytest.fixture
+def exchange():
+    return Exchange(id=ExchangeType.binance, sandbox_mode=True, api_key="key", password="password", secret="secret")
+
+
+@pytest.fixture
+def bot_config():
+    return BotConfig(id="bot", name="bot", strategy_id="strategy", pair=PAIR, exchange_id=ExchangeType.binance, time_frame="1m", cron_expression="* * * * *", tags=[], config={})
+
+
+def _push(manager, conn, stream: str, update, condition):
+    manager._loop.call_soon_threadsafe(conn.updates[stream].put_nowait, update)
+    deadline = time.monotonic() + 2
+    while not condition():
+        assert time.monotonic() < deadline, f"{stream} update not received"
+        time.sleep(0.005)
+
+
+def test_implements_both_ports(streaming_exchange_manager):
+    assert isinstance(streaming_exchange_manager, ExchangeManager)
+    assert isinstance(streaming_exchange_manager, AsyncExchangeManager)
+
+
+def test_order_book_is_read_from_the_stream(streaming_exchange_manager, exchange):
+    # the first read subscribes and is answered by REST
+    assert streaming_exchange_manager.read_order_book(exchange, PAIR) == OrderBook(bids=[[1.0, 2.0]], asks=[[1.1, 3.0]])
+    conn = streaming_exchange_manager._connect(exchange)
+    stream = streaming_exchange_manager._streams[("order_book", ExchangeType.binance, True, "BTC/USDT")]
+
+    _push(streaming_exchange_manager, conn, "order_book", {"bids": [[2.0, 1.0], [1.9, 2.0]], "asks": [[2.1, 1.0, 3]]}, lambda: stream.updated > 0)
+
+    assert streaming_exchange_manager.read_order_book(exchange, PAIR) == OrderBook(bids=[[2.0, 1.0], [1.9, 2.0]], asks=[[2.1, 1.0]])
+    assert streaming_exchange_manager.read_order_book(exchange, PAIR, depth=1) == OrderBook(bids=[[2.0, 1.0]], asks=[[2.1, 1.0]])
+    async_ob = streaming_exchange_manager._run(streaming_exchange_manager.read_order_book_async(exchange, PAIR))
+    assert async_ob.best_bid == 2.0
+    assert conn.rest_calls == ["fetch_order_book"]
+
+
+def test_stale_or_broken_stream_is_read_by_rest(streaming_exchange_manager, exchange):
+    streaming_exchange_manager.read_order_book(exchange, PAIR)
+    conn = streaming_exchange_manager._connect(exchange)
+    stream = streaming_exchange_manager._streams[("order_book", ExchangeType.binance, True, "BTC/USDT")]
+    _push(streaming_exchange_manager, conn, "order_book", {"bids": [[2.0, 1.0]], "asks": [[2.1, 1.0]]}, lambda: stream.updated > 0)
+
+    streaming_exchange_manager._stale_seconds = 0
+    assert streaming_exchange_manager.read_order_book(exchange, PAIR).best_bid == 1.0
+
+    streaming_exchange_manager._stale_seconds = 10
+    assert streaming_exchange_manager.read_order_book(exchange, PAIR).best_bid == 2.0
+    _push(streaming_exchange_manager, conn, "order_book", ConnectionError("closed"), lambda: stream.updated == 0.0)
+    assert streaming_exchange_manager.read_order_book(exchange, PAIR).best_bid == 1.0
+
+    # and streamed again once the watch loop is resubscribed
+    _push(streaming_exchange_manager, conn, "order_book", {"bids": [[3.0, 1.0]], "asks": [[3.1, 1.0]]}, lambda: stream.updated > 0)
+    assert streaming_exchange_manager.read_order_book(exchange, PAIR).best_bid == 3.0
+    assert conn.rest_calls == ["fetch_order_book"] * 3
+
+
+def test_candles_are_seeded_by_rest_and_updated_by_the_stream(streaming_exchange_manager, exchange):
+    candles = streaming_exchange_manager.read_candles(exchange, PAIR, TimeFrame.min_1)
+    conn = streaming_exchange_manager._connect(exchange)
+    stream = streaming_exchange_manager._streams[("candles", ExchangeType.binance, True, "BTC/USDT", TimeFrame.min_1)]
+    assert candles["Close"].tolist() == [1.5, 2.0]
+
+    # the last candle is updated and a new one opened
+    ohlcv = [[1700000060000, 1.5, 3.0, 1.0, 3.0, 25.0], [1700000120000, 3.0, 4.0, 3.0, 4.0, 5.0]]
+    _push(streaming_exchange_manager, conn, "ohlcv", ohlcv, lambda: stream.updated > 0)
+
+    candles = streaming_exchange_manager.read_candles(exchange, PAIR, TimeFrame.min_1)
+    assert candles["Open time"].tolist() == [1700000000000, 1700000060000, 1700000120000]
+    assert candles["Close"].tolist() == [1.5, 3.0, 4.0]
+    assert candles.columns.tolist() == ["Open time", "Open", "High", "Low", "Close", "Volume"]
+    assert streaming_exchange_manager._run(streaming_exchange_manager.read_candles_async(exchange, PAIR, TimeFrame.min_1)).equals(candles)
+    # more candles than the stream was seeded with
+    assert streaming_exchange_manager.read_candles(exchange, PAIR, TimeFrame.min_1, page_size=500)["Close"].tolist() == [1.5, 2.0]
+    assert conn.rest_calls == ["fetch_ohlcv"] * 2
+
+
+def test_candles_are_reseeded_after_a_stream_error(streaming_exchange_manager, exchange):
+    streaming_exchange_manager.read_candles(exchange, PAIR, TimeFrame.min_1)
+    conn = streaming_exchange_manager._connect(exchange)
+    stream = streaming_exchange_manager._streams[("candles", ExchangeType.binance, True, "BTC/USDT", TimeFrame.min_1)]
+    _push(streaming_exchange_manager, conn, "ohlcv", [[1700000060000, 1.5, 3.0, 1.0, 3.0, 25.0]], lambda: stream.updated > 0)
+
+    _push(streaming_exchange_manager, conn, "ohlcv", ConnectionError("closed"), lambda: stream.failed)
+    _push(streaming_exchange_manager, conn, "ohlcv", [[1700000180000, 4.0, 5.0, 4.0, 5.0, 5.0]], lambda: stream.updated > 0)
+
+    # the candles missed while the stream was broken are read by REST
+    assert streaming_exchange_manager.read_candles(exchange, PAIR, TimeFrame.min_1)["Close"].tolist() == [1.5, 2.0]
+    assert streaming_exchange_manager.read_candles(exchange, PAIR, TimeFrame.min_1)["Close"].tolist() == [1.5, 2.0, 5.0]
+    assert conn.rest_calls == ["fetch_ohlcv"] * 2
+
+
+def test_orders_are_fetched_from_the_stream(streaming_exchange_manager, exchange, bot_config):
+    order = streaming_exchange_manager.place_order(exchange, bot_config, OrderType.limit, OrderSide.buy, 0.001, 30000.0)
+    conn = streaming_exchange_manager._connect(exchange)
+    stream = streaming_exchange_manager._streams[("orders", *streaming_exchange_manager._get_connection_key(exchange), "BTC/USDT")]
+
+    assert order.status == OrderStatusType.open
+    # the order may have changed before the subscription was live
+    assert streaming_exchange_manager.fetch_order(exchange, bot_config, "1").status == OrderStatusType.open
+    assert conn.rest_calls == ["create_order", "fetch_order"]
+
+    _push(streaming_exchange_manager, conn, "orders", [_ccxt_order("1", "closed")], lambda: stream.updated > 0)
+
+    fetched_order = streaming_exchange_manager.fetch_order(exchange, bot_config, "1")
+    assert fetched_order.status == OrderStatusType.closed
+    assert fetched_order.bot_id == "bot"
+    assert streaming_exchange_manager.fetch_orders(exchange, bot_config, ["1"])["1"].status == OrderStatusType.closed
+    assert streaming_exchange_manager._run(streaming_exchange_manager.fetch_order_async(exchange, bot_config, "1")).status == OrderStatusType.closed
+    assert conn.rest_calls == ["create_order", "fetch_order"]
+
+    # the stream is broken
+    _push(streaming_exchange_manager, conn, "orders", ConnectionError("closed"), lambda: stream.failed)
+    streaming_exchange_manager.fetch_order(exchange, bot_config, "1")
+    assert conn.rest_calls == ["create_order", "fetch_order", "fetch_order"]
+
+
+def test_resting_orders_are_fetched_from_a_live_stream(streaming_exchange_manager, exchange, bot_config):
+    streaming_exchange_manager.fetch_order(exchange, bot_config, "1")
+    conn = streaming_exchange_manager._connect(exchange)
+    stream = streaming_exchange_manager._streams[("orders", *streaming_exchange_manager._get_connection_key(exchange), "BTC/USDT")]
+    _push(streaming_exchange_manager, conn, "orders", [_ccxt_order("2", "open")], lambda: stream.updated > 0)
+    time.sleep(0.02)
+
+    # no update for longer than stream_stale_seconds while the subscription is live
+    streaming_exchange_manager._stale_seconds = 0.01
+    assert streaming_exchange_manager.fetch_order(exchange, bot_config, "2").status == OrderStatusType.open
+    assert list(streaming_exchange_manager.fetch_orders(exchange, bot_config, ["2"])) == ["2"]
+    assert conn.rest_calls == ["fetch_order"]
+
+
+def test_orders_unknown_to_the_stream_are_fetched_by_rest(streaming_exchange_manager, exchange, bot_config):
+    assert streaming_exchange_manager.fetch_order(exchange, bot_config, "2").status == OrderStatusType.open
+    conn = streaming_exchange_manager._connect(exchange)
+    stream = streaming_exchange_manager._streams[("orders", *streaming_exchange_manager._get_connection_key(exchange), "BTC/USDT")]
+    _push(streaming_exchange_manager, conn, "orders", [_ccxt_order("0", "closed")], lambda: stream.updated > 0)
+
+    # read again once the subscription is live, then the stream has every later change
+    assert streaming_exchange_manager.fetch_order(exchange, bot_config, "2").status == OrderStatusType.open
+    assert streaming_exchange_manager.fetch_order(exchange, bot_config, "2").status == OrderStatusType.open
+    assert conn.rest_calls == ["fetch_order"] * 2
+
+    # the changes may have been missed while the stream was broken
+    _push(streaming_exchange_manager, conn, "orders", ConnectionError("closed"), lambda: stream.failed)
+    _push(streaming_exchange_manager, conn, "orders", [_ccxt_order("3", "closed")], lambda: stream.updated > 0)
+    assert streaming_exchange_manager.fetch_order(exchange, bot_config, "2").status == OrderStatusType.open
+    assert streaming_exchange_manager.fetch_order(exchange, bot_config, "2").status == OrderStatusType.open
+    assert streaming_exchange_manager.fetch_order(exchange, bot_config, "3").status == OrderStatusType.closed
+    assert conn.rest_calls == ["fetch_order"] * 3
+
+
+def test_close_cancels_the_streams(streaming_exchange_manager, exchange):
+    streaming_exchange_manager.read_order_book(exchange, PAIR)
+    conn = streaming_exchange_manager._connect(exchange)
+    task = streaming_exchange_manager._streams[("order_book", ExchangeType.binance, True, "BTC/USDT")].task
+
+    streaming_exchange_manager._run(streaming_exchange_manager._close())
+
+    assert task.cancelled()
+    assert conn.closed
+    assert streaming_exchange_manager._streams == {}
@@ -0,0 +1,121 @@
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from elena.adapters.exchange_manager.request_cache import RequestCache
+
+
+def test_get_shares_fresh_values():
+    sut = RequestCache(freshness_seconds=10)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return len(calls)
+
+    assert sut.get("key", fetch) == 1
+    assert sut.get("key", fetch) == 1
+    assert sut.get("other_key", fetch) == 2
+    assert len(calls) == 2
+
+
+def test_get_fetches_again_when_expired():
+    sut = RequestCache(freshness_seconds=10)
+    with patch("elena.adapters.exchange_manager.request_cache.time") as mocked_time:
+        mocked_time.monotonic.return_value = 100.0
+        assert sut.get("key", lambda: "first") == "first"
+        mocked_time.monotonic.return_value = 109.0
+        assert sut.get("key", lambda: "second") == "first"
+        mocked_time.monotonic.return_value = 111.0
+        assert sut.get("key", lambda: "third") == "third"
+
+
+def test_get_without_freshness_always_fetches():
+    sut = RequestCache(freshness_seconds=0)
+    assert sut.get("key", lambda: "first") == "first"
+    assert sut.get("key", lambda: "second") == "second"
+
+
+def test_get_does_not_cache_errors():
+    sut = RequestCache(freshness_seconds=10)
+
+    def fail():
+        raise RuntimeError("exchange down")
+
+    with pytest.raises(RuntimeError):
+        sut.get("key", fail)
+    assert sut.get("key", lambda: "recovered") == "recovered"
+
+
+def test_get_coalesces_concurrent_requests():
+    sut = RequestCache(freshness_seconds=10)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    results = []
+    first = threading.Thread(target=lambda: results.append(sut.get("key", slow_fetch)))
+    first.start()
+    started.wait(5)
+    others = [threading.Thread(target=lambda: results.append(sut.get("key", slow_fetch))) for _ in range(5)]
+    for thread in others:
+        thread.start()
+    release.set()
+    for thread in [first] + others:
+        thread.join(5)
+
+    assert results == ["value"] * 6
+    assert len(calls) == 1
+
+
+def test_get_evicts_expired_values():
+    sut = RequestCache(freshness_seconds=10)
+    with patch("elena.adapters.exchange_manager.request_cache.time") as mocked_time:
+        mocked_time.monotonic.return_value = 100.0
+        sut.get("old_key", lambda: "old")
+        mocked_time.monotonic.return_value = 105.0
+        sut.get("key", lambda: "first")
+        mocked_time.monotonic.return_value = 111.0
+        assert sut.get("key", lambda: "second") == "first"
+
+    assert list(sut._values) == ["key"]
+    assert list(sut._key_locks) == ["key"]
+
+
+def test_get_async_coalesces_concurrent_requests_and_shares_values():
+    sut = RequestCache(freshness_seconds=10)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def get_all():
+        return await asyncio.gather(*[sut.get_async("key", fetch) for _ in range(5)])
+
+    assert asyncio.run(get_all()) == ["value"] * 5
+    assert sut.get("key", lambda: "other") == "value"
+    assert len(calls) == 1
+
+
+def test_get_async_does_not_cache_errors():
+    sut = RequestCache(freshness_seconds=10)
+
+    async def fail():
+        raise RuntimeError("exchange down")
+
+    async def recover():
+        return "recovered"
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(sut.get_async("key", fail))
+    assert asyncio.run(sut.get_async("key", recover)) == "recovered"
@@ -1,11 +1,16 @@
 import json
 import pathlib
 from os import path
-from unittest.mock import patch
+from typing import List, Tuple
+from unittest.mock import Mock, patch
 
+import pytest
 from mockito import mock
 
+from elena.adapters.metrics_manager.local_metrics_manager import LocalMetricsManager
+from elena.domain.model.metric import Metric
 from elena.domain.ports.metrics_manager import ORDER_CANCELLED
+from elena.domain.ports.storage_manager import StorageError
 from elena.domain.services.elena import get_metrics_manager, get_storage_manager
 
 config = {
@@ -63,3 +68,92 @@ def test_metrics():
         "value": 9.9,
         "tags": "tag1:cde#tag2:jiji",
     }
+
+
+def _build_buffered_metrics_manager(max_buffered_metrics: int = 10000, full_buffer_policy: str = "flush") -> Tuple[LocalMetricsManager, Mock]:
+    storage_manager = Mock()
+    sut = LocalMetricsManager()
+    sut.init(
+        config={
+            "MetricsManager": {
+                "flush_interval_seconds": 3600,
+                "max_buffered_metrics": max_buffered_metrics,
+                "full_buffer_policy": full_buffer_policy,
+            }
+        },
+        logger=Mock(),
+        storage_manager=storage_manager,
+    )
+    return sut, storage_manager
+
+
+def _flushed_metrics(storage_manager: Mock) -> List[Metric]:
+    return [metric for call in storage_manager.append_metrics.call_args_list for metric in call.args[0]]
+
+
+def test_buffered_metrics_are_aggregated():
+    sut, storage_manager = _build_buffered_metrics_manager()
+
+    sut.counter(ORDER_CANCELLED, "test_bot", 7, ["tag1:abc"])
+    sut.counter(ORDER_CANCELLED, "test_bot", 3, ["tag1:abc"])
+    sut.counter(ORDER_CANCELLED, "test_bot", 1, ["tag1:cde"])
+    sut.gauge(ORDER_CANCELLED, "test_bot", 2.0, [])
+    sut.gauge(ORDER_CANCELLED, "test_bot", 6.0, [])
+    sut.gauge(ORDER_CANCELLED, "test_bot", 1.0, [])
+    sut.timer(ORDER_CANCELLED, "test_bot", 12.0, [])
+    sut.timer(ORDER_CANCELLED, "test_bot", 8.0, [])
+    storage_manager.append_metrics.assert_not_called()
+
+    sut.close()
+
+    storage_manager.append_metric.assert_not_called()
+    metrics = _flushed_metrics(storage_manager)
+    assert [(metric.metric_type, metric.tags, metric.value, metric.count) for metric in metrics] == [
+        ("counter", ["tag1:abc"], 10, 2),
+        ("counter", ["tag1:cde"], 1, 1),
+        ("gauge", [], 1.0, 3),
+        ("timer", [], 8.0, 2),
+    ]
+    assert (metrics[2].min, metrics[2].max, metrics[2].avg) == (1.0, 6.0, 3.0)
+    assert (metrics[3].min, metrics[3].max, metrics[3].avg) == (8.0, 12.0, 10.0)
+
+
+def test_full_buffer_is_flushed():
+    sut, storage_manager = _build_buffered_metrics_manager(max_buffered_metrics=2)
+
+    sut.counter(ORDER_CANCELLED, "bot_1", 1, [])
+    sut.counter(ORDER_CANCELLED, "bot_2", 1, [])
+    sut.counter(ORDER_CANCELLED, "bot_3", 1, [])
+    sut.close()
+
+    assert storage_manager.append_metrics.call_count == 2
+    assert [metric.bot_id for metric in _flushed_metrics(storage_manager)] == ["bot_1", "bot_2", "bot_3"]
+
+
+@pytest.mark.parametrize(
+    "full_buffer_policy, expected_bot_ids",
+    [
+        ("drop_newest", ["bot_1", "bot_2"]),
+        ("drop_oldest", ["bot_2", "bot_3"]),
+    ],
+)
+def test_full_buffer_drops_metrics(full_buffer_policy, expected_bot_ids):
+    sut, storage_manager = _build_buffered_metrics_manager(max_buffered_metrics=2, full_buffer_policy=full_buffer_policy)
+
+    sut.counter(ORDER_CANCELLED, "bot_1", 1, [])
+    sut.counter(ORDER_CANCELLED, "bot_2", 1, [])
+    sut.counter(ORDER_CANCELLED, "bot_3", 1, [])
+    sut.close()
+
+    assert [metric.bot_id for metric in _flushed_metrics(storage_manager)] == expected_bot_ids
+
+
+def test_flush_errors_are_logged():
+    sut, storage_manager = _build_buffered_metrics_manager()
+    storage_manager.append_metrics.side_effect = StorageError("disk full")
+
+    sut.counter(ORDER_CANCELLED, "test_bot", 1, [])
+    sut.flush()
+
+    sut._logger.error.assert_called_once()
+    sut.close()
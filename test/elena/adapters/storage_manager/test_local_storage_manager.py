@@ -1,14 +1,22 @@
 import json
+import os
 import pathlib
+import shutil
+import time
 from os import path
 from unittest.mock import patch, Mock, call, ANY
 
+import pandas as pd
 import pytest
 
 from elena.domain.model.bot_status import BotStatus, BotBudget
+from elena.domain.model.metric import Metric
 from elena.domain.model.order import Order, OrderSide, OrderType
+from elena.domain.model.schedule_index import BotSchedule, ScheduleIndex
+from elena.domain.model.trade import Trade
 from elena.domain.model.trading_pair import TradingPair
 from elena.domain.ports.metrics_manager import ORDER_CANCELLED
+from elena.domain.ports.storage_manager import StorageError
 from elena.domain.services.elena import get_storage_manager
 
 
@@ -90,18 +98,42 @@ def test_save_and_load_bot_status(logger, storage_manager):
         budget=BotBudget(),
     )
 
+    shutil.rmtree(path.join(pathlib.Path(__file__).parent.parent.parent.parent, "test_home", "storage", "ArchivedOrder", bot_status.bot_id), ignore_errors=True)
+
     storage_manager.save_bot_status(bot_status)
 
     actual = storage_manager.load_bot_status(bot_status.bot_id)
-    assert actual == bot_status
+    assert actual == bot_status.copy(update={"archived_orders": []})
+    assert storage_manager.load_archived_orders(bot_status.bot_id) == bot_status.archived_orders
+    assert storage_manager.load_closed_trades(bot_status.bot_id) == []
 
     assert logger.mock_calls == [
         call.info("LocalStorageManager working at %s", ANY),
+        call.debug("Appending %d %s %s to storage: %s", 1, "ArchivedOrder", "test_bot_id", ANY),
         call.debug("Saving %s %s to storage: %s", "BotStatus", "test_bot_id", ANY),
         call.debug("Loading %s %s from storage: %s", "BotStatus", "test_bot_id", ANY),
+        call.debug("Loading %s %s from storage", "ArchivedOrder", "test_bot_id"),
+        call.debug("Loading %s %s from storage", "ClosedTrade", "test_bot_id"),
     ]
 
 
+def test_save_bot_status_appends_archive(storage_manager):
+    bot_id = "test_archive_bot_id"
+    shutil.rmtree(path.join(pathlib.Path(__file__).parent.parent.parent.parent, "test_home", "storage", "ClosedTrade", bot_id), ignore_errors=True)
+    first_trade = Trade(id="1", exchange_id="binance", bot_id=bot_id, strategy_id="strategy", pair=TradingPair(base="BTC", quote="USDT"), size=0.1)
+    second_trade = first_trade.copy(update={"id": "2"})
+
+    storage_manager.save_bot_status(BotStatus(bot_id=bot_id, active_orders=[], archived_orders=[], active_trades=[], closed_trades=[first_trade], budget=BotBudget()))
+    status = storage_manager.load_bot_status(bot_id)
+    status.closed_trades.append(second_trade)
+    storage_manager.save_bot_status(status)
+    # saved again, i.e. after a failure
+    storage_manager.save_bot_status(status)
+
+    assert storage_manager.load_bot_status(bot_id).closed_trades == []
+    assert storage_manager.load_closed_trades(bot_id) == [first_trade, second_trade]
+
+
 def test_append_metric(logger, storage_manager):
     filepath = path.join(pathlib.Path(__file__).parent.parent.parent.parent, "test_home", "storage", "Metric", "test_append_metric_bot", "240119.jsonl")
     try:
@@ -139,3 +171,228 @@ def test_append_metric(logger, storage_manager):
     assert logger.mock_calls == [
         call.info("LocalStorageManager working at %s", ANY),
     ]
+
+
+def test_append_metrics(tmp_path):
+    sut = _build_storage_manager_with_backups(tmp_path, 0)
+    timestamp = int(time.mktime((2024, 1, 19, 12, 0, 0, 0, 0, -1)) * 1000)
+
+    sut.append_metrics(
+        [
+            Metric(timestamp=timestamp, bot_id="bot_1", metric_name=ORDER_CANCELLED, metric_type="counter", value=3, tags=["tag1:abc"], count=2),
+            Metric(timestamp=timestamp, bot_id="bot_1", metric_name=ORDER_CANCELLED, metric_type="gauge", value=1.0, tags=[], count=2, min=1.0, max=3.0, avg=2.0),
+            Metric(timestamp=timestamp, bot_id="bot_2", metric_name=ORDER_CANCELLED, metric_type="counter", value=1, tags=[]),
+        ]
+    )
+
+    lines = (tmp_path / "storage" / "Metric" / "bot_1" / "240119.jsonl").read_text().splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"timestamp": timestamp, "bot_id": "bot_1", "metric_name": "OrderCancelled", "metric_type": "counter", "value": 3, "tags": "tag1:abc", "count": 2},
+        {"timestamp": timestamp, "bot_id": "bot_1", "metric_name": "OrderCancelled", "metric_type": "gauge", "value": 1.0, "tags": "", "count": 2, "min": 1.0, "max": 3.0, "avg": 2.0},
+    ]
+    lines = (tmp_path / "storage" / "Metric" / "bot_2" / "240119.jsonl").read_text().splitlines()
+    assert json.loads(lines[0]) == {"timestamp": timestamp, "bot_id": "bot_2", "metric_name": "OrderCancelled", "metric_type": "counter", "value": 1, "tags": ""}
+
+
+def test_append_and_load_candles(logger, storage_manager):
+    candles_id = "Candles-binance-BTC-USDT-1h"
+    shutil.rmtree(path.join(pathlib.Path(__file__).parent.parent.parent.parent, "test_home", "storage", "Candles", candles_id), ignore_errors=True)
+    day_1 = 1702425600000  # 2023-12-13 00:00 UTC
+    day_2 = day_1 + 24 * 60 * 60 * 1000
+    columns = ["Open time", "Open", "High", "Low", "Close", "Volume"]
+    hour = 60 * 60 * 1000
+
+    storage_manager.append_candles(
+        candles_id,
+        pd.DataFrame([[day_1 + 22 * hour, 1.0, 1.0, 1.0, 1.0, 1.0], [day_1 + 23 * hour, 2.0, 2.0, 2.0, 2.0, 2.0]], columns=columns),
+    )
+    storage_manager.append_candles(
+        candles_id,
+        pd.DataFrame([[day_1 + 23 * hour, 2.5, 2.5, 2.5, 2.5, 2.5], [day_2, 3.0, 3.0, 3.0, 3.0, 3.0]], columns=columns),
+    )
+
+    actual = storage_manager.load_candles(candles_id)
+    assert actual["Open time"].tolist() == [day_1 + 22 * hour, day_1 + 23 * hour, day_2]
+    assert actual["Close"].tolist() == [1.0, 2.5, 3.0]
+    assert actual["Open time"].dtype == "int64"
+
+    last = storage_manager.load_candles(candles_id, limit=2)
+    assert last["Open time"].tolist() == [day_1 + 23 * hour, day_2]
+
+    partitions = sorted(os.listdir(path.join(pathlib.Path(__file__).parent.parent.parent.parent, "test_home", "storage", "Candles", candles_id)))
+    assert partitions == ["20231213.npy", "20231214.npy"]
+
+
+def test_load_candles_not_stored(storage_manager):
+    with pytest.raises(StorageError):
+        storage_manager.load_candles("Candles-binance-NOT-STORED-1m")
+
+
+def test_save_and_load_schedule_index(storage_manager):
+    schedule_index = ScheduleIndex(
+        strategy_id="strategy_1",
+        bots={"bot_1": BotSchedule(bot_id="bot_1", cron_expression="0 * * * *", last_execution=1702479180000, next_execution=1702479600000)},
+    )
+
+    storage_manager.save_schedule_index(schedule_index)
+
+    assert storage_manager.load_schedule_index("strategy_1") == schedule_index
+
+
+def _build_storage_manager_with_backups(tmp_path, backups: int):
+    return get_storage_manager(
+        config={
+            "home": str(tmp_path),
+            "StorageManager": {
+                "class": "elena.adapters.storage_manager.local_storage_manager.LocalStorageManager",
+                "path": "storage",
+                "backups": backups,
+            },
+        },
+        logger=Mock(),
+    )
+
+
+def _build_schedule_index(strategy_id: str, last_execution: int) -> ScheduleIndex:
+    return ScheduleIndex(
+        strategy_id=strategy_id,
+        bots={"bot_1": BotSchedule(bot_id="bot_1", cron_expression="", last_execution=last_execution, next_execution=0)},
+    )
+
+
+def test_save_keeps_rotating_backups(tmp_path):
+    sut = _build_storage_manager_with_backups(tmp_path, 2)
+
+    for last_execution in range(1, 5):
+        sut.save_schedule_index(_build_schedule_index("strategy_1", last_execution))
+
+    files = sorted(os.listdir(tmp_path / "storage" / "ScheduleIndex"))
+    assert files == ["strategy_1.json", "strategy_1.json.1", "strategy_1.json.2"]
+    assert json.loads((tmp_path / "storage" / "ScheduleIndex" / "strategy_1.json.2").read_text())["value"]["bots"]["bot_1"]["last_execution"] == 2
+
+
+def test_save_never_removes_the_file_while_rotating_backups(tmp_path):
+    sut = _build_storage_manager_with_backups(tmp_path, 2)
+    sut.save_schedule_index(_build_schedule_index("strategy_1", 1))
+    filepath = tmp_path / "storage" / "ScheduleIndex" / "strategy_1.json"
+    replace = os.replace
+    file_found = []
+
+    def _replace(src, dst):
+        file_found.append(filepath.exists())
+        replace(src, dst)
+
+    with patch("os.replace", _replace):
+        sut.save_schedule_index(_build_schedule_index("strategy_1", 2))
+        sut.save_schedule_index(_build_schedule_index("strategy_1", 3))
+
+    assert all(file_found)
+    assert json.loads((tmp_path / "storage" / "ScheduleIndex" / "strategy_1.json.1").read_text())["value"]["bots"]["bot_1"]["last_execution"] == 2
+
+
+def test_load_recovers_last_good_backup(tmp_path):
+    sut = _build_storage_manager_with_backups(tmp_path, 2)
+    sut.save_schedule_index(_build_schedule_index("strategy_1", 1))
+    sut.save_schedule_index(_build_schedule_index("strategy_1", 2))
+    # truncated by a crash while writing
+    (tmp_path / "storage" / "ScheduleIndex" / "strategy_1.json").write_text('{"id": "strat')
+
+    assert sut.load_schedule_index("strategy_1") == _build_schedule_index("strategy_1", 1)
+    sut._logger.warning.assert_called_once()
+
+
+def test_load_without_backups_raises_storage_error(tmp_path):
+    sut = _build_storage_manager_with_backups(tmp_path, 0)
+    sut.save_schedule_index(_build_schedule_index("strategy_1", 1))
+    (tmp_path / "storage" / "ScheduleIndex" / "strategy_1.json").write_text('{"id": "strat')
+
+    with pytest.raises(StorageError):
+        sut.load_schedule_index("strategy_1")
+
+
+def test_delete_removes_backups(tmp_path):
+    sut = _build_storage_manager_with_backups(tmp_path, 2)
+    sut.save_bot_status(BotStatus(bot_id="bot_1", active_orders=[], archived_orders=[], active_trades=[], closed_trades=[], budget=BotBudget()))
+    sut.save_bot_status(BotStatus(bot_id="bot_1", active_orders=[], archived_orders=[], active_trades=[], closed_trades=[], budget=BotBudget()))
+
+    sut.delete_bot_status("bot_1")
+
+    assert os.listdir(tmp_path / "storage" / "BotStatus") == []
+
+
+def _build_storage_manager_with_open_metric_files(tmp_path, max_open_metric_files: int):
+    return get_storage_manager(
+        config={
+            "home": str(tmp_path),
+            "StorageManager": {
+                "class": "elena.adapters.storage_manager.local_storage_manager.LocalStorageManager",
+                "path": "storage",
+                "max_open_metric_files": max_open_metric_files,
+            },
+        },
+        logger=Mock(),
+    )
+
+
+def test_get_filepath_creates_directories_once(tmp_path):
+    sut = _build_storage_manager_with_open_metric_files(tmp_path, 0)
+
+    with patch("elena.adapters.storage_manager.local_storage_manager.Path.mkdir") as mkdir:
+        sut._get_filepath(file_path="BotStatus", file_name="bot_1")
+        sut._get_filepath(file_path="BotStatus", file_name="bot_2")
+        sut._get_filepath(file_path="Metric/bot_1", file_name="240119", extension="jsonl")
+
+    assert mkdir.call_count == 2
+
+
+def test_metric_files_are_kept_open(tmp_path):
+    sut = _build_storage_manager_with_open_metric_files(tmp_path, 2)
+
+    with patch("elena.adapters.storage_manager.file_storage_manager.time") as mocked_time:
+        mocked_time.time.return_value = 1705685253
+        mocked_time.strftime.return_value = "240119"
+        for bot_id in ["bot_1", "bot_2", "bot_1", "bot_3"]:
+            sut.append_metric(bot_id, ORDER_CANCELLED, "counter", 1, [])
+        # readers see the lines of open files
+        assert len((tmp_path / "storage" / "Metric" / "bot_1" / "240119.jsonl").read_text().splitlines()) == 2
+        # bot_2 was the least recently written
+        assert list(sut._metric_files) == [sut._get_metric_filepath("bot_1", "240119"), sut._get_metric_filepath("bot_3", "240119")]
+
+        mocked_time.strftime.return_value = "240120"
+        sut.append_metric("bot_1", ORDER_CANCELLED, "counter", 1, [])
+
+    assert list(sut._metric_files) == [sut._get_metric_filepath("bot_3", "240119"), sut._get_metric_filepath("bot_1", "240120")]
+    assert len((tmp_path / "storage" / "Metric" / "bot_1" / "240120.jsonl").read_text().splitlines()) == 1
+
+    sut.close()
+
+    assert not sut._metric_files
+
+
+def test_save_writes_each_version_to_its_own_temporary_file(tmp_path):
+    sut = _build_storage_manager_with_backups(tmp_path, 0)
+    replace = os.replace
+    tmp_filepaths = []
+
+    def _replace(src, dst):
+        tmp_filepaths.append(src)
+        replace(src, dst)
+
+    with patch("os.replace", _replace):
+        sut.save_schedule_index(_build_schedule_index("strategy_1", 1))
+        sut.save_schedule_index(_build_schedule_index("strategy_1", 2))
+
+    assert len(set(tmp_filepaths)) == 2
+    assert os.listdir(tmp_path / "storage" / "ScheduleIndex") == ["strategy_1.json"]
+
+
+def test_failed_save_removes_its_temporary_file(tmp_path):
+    sut = _build_storage_manager_with_backups(tmp_path, 0)
+    sut.save_schedule_index(_build_schedule_index("strategy_1", 1))
+
+    with patch("os.fsync", side_effect=OSError("disk full")), pytest.raises(StorageError):
+        sut._fsync = True
+        sut.save_schedule_index(_build_schedule_index("strategy_1", 2))
+
+    assert os.listdir(tmp_path / "storage" / "ScheduleIndex") == ["strategy_1.json"]
+    assert sut.load_schedule_index("strategy_1") == _build_schedule_index("strategy_1", 1)
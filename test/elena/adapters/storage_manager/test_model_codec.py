@@ -0,0 +1,102 @@
+import json
+from unittest.mock import Mock
+
+import pydantic
+import pytest
+
+from elena.adapters.storage_manager import model_codec
+from elena.domain.model.bot_status import BotBudget, BotStatus
+from elena.domain.model.exchange import ExchangeType
+from elena.domain.model.order import Fee, Order, OrderSide, OrderStatusType, OrderType
+from elena.domain.model.trade import Trade
+from elena.domain.model.trading_pair import TradingPair
+from elena.domain.services.elena import get_storage_manager
+
+
+def _build_order(order_id: str, status=OrderStatusType.closed, fee=None) -> Order:
+    return Order(
+        id=order_id,
+        exchange_id=ExchangeType.bitget,
+        bot_id="bot_1",
+        strategy_id="strategy_1",
+        pair=TradingPair.build("BTC/USDT"),
+        timestamp=1705685253000,
+        type=OrderType.limit,
+        side=OrderSide.buy,
+        price=42000.5,
+        amount=0.01,
+        cost=420.005,
+        average=42000.5,
+        filled=0.01,
+        remaining=0.0,
+        status=status,
+        fee=fee,
+    )
+
+
+def _build_bot_status() -> BotStatus:
+    return BotStatus(
+        bot_id="bot_1",
+        timestamp=1705685253000,
+        budget=BotBudget(set_limit=100.0, current_limit=110.0, used=50.0),
+        active_orders=[_build_order("1", status=None)],
+        archived_orders=[_build_order("2", fee=Fee(currency="USDT", cost=0.42, rate=0.001))],
+        active_trades=[Trade(id="3", exchange_id=ExchangeType.bitget, bot_id="bot_1", strategy_id="strategy_1", pair=TradingPair.build("BTC/USDT"), size=0.01)],
+        closed_trades=[],
+    )
+
+
+def test_encode_returns_dict():
+    bot_status = _build_bot_status()
+
+    assert model_codec.encode(bot_status) == bot_status.dict()
+
+
+def test_decode_returns_parsed_model():
+    bot_status = _build_bot_status()
+    data = json.loads(json.dumps(model_codec.encode(bot_status)))
+
+    actual = model_codec.decode(BotStatus, data)
+
+    assert actual == BotStatus.parse_obj(data)
+    assert actual.archived_orders[0].side is OrderSide.buy
+    assert actual.archived_orders[0].fee == Fee(currency="USDT", cost=0.42, rate=0.001)
+    assert str(actual.active_trades[0].pair) == "BTC/USDT"
+
+
+def test_decode_ignores_removed_fields():
+    data = json.loads(_build_order("1").json())
+    data["parent_trade"] = "1"
+
+    actual = model_codec.decode(Order, data)
+
+    assert actual == _build_order("1")
+    assert "parent_trade" not in actual.dict()
+
+
+def test_decode_invalid_data_raises_validation_error():
+    data = json.loads(_build_order("1").json())
+    del data["side"]
+
+    with pytest.raises(pydantic.ValidationError):
+        model_codec.decode(Order, data)
+
+
+def test_load_indented_bot_status_file(tmp_path):
+    storage_manager = get_storage_manager(
+        config={
+            "home": str(tmp_path),
+            "StorageManager": {
+                "class": "elena.adapters.storage_manager.local_storage_manager.LocalStorageManager",
+                "path": "storage",
+            },
+        },
+        logger=Mock(),
+    )
+    bot_status = _build_bot_status()
+    # as the files were written before the compact format
+    record = {"id": "bot_1", "class_name": "BotStatus", "class_module": "elena.domain.model.bot_status", "value": bot_status.dict(), "name": "BotStatus"}
+    (tmp_path / "storage" / "BotStatus").mkdir(parents=True)
+    (tmp_path / "storage" / "BotStatus" / "bot_1.json").write_text(json.dumps(record, indent=4))
+
+    assert storage_manager.load_bot_status("bot_1") == bot_status
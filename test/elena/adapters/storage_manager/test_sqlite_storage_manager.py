@@ -0,0 +1,153 @@
+import sqlite3
+from unittest.mock import Mock
+
+import pandas as pd
+import pytest
+
+from elena.adapters.storage_manager.sqlite_storage_manager import SqliteStorageManager
+from elena.domain.model.bot_status import BotBudget, BotStatus
+from elena.domain.model.exchange import ExchangeType
+from elena.domain.model.exchange_markets import ExchangeMarkets
+from elena.domain.model.metric import Metric
+from elena.domain.model.order import Order, OrderSide, OrderType
+from elena.domain.model.schedule_index import ScheduleIndex
+from elena.domain.model.trade import Trade
+from elena.domain.model.trading_pair import TradingPair
+from elena.domain.ports.storage_manager import StorageError
+from elena.domain.services.elena import get_storage_manager
+
+
+@pytest.fixture
+def storage_manager(tmp_path):
+    sut = get_storage_manager(
+        config={
+            "home": str(tmp_path),
+            "StorageManager": {
+                "class": "elena.adapters.storage_manager.sqlite_storage_manager.SqliteStorageManager",
+                "path": "storage",
+            },
+        },
+        logger=Mock(),
+    )
+    yield sut
+    sut.close()
+
+
+def _build_order(order_id: str) -> Order:
+    return Order(
+        id=order_id,
+        exchange_id=ExchangeType.binance,
+        bot_id="bot_1",
+        strategy_id="strategy",
+        pair=TradingPair.build("BTC/USDT"),
+        timestamp=1702485175960,
+        type=OrderType.stop_loss_limit,
+        side=OrderSide.sell,
+        price=31972.77,
+        amount=0.00945,
+        cost=0.0,
+        average=None,
+        filled=0.0,
+        remaining=0.00945,
+        status="canceled",
+        fee=None,
+        trigger_price=33655.54,
+        stop_price=33655.54,
+        take_profit_price=None,
+        stop_loss_price=None,
+    )
+
+
+def _build_bot_status(bot_id: str) -> BotStatus:
+    return BotStatus(bot_id=bot_id, timestamp=1703944135288, active_orders=[], archived_orders=[], active_trades=[], closed_trades=[], budget=BotBudget())
+
+
+def test_is_selected_by_class(storage_manager):
+    assert isinstance(storage_manager, SqliteStorageManager)
+    assert storage_manager._connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+
+
+def test_save_and_load_bot_status(storage_manager):
+    bot_status = _build_bot_status("bot_1")
+    bot_status.active_orders.append(_build_order("1"))
+    bot_status.archived_orders.append(_build_order("2"))
+    trade = Trade(id="1", exchange_id="binance", bot_id="bot_1", strategy_id="strategy", pair=TradingPair.build("BTC/USDT"), size=0.1, exit_order_id="2", exit_time=1702485175960)
+    bot_status.closed_trades.append(trade)
+
+    storage_manager.save_bot_status(bot_status)
+    # saved again, i.e. after a failure
+    storage_manager.save_bot_status(bot_status)
+
+    assert storage_manager.load_bot_status("bot_1") == bot_status.copy(update={"archived_orders": [], "closed_trades": []})
+    assert storage_manager.load_archived_orders("bot_1") == [_build_order("2")]
+    assert storage_manager.load_closed_trades("bot_1") == [trade]
+
+
+def test_load_bot_status_not_found(storage_manager):
+    with pytest.raises(StorageError):
+        storage_manager.load_bot_status("not_found")
+
+
+def test_save_bot_statuses_is_one_transaction(storage_manager):
+    storage_manager._save_bot_status = Mock(side_effect=[None, sqlite3.OperationalError("disk I/O error")])
+
+    with pytest.raises(StorageError):
+        storage_manager.save_bot_statuses([_build_bot_status("bot_1"), _build_bot_status("bot_2")])
+
+    with pytest.raises(StorageError):
+        storage_manager.load_bot_status("bot_1")
+
+
+def test_delete_bot_status(storage_manager):
+    storage_manager.save_bot_status(_build_bot_status("bot_1"))
+
+    storage_manager.delete_bot_status("bot_1")
+
+    with pytest.raises(StorageError):
+        storage_manager.load_bot_status("bot_1")
+
+
+def test_save_and_load_records(storage_manager):
+    schedule_index = ScheduleIndex(strategy_id="strategy")
+    exchange_markets = ExchangeMarkets(exchange_id=ExchangeType.binance, sandbox_mode=True, timestamp=1, markets={"BTC/USDT": {}}, currencies={})
+
+    storage_manager.save_schedule_index(schedule_index)
+    storage_manager.save_exchange_markets(exchange_markets)
+
+    assert storage_manager.load_schedule_index("strategy") == schedule_index
+    assert storage_manager.load_exchange_markets(ExchangeType.binance, True) == exchange_markets
+    with pytest.raises(StorageError):
+        storage_manager.load_exchange_markets(ExchangeType.binance, False)
+
+
+def test_append_and_load_candles(storage_manager):
+    columns = ["Open time", "Open", "High", "Low", "Close", "Volume"]
+    storage_manager.append_candles("candles", pd.DataFrame([[1000, 1.0, 1.0, 1.0, 1.0, 1.0], [2000, 2.0, 2.0, 2.0, 2.0, 2.0]], columns=columns))
+    storage_manager.append_candles("candles", pd.DataFrame([[2000, 2.5, 2.5, 2.5, 2.5, 2.5], [3000, 3.0, 3.0, 3.0, 3.0, 3.0]], columns=columns))
+
+    actual = storage_manager.load_candles("candles")
+    assert actual["Open time"].tolist() == [1000, 2000, 3000]
+    assert actual["Close"].tolist() == [1.0, 2.5, 3.0]
+    assert actual["Open time"].dtype == "int64"
+    assert storage_manager.load_candles("candles", limit=2)["Open time"].tolist() == [2000, 3000]
+    with pytest.raises(StorageError):
+        storage_manager.load_candles("not_stored")
+
+
+def test_append_metric(storage_manager):
+    storage_manager.append_metric("bot_1", "benefit", "gauge", 1.5, ["tag1:abc", "tag2:def"])
+
+    rows = storage_manager._connection.execute("SELECT bot_id, metric_name, metric_type, value, tags FROM metric").fetchall()
+    assert rows == [("bot_1", "benefit", "gauge", 1.5, "tag1:abc#tag2:def")]
+
+
+def test_append_metrics(storage_manager):
+    storage_manager.append_metrics(
+        [
+            Metric(timestamp=1000, bot_id="bot_1", metric_name="benefit", metric_type="gauge", value=1.0, tags=[], count=2, min=1.0, max=3.0, avg=2.0),
+            Metric(timestamp=1000, bot_id="bot_2", metric_name="orders", metric_type="counter", value=4, tags=["tag1:abc"]),
+        ]
+    )
+
+    rows = storage_manager._connection.execute("SELECT bot_id, value, tags, count, min, max, avg FROM metric ORDER BY bot_id").fetchall()
+    assert rows == [("bot_1", 1.0, "", 2, 1.0, 3.0, 2.0), ("bot_2", 4, "tag1:abc", 1, None, None, None)]
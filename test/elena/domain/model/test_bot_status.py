@@ -1,4 +1,8 @@
-from elena.domain.model.bot_status import BotBudget
+from elena.domain.model.bot_status import BotBudget, BotStatus
+from elena.domain.model.exchange import ExchangeType
+from elena.domain.model.order import Order, OrderSide, OrderType
+from elena.domain.model.trade import Trade
+from elena.domain.model.trading_pair import TradingPair
 
 
 def test_budget_simple():
@@ -138,3 +142,84 @@ def test_budget_on_a_new_set_with_used_budget():
     assert budget.total == 25
     assert budget.current_limit == 25
     assert budget.pct_reinvest_profit == 0
+
+
+def _build_trade(trade_id: str, entry_order_id: str, exit_order_id: str = "0") -> Trade:
+    return Trade(
+        id=trade_id,
+        exchange_id=ExchangeType.bitget,
+        bot_id="bot_1",
+        strategy_id="strategy_1",
+        pair=TradingPair.build("BTC/USDT"),
+        size=0.01,
+        entry_order_id=entry_order_id,
+        exit_order_id=exit_order_id,
+    )
+
+
+def _build_order(order_id: str) -> Order:
+    return Order(
+        id=order_id,
+        exchange_id=ExchangeType.bitget,
+        bot_id="bot_1",
+        strategy_id="strategy_1",
+        pair=TradingPair.build("BTC/USDT"),
+        timestamp=0,
+        type=OrderType.limit,
+        side=OrderSide.sell,
+        price=30000.0,
+        amount=0.01,
+    )
+
+
+def test_bot_status_trade_indexes():
+    trades = [_build_trade("1", "buy_1"), _build_trade("2", "buy_2", "sell_1"), _build_trade("3", "buy_2")]
+    status = BotStatus(bot_id="bot_1", active_orders=[], archived_orders=[], active_trades=trades, closed_trades=[], budget=BotBudget())
+    first, second, third = status.active_trades
+
+    assert status.get_active_trades_by_entry_order_id("buy_2") == [second, third]
+    assert status.get_active_trades_by_exit_order_id("0") == [first, third]
+
+    status.set_trade_exit_order_id(third, "sell_1")
+    assert status.get_active_trades_by_exit_order_id("sell_1") == [second, third]
+    assert status.get_active_trades_by_exit_order_id("0") == [first]
+
+    status.remove_active_trades([second])
+    assert status.active_trades == [first, third]
+    assert status.get_active_trades_by_entry_order_id("buy_2") == [third]
+
+    fourth = _build_trade("4", "buy_2", "sell_1")
+    status.add_active_trade(fourth)
+    assert status.get_active_trades_by_exit_order_id("sell_1") == [third, fourth]
+
+    # lists changed directly are indexed again
+    fifth = _build_trade("5", "buy_3")
+    status.active_trades.append(fifth)
+    assert status.get_active_trades_by_entry_order_id("buy_3") == [fifth]
+    status.active_trades = [fifth]
+    assert status.get_active_trades_by_entry_order_id("buy_2") == []
+
+
+def test_bot_status_order_index():
+    status = BotStatus(bot_id="bot_1", active_orders=[_build_order("1")], archived_orders=[], active_trades=[], closed_trades=[], budget=BotBudget())
+    order = _build_order("2")
+
+    status.add_active_order(order)
+    assert status.get_active_order("2") is order
+    assert status.remove_active_order("1").id == "1"
+    assert status.remove_active_order("1") is None
+    assert status.active_orders == [order]
+    assert status.dict()["active_orders"] == [order.dict()]
+
+
+def test_bot_status_removes_many_trades():
+    trades = [_build_trade(str(i), f"buy_{i % 10}") for i in range(200)]
+    status = BotStatus(bot_id="bot_1", active_orders=[], archived_orders=[], active_trades=trades, closed_trades=[], budget=BotBudget())
+    active_trades = list(status.active_trades)
+
+    for i in range(0, 200, 2):
+        status.remove_active_trades([active_trades[i]])
+
+    assert status.active_trades == active_trades[1::2]
+    assert [trade.id for trade in status.get_active_trades_by_entry_order_id("buy_1")] == [str(i) for i in range(1, 200, 10)]
+    assert status.get_active_trades_by_entry_order_id("buy_2") == []
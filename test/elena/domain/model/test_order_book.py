@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from elena.domain.model.order import OrderSide
+from elena.domain.model.order_book import OrderBook, PriceAmount
+
+
+def _build_order_book() -> OrderBook:
+    return OrderBook(
+        bids=[[100.0, 1.0], [99.0, 2.0], [98.0, 3.0], [90.0, 10.0]],
+        asks=[[101.0, 1.0, 4], [102.0, 2.0, 1], [103.0, 3.0, 2]],
+    )
+
+
+def test_order_book_is_backed_by_arrays():
+    sut = _build_order_book()
+
+    assert sut.bids_array.shape == (4, 2)
+    assert sut.asks_array.dtype == np.float64
+    assert sut.bids[1] == PriceAmount(price=99.0, amount=2.0)
+    assert sut.asks[0].amount == 1.0
+
+
+def test_order_book_keeps_the_pydantic_serialization():
+    sut = _build_order_book()
+
+    actual = OrderBook.parse_obj(sut.dict())
+
+    assert actual == sut
+    assert sut.dict()["asks"][0] == {"price": 101.0, "amount": 1.0}
+    assert OrderBook(bids=[PriceAmount(price=100.0, amount=1.0)], asks=[]) == OrderBook(bids=[{"price": 100.0, "amount": 1.0}])
+
+
+def test_order_book_prices():
+    sut = _build_order_book()
+
+    assert sut.best_bid == 100.0
+    assert sut.best_ask == 101.0
+    assert sut.mid_price() == 100.5
+    assert sut.spread() == 1.0
+    assert sut.spread_pct() == pytest.approx(0.995, abs=0.001)
+
+
+def test_order_book_depth():
+    sut = _build_order_book()
+
+    assert sut.bid_depth(1.5) == 3.0  # 100 and 99 are above 98.9925
+    assert sut.ask_depth(1.5) == 3.0  # 101 and 102 are below 102.0075
+    assert sut.ask_depth(10) == 6.0
+
+
+def test_order_book_vwap_and_slippage():
+    sut = _build_order_book()
+
+    assert sut.vwap(OrderSide.buy, 0.5) == 101.0
+    assert sut.vwap(OrderSide.buy, 2.0) == 101.5
+    assert sut.vwap(OrderSide.buy, 6.0) == pytest.approx((101 + 204 + 309) / 6)
+    assert sut.vwap(OrderSide.buy, 6.1) is None
+    assert sut.vwap(OrderSide.sell, 4.0) == pytest.approx((100 + 198 + 98) / 4)
+    assert sut.slippage_pct(OrderSide.buy, 2.0) == pytest.approx(0.5 / 101 * 100)
+    assert sut.slippage_pct(OrderSide.sell, 4.0) == pytest.approx(1.0)
+
+
+def test_empty_order_book():
+    sut = OrderBook(bids=[], asks=[])
+
+    assert sut.bids == []
+    assert sut.mid_price() is None
+    assert sut.spread() is None
+    assert sut.bid_depth(1) == 0.0
+    assert sut.vwap(OrderSide.sell, 1.0) is None
@@ -1,4 +1,5 @@
 from elena.domain.model.exchange import ExchangeType
+from elena.domain.model.order_book import OrderBookSource
 from elena.domain.services.config_loader import ConfigLoader
 from unittest.mock import Mock, call
 from elena.domain.ports.logger import Logger
@@ -60,6 +61,7 @@ def test_load_strategies():
                         "cron_expression": "*/5 * * * *",
                         "budget_limit": 0.0,
                         "pct_reinvest_profit": 100.0,
+                        "order_book_sources": ["ticker", "order_book"],
                         "tags": [
                             "enabled_tag",
                         ],
@@ -144,6 +146,7 @@ def test_load_strategies():
     assert actual[0].id == "strategy1"
     assert len(actual[0].bots) == 1
     assert actual[0].bots[0].id == "bot1"
+    assert actual[0].bots[0].order_book_sources == [OrderBookSource.ticker, OrderBookSource.order_book]
     assert len(logger.mock_calls) == 4
     assert logger.mock_calls == [
         call.info("Skipping tag %s", "disabled_tag"),
@@ -2,7 +2,7 @@
 #  Record class was doing something like that. But the time parameter is not relevant anymore.
 #       Not sure if that would be possible with amount_to_precision and price_to_precision
 from test.elena.domain.services.record import Record
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 import pandas as pd
 
@@ -11,7 +11,7 @@ from elena.domain.model.balance import Balance
 from elena.domain.model.bot_config import BotConfig
 from elena.domain.model.exchange import Exchange
 from elena.domain.model.order import Order, OrderSide, OrderType
-from elena.domain.model.order_book import OrderBook
+from elena.domain.model.order_book import OrderBook, OrderBookSource
 from elena.domain.model.time_frame import TimeFrame
 from elena.domain.model.trading_pair import TradingPair
 from elena.domain.ports.exchange_manager import ExchangeManager
@@ -101,9 +101,9 @@ class FakeExchangeManager(ExchangeManager):
             )
 
     @Record(enabled=recording, excluded_kwargs=excluded_kwargs)
-    def read_order_book(self, exchange: Exchange, pair: TradingPair) -> OrderBook:
+    def read_order_book(self, exchange: Exchange, pair: TradingPair, depth: Optional[int] = None, sources: Optional[List[OrderBookSource]] = None) -> OrderBook:
         if recording:
-            result = self._cctx.read_order_book(exchange, pair)
+            result = self._cctx.read_order_book(exchange, pair, depth, sources)
             return result
         else:
             return Record.load_recorded_output(
@@ -171,6 +171,20 @@ class FakeExchangeManager(ExchangeManager):
                 order_id=order_id,
             )
 
+    def fetch_orders(self, exchange: Exchange, bot_config: BotConfig, order_ids: List[str]) -> Dict[str, Order]:
+        if recording:
+            return self._cctx.fetch_orders(exchange, bot_config, order_ids)
+        # bulk reads are not recorded, every order is the recorded fetch_order one, as a single read, or the placed one
+        orders = {}
+        for order_id in order_ids:
+            try:
+                order = Record.load_recorded_output(function_name="fetch_order", all_recorded_data=recorded_data, bot_config=bot_config, order_id=order_id)
+            except RuntimeError:
+                order = next((record["output"] for record in recorded_data.get("place_order", []) if record["input"]["bot_config"] == bot_config and record["output"].id == order_id), None)
+            if order is not None:
+                orders[order_id] = order.copy(deep=True)
+        return orders
+
     @Record(enabled=recording, excluded_kwargs=excluded_kwargs)
     def limit_min_amount(self, exchange: Exchange, pair: TradingPair) -> float:
         if recording:
@@ -8,6 +8,7 @@ from os import path
 import pandas as pd
 import pydantic
 
+from elena.domain.model.order_book import OrderBook
 from elena.shared.dynamic_loading import get_class
 
 
@@ -62,7 +63,7 @@ class Record:
         model_class = f"{output.__class__.__module__}.{output.__class__.__qualname__}"
         if isinstance(output, pd.DataFrame):
             return {"type": "DataFrame", "value": output.to_json()}
-        elif isinstance(output, pydantic.BaseModel):
+        elif isinstance(output, (pydantic.BaseModel, OrderBook)):
             return {
                 "type": "BaseModel",
                 "model_class": model_class,
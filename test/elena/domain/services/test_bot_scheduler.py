@@ -0,0 +1,103 @@
+from datetime import datetime
+
+from elena.domain.model.bot_config import BotConfig
+from elena.domain.model.bot_status import BotBudget, BotStatus
+from elena.domain.model.exchange import ExchangeType
+from elena.domain.model.schedule_index import BotSchedule, ScheduleIndex
+from elena.domain.model.strategy_config import StrategyConfig
+from elena.domain.model.time_frame import TimeFrame
+from elena.domain.model.trading_pair import TradingPair
+from elena.domain.services.bot_scheduler import BotScheduler, get_cron
+
+
+def _timestamp(dt: datetime) -> int:
+    return int(dt.timestamp() * 1000)
+
+
+def _build_bot_config(bot_id: str, cron_expression: str) -> BotConfig:
+    return BotConfig(
+        id=bot_id,
+        strategy_id="strategy",
+        name=bot_id,
+        pair=TradingPair.build("BTC/USDT"),
+        exchange_id=ExchangeType.binance,
+        time_frame=TimeFrame.min_1,
+        cron_expression=cron_expression,
+        tags=[],
+        config={},
+    )
+
+
+def _build_strategy_config(*bots: BotConfig) -> StrategyConfig:
+    return StrategyConfig(id="strategy", name="Strategy", strategy_class="", bots=list(bots))
+
+
+def _build_bot_schedule(bot_id: str, cron_expression: str, next_execution: datetime) -> BotSchedule:
+    return BotSchedule(bot_id=bot_id, cron_expression=cron_expression, last_execution=0, next_execution=_timestamp(next_execution))
+
+
+def test_get_cron_is_cached():
+    assert get_cron("0 * * * *") is get_cron("0 * * * *")
+
+
+def test_get_due_bots():
+    now = datetime(2023, 12, 13, 10, 30)
+    strategy_config = _build_strategy_config(
+        _build_bot_config("every_cycle", ""),
+        _build_bot_config("not_indexed", "0 * * * *"),
+        _build_bot_config("due", "*/30 * * * *"),
+        _build_bot_config("not_due", "0 * * * *"),
+        _build_bot_config("cron_changed", "*/5 * * * *"),
+    )
+    schedule_index = ScheduleIndex(
+        strategy_id="strategy",
+        bots={
+            "due": _build_bot_schedule("due", "*/30 * * * *", datetime(2023, 12, 13, 10, 30)),
+            "not_due": _build_bot_schedule("not_due", "0 * * * *", datetime(2023, 12, 13, 11, 0)),
+            "cron_changed": _build_bot_schedule("cron_changed", "0 * * * *", datetime(2023, 12, 13, 11, 0)),
+        },
+    )
+
+    actual = BotScheduler.get_due_bots(strategy_config, schedule_index, now)
+
+    assert [bot_config.id for bot_config in actual] == ["every_cycle", "not_indexed", "due", "cron_changed"]
+
+
+def test_update_schedule_index():
+    strategy_config = _build_strategy_config(
+        _build_bot_config("every_cycle", ""),
+        _build_bot_config("ran", "0 * * * *"),
+        _build_bot_config("not_due", "0 0 * * *"),
+    )
+    not_due = _build_bot_schedule("not_due", "0 0 * * *", datetime(2023, 12, 14, 0, 0))
+    schedule_index = ScheduleIndex(
+        strategy_id="strategy",
+        bots={"not_due": not_due, "removed": _build_bot_schedule("removed", "0 * * * *", datetime(2023, 12, 13, 11, 0))},
+    )
+    ran_at = _timestamp(datetime(2023, 12, 13, 10, 0, 3))
+
+    actual = BotScheduler.update_schedule_index(strategy_config, schedule_index, {"every_cycle": ran_at, "ran": ran_at})
+
+    assert actual == ScheduleIndex(
+        strategy_id="strategy",
+        bots={
+            "every_cycle": BotSchedule(bot_id="every_cycle", cron_expression="", last_execution=ran_at, next_execution=0),
+            "ran": BotSchedule(bot_id="ran", cron_expression="0 * * * *", last_execution=ran_at, next_execution=_timestamp(datetime(2023, 12, 13, 11, 0))),
+            "not_due": not_due,
+        },
+    )
+
+
+def test_restore_last_executions():
+    statuses = [BotStatus(bot_id=bot_id, timestamp=1000, active_orders=[], archived_orders=[], active_trades=[], closed_trades=[], budget=BotBudget()) for bot_id in ["not_saved", "saved", "not_indexed"]]
+    schedule_index = ScheduleIndex(
+        strategy_id="strategy",
+        bots={
+            "not_saved": BotSchedule(bot_id="not_saved", cron_expression="", last_execution=2000, next_execution=0),
+            "saved": BotSchedule(bot_id="saved", cron_expression="", last_execution=500, next_execution=0),
+        },
+    )
+
+    BotScheduler.restore_last_executions(statuses, schedule_index)
+
+    assert [status.timestamp for status in statuses] == [2000, 1000, 1000]
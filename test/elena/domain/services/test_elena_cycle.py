@@ -0,0 +1,175 @@
+import time
+from typing import Optional
+from unittest.mock import Mock
+
+from elena.domain.model.schedule_index import BotSchedule, ScheduleIndex
+from elena.domain.ports.storage_manager import StorageError
+from elena.domain.services.elena import Elena
+
+
+def _build_config(strategies: int, elena_config: dict, cron_expression: str = "") -> dict:
+    return {
+        "Elena": elena_config,
+        "Tags": [{"id": "tag", "enabled": True}],
+        "Exchanges": [],
+        "Strategies": [
+            {
+                "id": f"strategy_{i}",
+                "name": f"Strategy {i}",
+                "enabled": True,
+                "strategy_class": "test.elena.domain.services.test_strategy_manager.SleepingBot",
+                "bots": [
+                    {
+                        "id": f"bot_{i}",
+                        "name": f"Bot {i}",
+                        "enabled": True,
+                        "pair": "BTC/USDT",
+                        "exchange": "binance",
+                        "time_frame": "1m",
+                        "cron_expression": cron_expression,
+                        "budget_limit": 0.0,
+                        "pct_reinvest_profit": 100.0,
+                        "tags": ["tag"],
+                        "config": {},
+                    }
+                ],
+            }
+            for i in range(strategies)
+        ],
+    }
+
+
+def _build_elena(strategies: int, elena_config: dict, cron_expression: str = "", schedule_index: Optional[ScheduleIndex] = None) -> Elena:
+    bot_manager = Mock()
+    bot_manager.load_all.return_value = []
+    bot_manager.load_schedule_index.side_effect = lambda strategy_config: schedule_index or ScheduleIndex(strategy_id=strategy_config.id)
+    return Elena(
+        config=_build_config(strategies, elena_config, cron_expression),
+        logger=Mock(),
+        metrics_manager=Mock(),
+        notifications_manager=Mock(),
+        bot_manager=bot_manager,
+        exchange_manager=Mock(),
+    )
+
+
+def _saved_bot_ids(sut: Elena):
+    return sorted(call.args[0][0].bot_id for call in sut._bot_manager.save_all.call_args_list)
+
+
+def test_run_strategies_in_parallel():
+    sut = _build_elena(4, {"strategy_workers": 4})
+
+    start = time.perf_counter()
+    sut.run()
+    elapsed = time.perf_counter() - start
+
+    assert _saved_bot_ids(sut) == ["bot_0", "bot_1", "bot_2", "bot_3"]
+    assert elapsed < 4 * 0.05
+
+
+def test_run_skips_strategies_after_deadline():
+    sut = _build_elena(3, {"cycle_deadline_seconds": 0.01})
+
+    sut.run()
+
+    assert _saved_bot_ids(sut) == ["bot_0"]
+    sut._logger.warning.assert_any_call("Cycle deadline reached, skipping strategy %s: %s", "strategy_1", "Strategy 1")
+    sut._logger.warning.assert_any_call("Cycle deadline reached, skipping strategy %s: %s", "strategy_2", "Strategy 2")
+
+
+def test_run_skips_strategies_still_running_and_close_waits_for_them():
+    sut = _build_elena(2, {"strategy_workers": 2, "cycle_deadline_seconds": 0.01})
+
+    sut.run()
+    sut.run()
+    sut.close()
+
+    assert _saved_bot_ids(sut) == ["bot_0", "bot_1"]
+    sut._logger.warning.assert_any_call("Strategy %s: %s is still running from a previous cycle, skipping it", "strategy_0", "Strategy 0")
+    sut._logger.warning.assert_any_call("Strategy %s: %s is still running from a previous cycle, skipping it", "strategy_1", "Strategy 1")
+    sut._exchange_manager.close.assert_called_once()
+
+
+def test_run_logs_every_failed_strategy():
+    sut = _build_elena(2, {"strategy_workers": 2})
+    sut._bot_manager.load_all.side_effect = RuntimeError("storage error")
+
+    sut.run()
+
+    errors = [call.args[1] for call in sut._logger.error.call_args_list if call.args[0] == "Error running strategy %s: %s: %s"]
+    assert sorted(errors) == ["strategy_0", "strategy_1"]
+
+
+def test_run_logs_strategy_timing():
+    sut = _build_elena(1, {})
+
+    sut.run()
+
+    timing_calls = [call for call in sut._logger.info.call_args_list if call.args[0] == "Strategy %s ran in %.3f seconds"]
+    assert len(timing_calls) == 1
+    assert timing_calls[0].args[1] == "strategy_0"
+    assert timing_calls[0].args[2] >= 0.05
+
+
+def test_run_sends_phase_timers_and_logs_summary():
+    sut = _build_elena(1, {"timings_summary": True})
+    metrics_manager = sut._metrics_manager._metrics_manager
+
+    sut.run()
+
+    timers = [(call.args[0], call.args[1]) for call in metrics_manager.timer.call_args_list]
+    assert timers == [("LoadStatusesTime", "strategy_0"), ("BotNextTime", "bot_0"), ("SaveStatusesTime", "strategy_0"), ("StrategyTime", "strategy_0")]
+    summary_calls = [call for call in sut._logger.info.call_args_list if call.args[0] == "Cycle ran in %.3f seconds, timings:\n%s"]
+    assert len(summary_calls) == 1
+    assert "BotNextTime" in summary_calls[0].args[2]
+    metrics_manager.flush.assert_called_once()
+
+
+def test_run_skips_strategies_after_stop():
+    sut = _build_elena(2, {})
+
+    sut.stop()
+    sut.run()
+
+    assert _saved_bot_ids(sut) == []
+    sut._logger.warning.assert_any_call("Elena is stopping, skipping strategy %s: %s", "strategy_0", "Strategy 0")
+
+
+def test_close_closes_exchange_manager():
+    sut = _build_elena(1, {})
+
+    sut.close()
+
+    sut._exchange_manager.close.assert_called_once()
+
+
+def test_run_keeps_schedule_index_when_statuses_are_not_saved():
+    sut = _build_elena(1, {}, "* * * * *")
+    sut._bot_manager.save_all.side_effect = StorageError("disk full")
+
+    sut.run()
+
+    sut._bot_manager.save_schedule_index.assert_not_called()
+    sut._logger.error.assert_called_once()
+
+
+def test_run_skips_strategies_without_due_bots():
+    not_due = BotSchedule(bot_id="bot_0", cron_expression="0 0 * * *", last_execution=0, next_execution=int(time.time() * 1000) + 60000)
+    sut = _build_elena(1, {}, "0 0 * * *", ScheduleIndex(strategy_id="strategy_0", bots={"bot_0": not_due}))
+
+    sut.run()
+
+    sut._bot_manager.load_all.assert_not_called()
+    sut._bot_manager.save_schedule_index.assert_not_called()
+
+
+def test_run_indexes_bots_with_cron_expression():
+    sut = _build_elena(1, {}, "0 0 * * *")
+
+    sut.run()
+
+    saved_index = sut._bot_manager.save_schedule_index.call_args.args[0]
+    assert saved_index.strategy_id == "strategy_0"
+    assert saved_index.bots["bot_0"].cron_expression == "0 0 * * *"
+    assert saved_index.bots["bot_0"].next_execution > saved_index.bots["bot_0"].last_execution
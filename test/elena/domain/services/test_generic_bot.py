@@ -0,0 +1,92 @@
+from test.elena.domain.services.fake_exchange_manager import FakeExchangeManager, recorded_data
+from typing import Optional
+from unittest.mock import MagicMock, Mock
+
+from elena.domain.model.bot_config import BotConfig
+from elena.domain.model.bot_status import BotBudget, BotStatus
+from elena.domain.model.exchange import Exchange, ExchangeType
+from elena.domain.model.order import OrderStatusType
+from elena.domain.model.order_book import OrderBook
+from elena.domain.model.trading_pair import TradingPair
+from elena.domain.services.generic_bot import GenericBot
+
+
+def _build_bot(exchange_manager, bot_config: Optional[BotConfig] = None, bot_status: Optional[BotStatus] = None) -> GenericBot:
+    manager = Mock()
+    manager.get_exchange.return_value = Exchange(id=ExchangeType.binance, sandbox_mode=True, api_key="", password="", secret="")
+    bot_config = bot_config or BotConfig(
+        id="bot",
+        name="bot",
+        strategy_id="strategy",
+        pair=TradingPair.build("BTC/USDT"),
+        exchange_id=ExchangeType.binance,
+        time_frame="1m",
+        cron_expression="",
+        tags=[],
+        config={},
+    )
+    bot_status = bot_status or BotStatus(bot_id="bot", active_orders=[], archived_orders=[], active_trades=[], closed_trades=[], budget=BotBudget())
+    bot = GenericBot()
+    bot.init(manager, Mock(), Mock(), Mock(), exchange_manager, bot_config, bot_status)
+    return bot
+
+
+def test_estimated_last_close_reads_the_top_of_the_book():
+    exchange_manager = MagicMock()
+    exchange_manager.get_precision_amount.return_value = 5
+    exchange_manager.get_precision_price.return_value = 2
+    exchange_manager.read_order_book.side_effect = [
+        # from the ticker
+        OrderBook(bids=[[100.0, 1.0]], asks=[[101.0, 1.0]]),
+        OrderBook(bids=[[100.0, 1.0], [99.0, 1.0], [98.0, 1.0], [97.0, 1.0]], asks=[[101.0, 1.0], [102.0, 1.0], [103.0, 1.0]]),
+    ]
+    sut = _build_bot(exchange_manager)
+
+    assert sut.get_estimated_last_close() == 100.5
+    assert sut.get_estimated_sell_price_from_cache() == 99.0
+
+    # the top of the book is not deep enough for the sell price estimate
+    assert [call.kwargs["depth"] for call in exchange_manager.read_order_book.call_args_list] == [1, 3]
+
+
+def test_cached_order_book_serves_the_depth_it_has():
+    exchange_manager = MagicMock()
+    exchange_manager.get_precision_amount.return_value = 5
+    exchange_manager.get_precision_price.return_value = 2
+    # read with the order book limit 5 for a depth of 1
+    exchange_manager.read_order_book.return_value = OrderBook(bids=[[100.0 - i, 1.0] for i in range(5)], asks=[[101.0 + i, 1.0] for i in range(5)])
+    sut = _build_bot(exchange_manager)
+
+    sut.get_order_book(depth=1)
+    sut.get_order_book(use_cache=True, depth=5)
+    sut.get_order_book(use_cache=True, depth=6)
+
+    assert [call.kwargs["depth"] for call in exchange_manager.read_order_book.call_args_list] == [1, 6]
+
+
+def test_update_orders_status_uses_the_bulk_read():
+    placed = next(record for record in recorded_data["place_order"] if record["output"].status == OrderStatusType.open)
+    bot_config = placed["input"]["bot_config"]
+    order = placed["output"].copy(deep=True)
+    bot_status = BotStatus(bot_id=bot_config.id, active_orders=[order], archived_orders=[], active_trades=[], closed_trades=[], budget=BotBudget())
+    exchange_manager = Mock(wraps=FakeExchangeManager())
+    exchange_manager.get_precision_amount.return_value = 5
+    exchange_manager.get_precision_price.return_value = 2
+
+    sut = _build_bot(exchange_manager, bot_config, bot_status)
+
+    exchange_manager.fetch_orders.assert_called_once()
+    exchange_manager.fetch_order.assert_not_called()
+    assert sut.status.active_orders == [order]
+
+
+def test_fake_bulk_and_single_order_reads_return_the_same_recorded_order(monkeypatch):
+    placed = next(record for record in recorded_data["place_order"] if record["output"].status == OrderStatusType.open)
+    bot_config = placed["input"]["bot_config"]
+    first = placed["output"].copy(update={"status": OrderStatusType.open})
+    second = placed["output"].copy(update={"status": OrderStatusType.closed})
+    records = [{"input": {"bot_config": bot_config, "order_id": first.id}, "output": order} for order in [first, second]]
+    monkeypatch.setitem(recorded_data, "fetch_order", records)
+    sut = FakeExchangeManager()
+
+    assert sut.fetch_orders(Mock(), bot_config, [first.id])[first.id] == sut.fetch_order(exchange=Mock(), bot_config=bot_config, order_id=first.id) == first
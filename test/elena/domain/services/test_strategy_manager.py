@@ -0,0 +1,116 @@
+import threading
+import time
+from typing import Optional
+from unittest.mock import Mock
+
+from elena.domain.model.bot_config import BotConfig
+from elena.domain.model.bot_status import BotBudget, BotStatus
+from elena.domain.model.exchange import ExchangeType
+from elena.domain.model.strategy_config import StrategyConfig
+from elena.domain.model.time_frame import TimeFrame
+from elena.domain.model.trading_pair import TradingPair
+from elena.domain.services.strategy_manager import StrategyManagerImpl
+
+_lock = threading.Lock()
+_running = {"now": 0, "max": 0}
+_started = []
+
+
+class SleepingBot:
+    def init(self, manager, logger, metrics_manager, notifications_manager, exchange_manager, bot_config: BotConfig, bot_status: BotStatus):
+        self.bot_config = bot_config
+        self.status = bot_status
+
+    def next(self) -> Optional[BotStatus]:
+        with _lock:
+            _started.append(self.bot_config.id)
+            _running["now"] += 1
+            _running["max"] = max(_running["max"], _running["now"])
+        time.sleep(0.05)
+        with _lock:
+            _running["now"] -= 1
+        if self.bot_config.config.get("skip"):
+            return None
+        return self.status
+
+
+def _build_bot_config(bot_id: str, exchange_id: ExchangeType = ExchangeType.binance, skip: bool = False) -> BotConfig:
+    return BotConfig(
+        id=bot_id,
+        strategy_id="strategy",
+        name=bot_id,
+        pair=TradingPair.build("BTC/USDT"),
+        exchange_id=exchange_id,
+        time_frame=TimeFrame.min_1,
+        cron_expression="",
+        tags=[],
+        config={"skip": skip},
+    )
+
+
+def _build_strategy_manager(bots, bot_workers: int = 1, bot_workers_by_exchange=None, exchange_semaphores=None) -> StrategyManagerImpl:
+    _running["now"] = 0
+    _running["max"] = 0
+    _started.clear()
+    return StrategyManagerImpl(
+        strategy_config=StrategyConfig(
+            id="strategy",
+            name="Strategy",
+            strategy_class="test.elena.domain.services.test_strategy_manager.SleepingBot",
+            bots=bots,
+        ),
+        logger=Mock(),
+        metrics_manager=Mock(),
+        notifications_manager=Mock(),
+        bot_manager=Mock(),
+        exchange_manager=Mock(),
+        exchanges=[],
+        bot_workers=bot_workers,
+        bot_workers_by_exchange=bot_workers_by_exchange,
+        exchange_semaphores=exchange_semaphores,
+    )
+
+
+def _previous_status(bot_id: str) -> BotStatus:
+    return BotStatus(bot_id=bot_id, active_orders=[], archived_orders=[], active_trades=[], closed_trades=[], budget=BotBudget())
+
+
+def test_run_bots_serially_by_default():
+    bots = [_build_bot_config(f"bot_{i}") for i in range(4)]
+    sut = _build_strategy_manager(bots)
+
+    actual = sut.run([_previous_status("bot_2")])
+
+    assert [status.bot_id for status in actual] == ["bot_0", "bot_1", "bot_2", "bot_3"]
+    assert _running["max"] == 1
+
+
+def test_run_bots_in_parallel_keeps_configuration_order():
+    bots = [_build_bot_config(f"bot_{i}", skip=i == 1) for i in range(6)]
+    sut = _build_strategy_manager(bots, bot_workers=3)
+
+    actual = sut.run([])
+
+    assert [status.bot_id for status in actual] == ["bot_0", "bot_2", "bot_3", "bot_4", "bot_5"]
+    assert 1 < _running["max"] <= 3
+
+
+def test_run_bots_in_parallel_limited_by_exchange():
+    bots = [_build_bot_config(f"bot_{i}", exchange_id=ExchangeType.kucoin) for i in range(4)]
+    sut = _build_strategy_manager(bots, bot_workers=4, bot_workers_by_exchange={ExchangeType.kucoin: 1}, exchange_semaphores={ExchangeType.kucoin: threading.Semaphore(1)})
+
+    actual = sut.run([])
+
+    assert len(actual) == 4
+    assert _running["max"] == 1
+
+
+def test_run_bots_waiting_for_an_exchange_do_not_hold_workers():
+    bots = [_build_bot_config(f"kucoin_{i}", exchange_id=ExchangeType.kucoin) for i in range(3)] + [_build_bot_config("binance_0")]
+    sut = _build_strategy_manager(bots, bot_workers=2, bot_workers_by_exchange={ExchangeType.kucoin: 1}, exchange_semaphores={ExchangeType.kucoin: threading.Semaphore(1)})
+
+    actual = sut.run([])
+
+    assert [status.bot_id for status in actual] == ["kucoin_0", "kucoin_1", "kucoin_2", "binance_0"]
+    assert sorted(_started[:2]) == ["binance_0", "kucoin_0"]
+    assert _running["max"] == 2
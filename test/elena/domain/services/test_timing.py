@@ -0,0 +1,47 @@
+from unittest.mock import ANY, Mock, call
+
+import pytest
+
+from elena.domain.services.timing import TimingsSummary, span
+
+
+def test_span_sends_timer():
+    metrics_manager = Mock()
+
+    with span(metrics_manager, "ReadCandlesTime", "bot_1", ["exchange:binance"]):
+        pass
+
+    metrics_manager.timer.assert_called_once_with("ReadCandlesTime", "bot_1", ANY, ["exchange:binance"])
+    assert metrics_manager.timer.call_args.args[2] >= 0
+
+
+def test_span_sends_timer_on_exception():
+    metrics_manager = Mock()
+
+    with pytest.raises(ValueError):
+        with span(metrics_manager, "ReadCandlesTime", "bot_1", []):
+            raise ValueError("error")
+
+    metrics_manager.timer.assert_called_once()
+
+
+def test_timings_summary():
+    metrics_manager = Mock()
+    sut = TimingsSummary(metrics_manager)
+
+    sut.timer("ReadCandlesTime", "bot_1", 10.0, [])
+    sut.timer("ReadCandlesTime", "bot_2", 30.0, [])
+    sut.timer("SaveStatusesTime", "strategy_1", 5.0, [])
+    sut.counter("OrderCancelled", "bot_1", 1, [])
+
+    lines = sut.pop_summary().splitlines()
+
+    assert lines[1].split() == ["ReadCandlesTime", "2", "40.000", "20.000", "30.000"]
+    assert lines[2].split() == ["SaveStatusesTime", "1", "5.000", "5.000", "5.000"]
+    assert len(sut.pop_summary().splitlines()) == 1
+    assert metrics_manager.mock_calls == [
+        call.timer("ReadCandlesTime", "bot_1", 10.0, []),
+        call.timer("ReadCandlesTime", "bot_2", 30.0, []),
+        call.timer("SaveStatusesTime", "strategy_1", 5.0, []),
+        call.counter("OrderCancelled", "bot_1", 1, []),
+    ]
@@ -0,0 +1,47 @@
+import threading
+from unittest.mock import Mock
+
+import schedule
+
+from elena.entrypoint.local.daemon import Daemon
+
+
+def test_run_stops_after_the_running_cycle():
+    elena = Mock()
+    sut = Daemon(elena, schedule.Scheduler())
+    elena.run.side_effect = sut.stop
+
+    sut.run()
+
+    elena.run.assert_called_once()
+    elena.stop.assert_called_once()
+    elena.close.assert_called_once()
+
+
+def test_stop_wakes_up_the_idle_daemon():
+    elena = Mock()
+    cycle_done = threading.Event()
+    elena.run.side_effect = cycle_done.set
+    sut = Daemon(elena, schedule.Scheduler())
+    thread = threading.Thread(target=sut.run)
+    thread.start()
+
+    assert cycle_done.wait(1)
+    sut.stop()
+    thread.join(1)
+
+    assert not thread.is_alive()
+    elena.run.assert_called_once()
+    elena.close.assert_called_once()
+
+
+def test_run_survives_a_failed_cycle():
+    elena = Mock()
+    sut = Daemon(elena, schedule.Scheduler())
+    elena.run.side_effect = [Exception("network error"), None]
+
+    sut._run_cycle()
+    sut._run_cycle()
+
+    assert elena.run.call_count == 2
+    elena.logger.error.assert_called_once()
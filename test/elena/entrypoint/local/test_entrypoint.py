@@ -0,0 +1,15 @@
+from unittest.mock import Mock, patch
+
+import pytest
+
+from elena.entrypoint.local import entrypoint
+
+
+def test_main_closes_elena_when_the_cycle_fails():
+    elena = Mock()
+    elena.run.side_effect = RuntimeError("network error")
+
+    with patch.object(entrypoint, "get_elena_instance", return_value=elena), pytest.raises(RuntimeError):
+        entrypoint.main()
+
+    elena.close.assert_called_once()